@@ -0,0 +1,48 @@
+import timeit
+import typing as t
+
+from benchmarks.models import create_chain_models
+from edgegraph.reflections import field
+from edgegraph.schema import EdgeModel
+from edgegraph.types import PrimitiveTypes
+
+
+def select_all(model: t.Type[EdgeModel], names: t.List[str]) -> None:
+    builder = model.select()
+    for name in names:
+        builder.add_field(getattr(model, name))
+
+
+def insert_all(model: t.Type[EdgeModel], names: t.List[str]) -> None:
+    builder = model.insert()
+    for name in names:
+        builder.add_field(
+            field(getattr(model, name)), value=name, db_type=PrimitiveTypes.STR
+        )
+
+
+def update_all(model: t.Type[EdgeModel], names: t.List[str]) -> None:
+    builder = model.update()
+    for name in names:
+        builder.add_field(
+            field(getattr(model, name)), value=name, db_type=PrimitiveTypes.STR
+        )
+
+
+def main():
+    print(f"{'width':>6} {'select':>12} {'insert':>12} {'update':>12}  (ns/add_field)")
+    for width in [50, 200, 800, 1600]:
+        (model,) = create_chain_models(1, width)
+        names = list(model.__hints__.keys())
+        number = max(1, 20000 // width)
+
+        timings = []
+        for function in [select_all, insert_all, update_all]:
+            elapsed = timeit.timeit(lambda: function(model, names), number=number)
+            timings.append(elapsed / number / width * 1e9)
+
+        print(f"{width:>6} {timings[0]:>12.0f} {timings[1]:>12.0f} {timings[2]:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
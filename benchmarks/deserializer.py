@@ -0,0 +1,117 @@
+import gc
+import time
+import typing as t
+import uuid
+
+import pendulum
+from edgedb.datatypes.datatypes import create_object_factory
+
+import tests.models as m
+from edgegraph.query_builder.base import reference
+from edgegraph.reflections import field
+
+ROW_COUNT = 100_000
+
+
+def full_select(model: t.Type[m.EdgeModel], **subqueries: t.Any):
+    fields: t.List[t.Any] = []
+    for name in model.__model_metadata__.fields:
+        if name in subqueries:
+            fields.append(
+                reference(field(getattr(model, name)), subquery=subqueries[name])
+            )
+        else:
+            fields.append(getattr(model, name))
+
+    return model.select(fields)
+
+
+def object_factory(model: t.Type[m.EdgeModel]):
+    fields = model.__model_metadata__.fields
+    return create_object_factory(
+        **{
+            name: "link" if fields[name].is_link else "property"
+            for name in sorted(fields)
+        }
+    )
+
+
+def generate_rows(count: int) -> t.List[t.Any]:
+    User = object_factory(m.UserModel)
+    Memo = object_factory(m.MemoModel)
+    now = pendulum.now()
+
+    def user(idx: int):
+        values = {
+            "id": uuid.uuid4(),
+            "created_at": now,
+            "updated_at": now,
+            "deleted_at": None,
+            "deleted": False,
+            "email": f"user{idx}@example.com",
+            "password": "password",
+            "name": f"User {idx}",
+        }
+        return User(*[values[name] for name in sorted(values)])
+
+    users = [user(idx) for idx in range(100)]
+    rows = []
+    for idx in range(count):
+        values = {
+            "id": uuid.uuid4(),
+            "created_at": now,
+            "updated_at": now,
+            "deleted_at": None,
+            "deleted": False,
+            "title": f"Memo {idx}",
+            "content": "Some Content",
+            "tags": ["memo"],
+            "created_by": users[idx % len(users)],
+            "accessable_users": [users[(idx + 1) % len(users)]],
+        }
+        rows.append(Memo(*[values[name] for name in sorted(values)]))
+
+    return rows
+
+
+def by_hand(rows: t.List[t.Any]) -> t.List[m.MemoModel]:
+    def as_dict(row: t.Any, model: t.Type[m.EdgeModel]) -> t.Dict[str, t.Any]:
+        return {name: getattr(row, name) for name in model.__model_metadata__.fields}
+
+    memos = []
+    for row in rows:
+        values = as_dict(row, m.MemoModel)
+        values["created_by"] = m.UserModel(**as_dict(row.created_by, m.UserModel))
+        values["accessable_users"] = [
+            m.UserModel(**as_dict(user, m.UserModel)) for user in row.accessable_users
+        ]
+        memos.append(m.MemoModel(**values))
+
+    return memos
+
+
+def main():
+    rows = generate_rows(ROW_COUNT)
+    user_select = full_select(m.UserModel)
+    builder = full_select(
+        m.MemoModel, created_by=user_select, accessable_users=user_select
+    )
+
+    validated = builder.deserializer()
+    trusted = builder.deserializer(trusted=True)
+
+    print(f"rows: {ROW_COUNT}")
+    for (name, convert) in [
+        ("Model(**dict) by hand", by_hand),
+        ("deserializer", validated.many),
+        ("deserializer (trusted)", trusted.many),
+    ]:
+        gc.collect()
+        started = time.perf_counter()
+        convert(rows)
+        elapsed = time.perf_counter() - started
+        print(f"{name:<24} {elapsed:8.3f}s {elapsed / ROW_COUNT * 1e6:8.2f}us/row")
+
+
+if __name__ == "__main__":
+    main()
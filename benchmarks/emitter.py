@@ -0,0 +1,38 @@
+import timeit
+
+from benchmarks.models import create_chain_models, nested_select
+from edgegraph.query_builder.cache import template_cache
+
+
+def main():
+    # disable template cache to measure building query text itself.
+    template_cache.maxsize = 0
+
+    print(f"{'depth':>6} {'width':>6} {'bytes':>10} {'us/build':>10} {'ns/byte':>8}")
+    for (depth, width) in [
+        (1, 100),
+        (1, 400),
+        (10, 10),
+        (10, 40),
+        (20, 10),
+        (40, 10),
+        (10, 200),
+    ]:
+        builder = nested_select(create_chain_models(depth, width))
+        size = len(builder.build().query)
+
+        def build():
+            # marked as changed, or the memoised query is returned without building.
+            builder._changed()
+            return builder.build()
+
+        number = max(1, 200000 // size)
+        elapsed = timeit.timeit(build, number=number) / number
+
+        print(
+            f"{depth:>6} {width:>6} {size:>10} {elapsed * 1e6:>10.1f} {elapsed / size * 1e9:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
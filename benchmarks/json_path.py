@@ -0,0 +1,115 @@
+import asyncio
+import gc
+import time
+import tracemalloc
+import typing as t
+import uuid
+
+import edgedb
+import orjson
+from edgedb.datatypes.datatypes import create_object_factory
+
+import tests.models as m
+from benchmarks.deserializer import full_select, generate_rows
+from benchmarks.models import create_chain_models
+from edgegraph.deserializer import Shape
+from edgegraph.query_builder.select import SelectQueryBuilder
+from tests.fakes import RecordingClient
+
+ROW_COUNT = 20_000
+
+
+def as_json(value: t.Any, shape: t.Optional[Shape]) -> t.Any:
+    """
+    Encode a value of `edgedb.Object` in the shape, like EdgeDB does in `query_json`.
+    """
+    if value is None or shape is None:
+        return value
+
+    if isinstance(value, (list, edgedb.Set)):
+        return [as_json(item, shape) for item in value]
+
+    return {
+        field.name: as_json(getattr(value, field.name), field.shape) for field in shape
+    }
+
+
+def wide_rows(count: int) -> t.Tuple[SelectQueryBuilder, t.List[t.Any]]:
+    [model] = create_chain_models(1, 100)
+    names = sorted(model.__model_metadata__.fields)
+    # EdgeDB objects always have id, even it is not selected.
+    Row = create_object_factory(id="property", **{name: "property" for name in names})
+
+    rows = [
+        Row(uuid.uuid4(), *[f"{name} {idx}" for name in names]) for idx in range(count)
+    ]
+    return (model.select([getattr(model, name) for name in names]), rows)
+
+
+def nested_rows(count: int) -> t.Tuple[SelectQueryBuilder, t.List[t.Any]]:
+    user_select = full_select(m.UserModel)
+    builder = full_select(
+        m.MemoModel, created_by=user_select, accessable_users=user_select
+    )
+    return (builder, generate_rows(count))
+
+
+async def measure(fetch: t.Callable[[], t.Awaitable[t.Any]]) -> t.Tuple[float, float]:
+    gc.collect()
+    started = time.perf_counter()
+    await fetch()
+    elapsed = time.perf_counter() - started
+
+    gc.collect()
+    tracemalloc.start()
+    await fetch()
+    (_, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return (elapsed, peak)
+
+
+async def run():
+    print(f"rows: {ROW_COUNT}")
+    # the object paths start from rows already decoded by the client, and the json paths from text.
+    # so totals of the two are not comparable, and json is not claimed to be faster.
+    print("`edgedb.Object` rows are decoded by the client, which is not included.")
+    print("Totals of `objects` and `json` paths are not comparable.")
+    print(f"{'shape':<8} {'path':<28} {'ms':>10} {'peak MB':>10}")
+
+    for (shape, (builder, rows)) in [
+        ("wide", wide_rows(ROW_COUNT)),
+        ("nested", nested_rows(ROW_COUNT)),
+    ]:
+        payload = orjson.dumps(
+            as_json(rows, builder.shape()), default=lambda v: v.isoformat()
+        ).decode()
+        client = RecordingClient(query=rows, query_json=payload)
+
+        for (path, fetch) in [
+            ("objects", lambda: builder.fetch(client)),
+            ("objects -> models", lambda: builder.fetch_models(client)),
+            (
+                "objects -> models (trusted)",
+                lambda: builder.fetch_models(client, trusted=True),
+            ),
+            ("json -> dicts", lambda: builder.fetch_dicts(client)),
+            (
+                "json -> models",
+                lambda: builder.fetch_models(client, from_json=True),
+            ),
+            (
+                "json -> models (trusted)",
+                lambda: builder.fetch_models(client, trusted=True, from_json=True),
+            ),
+        ]:
+            (elapsed, peak) = await measure(fetch)
+            print(f"{shape:<8} {path:<28} {elapsed * 1e3:>10.1f} {peak / 1e6:>10.1f}")
+
+
+def main():
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
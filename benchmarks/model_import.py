@@ -0,0 +1,93 @@
+import gc
+import time
+import types
+import typing as t
+
+from edgegraph.reflections import set_lazy_reflection
+
+MODEL_COUNT = 500
+
+MODULE_HEADER = """
+import typing as t
+import uuid
+
+import pendulum
+
+from {base_module} import {base_class}
+"""
+
+MODEL_TEMPLATE = """
+class Model{idx}({base_class}):
+    id: uuid.UUID
+    created_at: pendulum.DateTime
+    updated_at: pendulum.DateTime
+    deleted_at: t.Optional[pendulum.DateTime] = None
+    deleted: bool = False
+    title: str
+    content: str
+    count: int
+    score: float
+    tags: t.List[str] = []
+{link}
+    class SchemaConfig:
+        module: str = "default"
+        name: str = "Model{idx}"
+"""
+
+
+def generate_source(base_module: str, base_class: str) -> str:
+    source = [MODULE_HEADER.format(base_module=base_module, base_class=base_class)]
+
+    for idx in range(MODEL_COUNT):
+        link = f"    parent: t.Optional[Model{idx - 1}] = None\n" if idx > 0 else ""
+        source.append(MODEL_TEMPLATE.format(idx=idx, base_class=base_class, link=link))
+
+    return "".join(source)
+
+
+def timed_exec(code: types.CodeType, module_name: str) -> t.Tuple[float, t.Any]:
+    module = types.ModuleType(module_name)
+    gc.collect()
+
+    started = time.perf_counter()
+    exec(code, module.__dict__)
+    return time.perf_counter() - started, module
+
+
+def main():
+    started = time.perf_counter()
+    pydantic_code = compile(
+        generate_source("pydantic", "BaseModel"), "bench_pydantic", "exec"
+    )
+    edge_code = compile(
+        generate_source("edgegraph.schema", "EdgeModel"), "bench_edge", "exec"
+    )
+    compile_elapsed = time.perf_counter() - started
+
+    # warm up imports and pydantic internals, then measure each mode.
+    timed_exec(pydantic_code, "bench_warmup")
+    (pydantic_elapsed, _) = timed_exec(pydantic_code, "bench_pydantic")
+
+    set_lazy_reflection(False)
+    (eager_elapsed, _) = timed_exec(edge_code, "bench_eager")
+
+    set_lazy_reflection(True)
+    (lazy_elapsed, lazy_module) = timed_exec(edge_code, "bench_lazy")
+    set_lazy_reflection(False)
+
+    gc.collect()
+    started = time.perf_counter()
+    for idx in range(MODEL_COUNT):
+        getattr(lazy_module, f"Model{idx}").__model_metadata__
+    reflect_elapsed = time.perf_counter() - started
+
+    print(f"models:                          {MODEL_COUNT}")
+    print(f"compile sources:                 {compile_elapsed * 1e3:8.1f}ms")
+    print(f"pydantic.BaseModel classes:      {pydantic_elapsed * 1e3:8.1f}ms")
+    print(f"EdgeModel classes (eager):       {eager_elapsed * 1e3:8.1f}ms")
+    print(f"EdgeModel classes (lazy):        {lazy_elapsed * 1e3:8.1f}ms")
+    print(f"first use of lazy models:        {reflect_elapsed * 1e3:8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
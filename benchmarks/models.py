@@ -0,0 +1,58 @@
+import typing as t
+
+from edgegraph.query_builder.base import reference
+from edgegraph.query_builder.select import SelectQueryBuilder
+from edgegraph.reflections import field
+from edgegraph.schema import EdgeModel
+
+
+def create_chain_models(depth: int, width: int) -> t.List[t.Type[EdgeModel]]:
+    """
+    Create models Level0 -> Level1 -> ... where each level has `width` properties and a `child` link.
+    """
+    models: t.List[t.Type[EdgeModel]] = []
+    child: t.Optional[t.Type[EdgeModel]] = None
+
+    for level in reversed(range(depth)):
+        annotations: t.Dict[str, t.Any] = {
+            f"property_{idx}": str for idx in range(width)
+        }
+        if child is not None:
+            annotations["child"] = child
+
+        model = t.cast(
+            t.Type[EdgeModel],
+            type(
+                f"Level{level}",
+                (EdgeModel,),
+                {
+                    "__annotations__": annotations,
+                    "__module__": __name__,
+                    "SchemaConfig": type(
+                        "SchemaConfig",
+                        (),
+                        {"module": "default", "name": f"Level{level}"},
+                    ),
+                },
+            ),
+        )
+        models.insert(0, model)
+        child = model
+
+    return models
+
+
+def nested_select(models: t.List[t.Type[EdgeModel]]) -> SelectQueryBuilder:
+    builder: t.Optional[SelectQueryBuilder] = None
+
+    for model in reversed(models):
+        fields: t.List[t.Any] = [
+            getattr(model, name) for name in model.__hints__ if name != "child"
+        ]
+        if builder is not None:
+            fields.append(reference(field(model.child), subquery=builder))
+
+        builder = model.select(fields)
+
+    assert builder is not None
+    return builder
@@ -0,0 +1,113 @@
+import asyncio
+import time
+import typing as t
+import uuid
+from collections import OrderedDict
+
+import tests.models as m
+from edgegraph.expressions.side import SideExpression
+from edgegraph.query_builder.base import reference
+from edgegraph.query_builder.select import SelectQueryBuilder
+from edgegraph.reflections import field
+from edgegraph.types import PrimitiveTypes, QueryResult
+
+
+class CompiledQueryCacheClient:
+    """
+    Stand-in for EdgeDB's compiled query cache.
+    The server keeps compiled queries keyed on the query text, so every distinct text is a recompile.
+    """
+
+    _cache: "OrderedDict[str, None]"
+    _capacity: int
+    hits: int
+    misses: int
+
+    def __init__(self, capacity: int = 1000):
+        self._cache = OrderedDict()
+        self._capacity = capacity
+        self.hits = 0
+        self.misses = 0
+
+    async def query(self, query: str, **kwargs: t.Any) -> t.List[t.Any]:
+        if query in self._cache:
+            self._cache.move_to_end(query)
+            self.hits += 1
+        else:
+            self.misses += 1
+            self._cache[query] = None
+            if len(self._cache) > self._capacity:
+                self._cache.popitem(last=False)
+
+        return []
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+
+def memo_query_builder(memo_id: uuid.UUID) -> SelectQueryBuilder:
+    UserModel = m.UserModel
+    MemoModel = m.MemoModel
+
+    user_subquery = UserModel.select([field(UserModel.id), field(UserModel.name)])
+
+    return (
+        MemoModel.select(
+            [
+                field(MemoModel.id),
+                field(MemoModel.title),
+                field(MemoModel.content),
+                reference(field(MemoModel.created_by), subquery=user_subquery),
+            ]
+        )
+        .add_filter(
+            SideExpression(
+                equation="=",
+                origin=field(MemoModel.id),
+                target=memo_id,
+                target_type=PrimitiveTypes.UUID,
+            )
+        )
+        .add_filter(
+            SideExpression(
+                equation="=",
+                origin=field(MemoModel.deleted),
+                target=False,
+                target_type=PrimitiveTypes.BOOL,
+            )
+        )
+    )
+
+
+def build_memo_query(memo_id: uuid.UUID) -> QueryResult:
+    return memo_query_builder(memo_id).build()
+
+
+async def run(requests: int = 10000) -> CompiledQueryCacheClient:
+    client = CompiledQueryCacheClient()
+
+    for _ in range(requests):
+        result = build_memo_query(uuid.uuid4())
+        await client.query(result.query, **result.kwargs)
+
+    return client
+
+
+def main():
+    requests = 10000
+
+    started = time.perf_counter()
+    client = asyncio.run(run(requests))
+    elapsed = time.perf_counter() - started
+
+    print(f"requests:  {requests}")
+    print(f"hits:      {client.hits}")
+    print(f"misses:    {client.misses}")
+    print(f"hit rate:  {client.hit_rate:.2%}")
+    print(f"elapsed:   {elapsed:.3f}s ({elapsed / requests * 1e6:.1f}us/request)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+import argparse
+import asyncio
+import functools
+import gc
+import itertools
+import json
+import platform
+import sys
+import time
+import timeit
+import typing as t
+import uuid
+
+import tests.models as m
+from benchmarks.models import create_chain_models, nested_select
+from edgegraph.expressions.side import SideExpression
+from edgegraph.query_builder.base import QueryBuilderBase
+from edgegraph.query_builder.cache import template_cache
+from edgegraph.query_builder.insert import InsertQueryBuilder
+from edgegraph.query_builder.update import UpdateQueryBuilder
+from edgegraph.reflections import field
+from edgegraph.schema import EdgeModel
+from edgegraph.types import PrimitiveTypes, QueryResult
+from edgegraph.validator import SchemaValidator
+from tests.fakes import FakeIntrospectionClient, model_schema
+
+WIDTHS = (10, 100, 400)
+DEPTHS = (1, 5, 10)
+REPEAT = 5
+
+
+class Case(t.NamedTuple):
+    name: str
+    params: t.Dict[str, t.Any]
+    func: t.Callable[[], t.Any]
+    # called before each repeat, e.g. to clear caches.
+    setup: t.Optional[t.Callable[[], t.Any]] = None
+
+
+def measure(case: Case, target_seconds: float) -> t.Dict[str, t.Any]:
+    if case.setup is not None:
+        case.setup()
+    case.func()
+
+    # find the number of calls which takes at least `target_seconds`.
+    number = 1
+    while True:
+        if case.setup is not None:
+            case.setup()
+        elapsed = timeit.timeit(case.func, number=number)
+        if elapsed >= target_seconds or number >= 1_000_000:
+            break
+        number *= 2
+
+    timings = []
+    for _ in range(REPEAT):
+        if case.setup is not None:
+            case.setup()
+        gc.collect()
+        timings.append(timeit.timeit(case.func, number=number) / number)
+
+    return {
+        "name": case.name,
+        "params": case.params,
+        "number": number,
+        "best_us": min(timings) * 1e6,
+        "mean_us": sum(timings) / len(timings) * 1e6,
+    }
+
+
+def insert_builder(model: t.Type[EdgeModel]) -> InsertQueryBuilder:
+    builder = model.insert()
+    for name in model.__hints__:
+        if name != "child":
+            builder.add_field(field(getattr(model, name)), f"{name} value")
+
+    return builder
+
+
+def update_builder(model: t.Type[EdgeModel]) -> UpdateQueryBuilder:
+    builder = model.update().add_filter(
+        SideExpression(
+            equation="=",
+            origin=field(model.property_0),
+            target="property_0 value",
+        )
+    )
+    for name in model.__hints__:
+        if name != "child":
+            builder.add_field(field(getattr(model, name)), value=f"{name} value")
+
+    return builder
+
+
+def cache_setups() -> t.List[t.Tuple[str, t.Callable[[], t.Any]]]:
+    def cold():
+        template_cache.maxsize = 0
+        template_cache.clear()
+
+    def warm():
+        template_cache.maxsize = 1024
+
+    # "memo" builds the same builder again, which returns the result memoised on it.
+    return [("cold", cold), ("warm", warm), ("memo", warm)]
+
+
+def build_func(builder: QueryBuilderBase, cache: str) -> t.Callable[[], t.Any]:
+    if cache == "memo":
+        return builder.build
+
+    def build():
+        # marked as changed, so the query is built through the template cache.
+        builder._changed()
+        return builder.build()
+
+    return build
+
+
+def builder_cases() -> t.Iterator[Case]:
+    shapes = [(1, width) for width in WIDTHS] + [
+        (depth, 10) for depth in DEPTHS if depth > 1
+    ]
+
+    for (depth, width) in shapes:
+        models = create_chain_models(depth, width)
+        select = nested_select(models)
+        for (cache, setup) in cache_setups():
+            params = {"depth": depth, "width": width, "cache": cache}
+            yield Case("select.build", params, build_func(select, cache), setup)
+
+    for width in WIDTHS:
+        [model] = create_chain_models(1, width)
+        builders: t.List[t.Tuple[str, QueryBuilderBase]] = [
+            ("insert.build", insert_builder(model)),
+            ("update.build", update_builder(model)),
+        ]
+        for (name, builder) in builders:
+            for (cache, setup) in cache_setups():
+                params = {"width": width, "cache": cache}
+                yield Case(name, params, build_func(builder, cache), setup)
+
+
+def side_expression_cases() -> t.Iterator[Case]:
+    [model] = create_chain_models(1, 2)
+    literal = SideExpression(
+        equation="=",
+        origin=field(model.property_0),
+        target="value",
+    )
+    nested: SideExpression[t.Any] = SideExpression(
+        equation="and",
+        origin=literal,
+        target=SideExpression(
+            equation="!=",
+            origin=field(model.property_1),
+            target=uuid.uuid4(),
+            target_type=PrimitiveTypes.UUID,
+        ),
+    )
+
+    yield Case("side_expression.build", {"kind": "literal"}, literal.build)
+    yield Case("side_expression.build", {"kind": "nested"}, nested.build)
+
+
+def insert_many_batches(rows: t.List[t.Dict[str, t.Any]]) -> t.List[QueryResult]:
+    return list(m.UserModel.insert_many(rows).chunk(max_rows=1000).batches())
+
+
+def update_many_batches(
+    updates: t.List[t.Tuple[uuid.UUID, t.Any]]
+) -> t.List[QueryResult]:
+    return list(m.UserModel.update_many(updates).batches())
+
+
+def bulk_cases() -> t.Iterator[Case]:
+    for count in (1000, 10000):
+        rows = [
+            {"email": f"user{idx}@example.com", "password": "password", "name": "User"}
+            for idx in range(count)
+        ]
+
+        yield Case(
+            "insert_many.batches",
+            {"rows": count, "max_rows": 1000},
+            functools.partial(insert_many_batches, rows),
+        )
+
+        updates = [(uuid.uuid4(), {"name": f"User {idx}"}) for idx in range(count)]
+        yield Case(
+            "update_many.batches",
+            {"rows": count, "max_rows": 1000},
+            functools.partial(update_many_batches, updates),
+        )
+
+
+def model_creation_cases() -> t.Iterator[Case]:
+    for width in WIDTHS:
+        yield Case(
+            "model.create",
+            {"width": width},
+            functools.partial(create_chain_models, 1, width),
+        )
+
+
+def run_validate(validator: SchemaValidator, loop: asyncio.AbstractEventLoop) -> bool:
+    return loop.run_until_complete(validator.validate())
+
+
+def validator_cases() -> t.Iterator[Case]:
+    # latency of each query is 1ms on 10 connections, like a nearby server.
+    for (count, latency) in itertools.product((10, 100, 1000), (0.0, 0.001)):
+        models = set(create_chain_models(count, 10))
+        client = FakeIntrospectionClient(model_schema(models), latency=latency)
+        validator = SchemaValidator("", models=models, client=client)
+        loop = asyncio.new_event_loop()
+
+        yield Case(
+            "validator.validate",
+            {"models": count, "latency_ms": latency * 1e3},
+            functools.partial(run_validate, validator, loop),
+        )
+
+    # wide models, where checking each field against the introspected type dominates.
+    for width in (100, 500, 1000):
+        models = set(create_chain_models(10, width))
+        client = FakeIntrospectionClient(model_schema(models))
+        validator = SchemaValidator("", models=models, client=client)
+        loop = asyncio.new_event_loop()
+
+        yield Case(
+            "validator.validate",
+            {"models": 10, "fields": width},
+            functools.partial(run_validate, validator, loop),
+        )
+
+
+def main(argv: t.Optional[t.List[str]] = None):
+    parser = argparse.ArgumentParser(description="Run edgegraph benchmarks.")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument(
+        "--filter", default="", help="only run cases which name starts with this"
+    )
+    parser.add_argument(
+        "--target-seconds",
+        type=float,
+        default=0.05,
+        help="minimum duration of each repeat",
+    )
+    args = parser.parse_args(argv)
+
+    groups = [
+        builder_cases,
+        side_expression_cases,
+        bulk_cases,
+        model_creation_cases,
+        validator_cases,
+    ]
+
+    results = []
+    started = time.perf_counter()
+    for group in groups:
+        for case in group():
+            if not case.name.startswith(args.filter):
+                continue
+
+            result = measure(case, args.target_seconds)
+            results.append(result)
+
+            params = ", ".join(f"{k}={v}" for (k, v) in case.params.items())
+            print(
+                f"{case.name:<24} {params:<32} "
+                f"{result['best_us']:>12.2f}us {result['mean_us']:>12.2f}us"
+            )
+
+    template_cache.maxsize = 1024
+    template_cache.clear()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "python": sys.version,
+                    "platform": platform.platform(),
+                    "elapsed_seconds": time.perf_counter() - started,
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import timeit
+import uuid
+
+from benchmarks.query_text_cache import memo_query_builder
+from edgegraph.query_builder.cache import template_cache
+
+
+def main():
+    number = 20000
+    builder = memo_query_builder(uuid.uuid4())
+
+    def build():
+        # marked as changed, so the query is built through the template cache.
+        builder._changed()
+        return builder.build()
+
+    template_cache.clear()
+    cached = timeit.timeit(build, number=number)
+    info = template_cache.info()
+
+    template_cache.maxsize = 0
+    template_cache.clear()
+    uncached = timeit.timeit(build, number=number)
+    template_cache.maxsize = 1024
+
+    print(f"builds:    {number}")
+    print(f"cached:    {cached / number * 1e6:.2f}us/build ({info})")
+    print(f"uncached:  {uncached / number * 1e6:.2f}us/build")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+from edgegraph.query_builder.batch import batch
+
+__all__ = ["batch"]
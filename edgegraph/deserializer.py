@@ -0,0 +1,262 @@
+import base64
+import datetime
+import decimal
+import operator
+import re
+import sys
+import typing as t
+import uuid
+from dataclasses import dataclass
+
+import pendulum
+from pydantic import BaseModel
+
+from edgegraph.reflections import FieldMetadata
+
+M = t.TypeVar("M", bound=BaseModel)
+
+_FRACTION_PATTERN = re.compile(r"\.(\d+)")
+
+
+def _normalize_isoformat(value: str) -> str:
+    """
+    Make ISO 8601 text readable by `fromisoformat` before Python 3.11,
+    which doesn't accept `Z` and fractions of seconds other than 3 or 6 digits.
+    EdgeDB trims trailing zeros of fractions in JSON.
+    """
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+
+    return _FRACTION_PATTERN.sub(
+        lambda matched: "." + matched.group(1).ljust(6, "0")[:6], value, count=1
+    )
+
+
+if sys.version_info >= (3, 11):
+    _parse_datetime = datetime.datetime.fromisoformat
+    _parse_time = datetime.time.fromisoformat
+else:
+
+    def _parse_datetime(value: str) -> datetime.datetime:
+        return datetime.datetime.fromisoformat(_normalize_isoformat(value))
+
+    def _parse_time(value: str) -> datetime.time:
+        return datetime.time.fromisoformat(_normalize_isoformat(value))
+
+
+def _parse_duration(value: str) -> datetime.timedelta:
+    # EdgeDB encodes durations in ISO 8601 like `PT1H30M`.
+    return t.cast(datetime.timedelta, pendulum.parse(value))
+
+
+# decoders of values which are encoded as string in JSON.
+# other values (numbers, booleans, strings, arrays) are already decoded as their python types.
+JSON_DECODERS: t.Dict[t.Type, t.Callable[[t.Any], t.Any]] = {
+    uuid.UUID: uuid.UUID,
+    datetime.datetime: _parse_datetime,
+    datetime.date: datetime.date.fromisoformat,
+    datetime.time: _parse_time,
+    datetime.timedelta: _parse_duration,
+    decimal.Decimal: decimal.Decimal,
+    bytes: base64.b64decode,
+}
+
+# python types of arrays and multi properties, which are lists in JSON.
+_CONTAINER_TYPES = (list, set, frozenset, tuple)
+
+
+@dataclass(frozen=True)
+class ShapeField:
+    name: str
+    is_multi: bool = False
+    # linked model and its shape, when this field is a link
+    model: t.Optional[t.Type[t.Any]] = None
+    shape: t.Optional[t.Tuple["ShapeField", ...]] = None
+
+
+Shape = t.Tuple[ShapeField, ...]
+
+_deserializers: t.Dict[t.Tuple[t.Type[t.Any], Shape, bool, bool], "Deserializer"] = {}
+
+# shape of links selected without subquery, EdgeDB returns only their ids.
+ID_SHAPE: Shape = (ShapeField("id"),)
+
+
+class Deserializer(t.Generic[M]):
+    """
+    Converts rows (`edgedb.Object`, or dicts decoded from JSON) of a shape into models.
+    Attributes to read and converters of links are resolved once when it is compiled, not per row.
+
+    In trusted mode, models are created with `construct` and values are not validated again.
+    Use it only for rows that came straight from the database with the same shape.
+    """
+
+    model: t.Type[M]
+    shape: Shape
+    trusted: bool
+    from_json: bool
+
+    _names: t.Tuple[str, ...]
+    _complete: bool
+    _converters: t.Tuple[t.Tuple[int, str, t.Callable[[t.Any], t.Any]], ...]
+
+    def __init__(
+        self,
+        model: t.Type[M],
+        shape: Shape,
+        trusted: bool = False,
+        from_json: bool = False,
+    ):
+        self.model = model
+        self.shape = shape
+        self.trusted = trusted
+        self.from_json = from_json
+
+        self._names = tuple(field.name for field in shape)
+        self._getter = _tuple_getter(self._names)
+
+        metadata = getattr(model, "__model_metadata__", None)
+        converters = []
+        for (idx, field) in enumerate(shape):
+            if field.model is not None and field.shape is not None:
+                nested = compile_deserializer(
+                    field.model, field.shape, trusted, from_json
+                )
+                convert = nested.convert_many if field.is_multi else nested.convert
+                converters.append((idx, field.name, _skip_none(convert)))
+            elif not trusted:
+                continue
+            elif from_json and metadata is not None and field.name in metadata.fields:
+                decoder = _field_json_decoder(metadata.fields[field.name])
+                if decoder is not None:
+                    converters.append((idx, field.name, _skip_none(decoder)))
+
+        self._converters = tuple(converters)
+
+        # `construct` fills defaults of fields not in the shape, which is slow when they have factories.
+        # rows with every field can skip it and be set as `__dict__` directly.
+        self._complete = (
+            set(self._names) >= set(model.__fields__)
+            and len(model.__private_attributes__) == 0
+        )
+
+    def _values(self, row: t.Any) -> t.Dict[str, t.Any]:
+        if self.from_json:
+            # rows decoded from JSON are owned by the deserializer, so they are converted in place.
+            for (_, name, convert) in self._converters:
+                row[name] = convert(row[name])
+
+            return row
+
+        values = list(self._getter(row))
+        for (idx, _, convert) in self._converters:
+            values[idx] = convert(values[idx])
+
+        return dict(zip(self._names, values))
+
+    def convert(self, row: t.Any) -> t.Any:
+        """
+        Convert a row into a model in trusted mode, or into a dict to be validated by the root model.
+        """
+        # rows decoded from JSON are already dicts to be validated.
+        if self.from_json and not self.trusted:
+            return row
+
+        values = self._values(row)
+        if not self.trusted:
+            return values
+
+        if not self._complete:
+            return self.model.construct(_fields_set=set(self._names), **values)
+
+        instance = self.model.__new__(self.model)
+        object.__setattr__(instance, "__dict__", values)
+        object.__setattr__(instance, "__fields_set__", set(self._names))
+        return instance
+
+    def convert_many(self, rows: t.Iterable[t.Any]) -> t.List[t.Any]:
+        return [self.convert(row) for row in rows]
+
+    def __call__(self, row: t.Any) -> M:
+        if self.trusted:
+            return self.convert(row)
+
+        return self.model.parse_obj(self.convert(row))
+
+    def many(self, rows: t.Iterable[t.Any]) -> t.List[M]:
+        if self.trusted:
+            return self.convert_many(rows)
+
+        parse = self.model.parse_obj
+        return [parse(self.convert(row)) for row in rows]
+
+
+def _tuple_getter(names: t.Tuple[str, ...]) -> t.Callable[[t.Any], t.Tuple]:
+    if len(names) == 0:
+        return lambda row: ()
+
+    getter = operator.attrgetter(*names)
+
+    # attrgetter returns a single value instead of a tuple with one name.
+    if len(names) == 1:
+        return lambda row: (getter(row),)
+
+    return getter
+
+
+def _json_decoder(python_type: t.Any) -> t.Optional[t.Callable[[t.Any], t.Any]]:
+    for candidate in getattr(python_type, "__mro__", ()):
+        decoder = JSON_DECODERS.get(candidate)
+        if decoder is not None:
+            return decoder
+
+    return None
+
+
+def _field_json_decoder(
+    field_metadata: FieldMetadata,
+) -> t.Optional[t.Callable[[t.Any], t.Any]]:
+    if field_metadata.check_type not in _CONTAINER_TYPES:
+        return _json_decoder(field_metadata.check_type)
+
+    # items of arrays and multi properties are decoded by the type in the annotation.
+    annotation = field_metadata.annotation
+    args = t.get_args(annotation)
+    if t.get_origin(annotation) is t.Union:
+        [annotation] = [x for x in args if x is not type(None)]
+        args = t.get_args(annotation)
+
+    decoder = _json_decoder(args[0]) if len(args) > 0 else None
+    if decoder is None:
+        return None
+
+    return _each(decoder, field_metadata.check_type)
+
+
+def _each(
+    convert: t.Callable[[t.Any], t.Any], container: t.Callable[[t.Any], t.Any] = list
+) -> t.Callable[[t.Any], t.Any]:
+    def converter(values: t.Iterable[t.Any]) -> t.Any:
+        return container([convert(value) for value in values])
+
+    return converter
+
+
+def _skip_none(convert: t.Callable[[t.Any], t.Any]) -> t.Callable[[t.Any], t.Any]:
+    def converter(value: t.Any) -> t.Any:
+        return None if value is None else convert(value)
+
+    return converter
+
+
+def compile_deserializer(
+    model: t.Type[t.Any], shape: Shape, trusted: bool = False, from_json: bool = False
+) -> Deserializer:
+    key = (model, shape, trusted, from_json)
+    deserializer = _deserializers.get(key)
+    if deserializer is None:
+        deserializer = _deserializers.setdefault(
+            key, Deserializer(model, shape, trusted, from_json)
+        )
+
+    return deserializer
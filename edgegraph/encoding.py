@@ -0,0 +1,33 @@
+import datetime
+import decimal
+import typing as t
+import uuid
+
+try:
+    import orjson
+
+    def loads(data: t.Union[str, bytes]) -> t.Any:
+        return orjson.loads(data)
+
+    def dumps(value: t.Any) -> bytes:
+        return orjson.dumps(value, default=_default)
+
+except ImportError:  # pragma: no cover
+    import json
+
+    def loads(data: t.Union[str, bytes]) -> t.Any:
+        return json.loads(data)
+
+    def dumps(value: t.Any) -> bytes:
+        return json.dumps(value, default=_default, separators=(",", ":")).encode()
+
+
+def _default(value: t.Any) -> t.Any:
+    # subclasses like `pendulum.DateTime` are not encoded by orjson itself.
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+
+    if isinstance(value, (uuid.UUID, decimal.Decimal)):
+        return str(value)
+
+    raise TypeError(f"Type {type(value)} is not JSON serializable")
@@ -80,3 +80,15 @@ class FieldNotFoundError(Exception):
 
 class CandidateTypeError(TypeError):
     pass
+
+
+class SchemaParseError(Exception):
+    line: int
+    message: str
+
+    def __init__(self, line: int, message: str):
+        self.line = line
+        self.message = message
+
+    def __str__(self):
+        return f"Schema Parse Error in line {self.line}: {self.message}"
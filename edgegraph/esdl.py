@@ -0,0 +1,359 @@
+import os
+import re
+import typing as t
+from dataclasses import dataclass, field
+
+from edgegraph.errors import SchemaParseError
+from edgegraph.introspection import PointerSnapshot, SchemaSnapshot, TypeSnapshot
+
+TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<space>\s+)
+    | (?P<comment>\#[^\n]*)
+    | (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+    | (?P<name>[A-Za-z_][A-Za-z0-9_]*(?:::[A-Za-z_][A-Za-z0-9_]*)*)
+    | (?P<number>[0-9][0-9A-Za-z_.]*)
+    | (?P<operator>->|:=|[^\sA-Za-z0-9_])
+    """,
+    re.VERBOSE,
+)
+
+POINTER_MODIFIERS = {"overloaded", "required", "optional", "single", "multi"}
+POINTER_KINDS = {"property", "link"}
+
+# names in type expressions which are not types, like `array<str>`.
+TYPE_CONSTRUCTORS = {"array", "tuple", "range", "multirange"}
+
+
+class Token(t.NamedTuple):
+    kind: str
+    value: str
+    line: int
+
+
+@dataclass
+class _Pointer:
+    name: str
+    # "property" or "link", None when it is declared like `name: Type`, which is decided by its target.
+    kind: t.Optional[str]
+    multi: bool
+    required: bool
+    # parts of the target type, and whether each part is a name to be qualified.
+    target: t.Optional[t.List[t.Tuple[str, bool]]]
+    module: t.Optional[str]
+
+
+@dataclass
+class _Type:
+    name: str
+    abstract: bool
+    bases: t.List[str] = field(default_factory=list)
+    pointers: t.List[_Pointer] = field(default_factory=list)
+
+
+# pointers every object type has, which are not declared in schema files.
+IMPLICIT_POINTERS = (
+    _Pointer("id", "property", False, True, [("std::uuid", False)], None),
+    _Pointer("__type__", "link", False, True, [("schema::ObjectType", False)], None),
+)
+
+
+def tokenize(text: str) -> t.List[Token]:
+    tokens: t.List[Token] = []
+    line = 1
+    position = 0
+
+    while position < len(text):
+        matched = TOKEN_PATTERN.match(text, position)
+        if matched is None:
+            raise SchemaParseError(line, f"Unexpected character {text[position]!r}.")
+
+        kind = t.cast(str, matched.lastgroup)
+        value = matched.group()
+        if kind not in ("space", "comment"):
+            tokens.append(Token(kind, value, line))
+
+        line += value.count("\n")
+        position = matched.end()
+
+    return tokens
+
+
+class _Parser:
+    """
+    Parser of the SDL subset which declares object types and their pointers.
+    Other declarations (scalars, functions, indexes, constraints, annotations, ...) are skipped.
+    """
+
+    tokens: t.List[Token]
+    position: int
+    types: t.List[_Type]
+    scalars: t.Set[str]
+
+    def __init__(self, tokens: t.List[Token]):
+        self.tokens = tokens
+        self.position = 0
+        self.types = []
+        self.scalars = set()
+
+    def peek(self, offset: int = 0) -> t.Optional[str]:
+        position = self.position + offset
+        return self.tokens[position].value if position < len(self.tokens) else None
+
+    def next(self) -> Token:
+        if self.position >= len(self.tokens):
+            line = self.tokens[-1].line if len(self.tokens) > 0 else 1
+            raise SchemaParseError(line, "Unexpected end of schema.")
+
+        self.position += 1
+        return self.tokens[self.position - 1]
+
+    def name(self) -> str:
+        token = self.next()
+        if token.kind != "name":
+            raise SchemaParseError(
+                token.line, f"Expected a name, but {token.value!r} found."
+            )
+
+        return token.value
+
+    def expect(self, value: str) -> None:
+        token = self.next()
+        if token.value != value:
+            raise SchemaParseError(
+                token.line, f"Expected {value!r}, but {token.value!r} found."
+            )
+
+    def accept(self, value: str) -> bool:
+        if self.peek() == value:
+            self.position += 1
+            return True
+
+        return False
+
+    def skip_declaration(self) -> None:
+        # skip until `;` or the end of a block, which is not in brackets.
+        depth = 0
+        while True:
+            value = self.next().value
+            if value in ("{", "(", "["):
+                depth += 1
+            elif value in ("}", ")", "]"):
+                depth -= 1
+                if depth == 0 and value == "}":
+                    self.accept(";")
+                    return
+            elif value == ";" and depth == 0:
+                return
+
+    def parse_declarations(self, module: t.Optional[str] = None) -> None:
+        while self.peek() is not None and self.peek() != "}":
+            self.parse_declaration(module)
+
+    def parse_declaration(self, module: t.Optional[str]) -> None:
+        if self.accept("module"):
+            name = _qualify(self.name(), module)
+            self.expect("{")
+            self.parse_declarations(name)
+            self.expect("}")
+            self.accept(";")
+            return
+
+        abstract = self.accept("abstract")
+        if self.accept("type"):
+            self.parse_type(abstract, module)
+            return
+
+        # custom scalars are types of the module, others are resolved as `std` ones.
+        if self.peek() == "scalar" and self.peek(1) == "type" and self.peek(2):
+            self.scalars.add(_qualify(t.cast(str, self.peek(2)), module))
+
+        self.skip_declaration()
+
+    def parse_type(self, abstract: bool, module: t.Optional[str]) -> None:
+        declared = _Type(_qualify(self.name(), module), abstract)
+        if self.accept("extending"):
+            declared.bases.append(_qualify(self.name(), module))
+            while self.accept(","):
+                declared.bases.append(_qualify(self.name(), module))
+
+        if not self.accept(";"):
+            self.expect("{")
+            while not self.accept("}"):
+                pointer = self.parse_pointer(module)
+                if pointer is not None:
+                    declared.pointers.append(pointer)
+
+            self.accept(";")
+
+        self.types.append(declared)
+
+    def parse_pointer(self, module: t.Optional[str]) -> t.Optional[_Pointer]:
+        start = self.position
+        modifiers: t.Set[str] = set()
+        while self.peek() in POINTER_MODIFIERS:
+            modifiers.add(self.next().value)
+
+        kind = self.next().value if self.peek() in POINTER_KINDS else None
+
+        # indexes, constraints, annotations, access policies and so on.
+        if kind is None and self.peek(1) not in ("->", ":", ":="):
+            self.position = start
+            self.skip_declaration()
+            return None
+
+        name = self.name()
+        if self.accept("extending"):
+            self.name()
+            while self.accept(","):
+                self.name()
+
+        target: t.Optional[t.List[t.Tuple[str, bool]]] = None
+        if self.accept("->") or self.accept(":"):
+            target = self.parse_type_expression()
+        elif not self.accept(":="):
+            raise SchemaParseError(
+                self.tokens[start].line, f"Target of {name!r} is not declared."
+            )
+
+        # the rest is a block of the pointer, or an expression of a computed pointer.
+        self.skip_declaration()
+
+        return _Pointer(
+            name=name,
+            kind=kind,
+            multi="multi" in modifiers,
+            required="required" in modifiers,
+            target=target,
+            module=module,
+        )
+
+    def parse_type_expression(self) -> t.List[t.Tuple[str, bool]]:
+        parts: t.List[t.Tuple[str, bool]] = []
+        depth = 0
+        while depth > 0 or self.peek() not in ("{", ";", None):
+            token = self.next()
+            if token.value == "<":
+                depth += 1
+            elif token.value == ">":
+                depth -= 1
+
+            if token.kind == "name" and token.value not in TYPE_CONSTRUCTORS:
+                parts.append((token.value, True))
+            elif token.value == ",":
+                parts.append((", ", False))
+            elif token.value == "|":
+                parts.append((" | ", False))
+            else:
+                parts.append((token.value, False))
+
+        if len(parts) == 0:
+            raise SchemaParseError(self.tokens[self.position - 1].line, "Empty type.")
+
+        return parts
+
+
+def _qualify(name: str, module: t.Optional[str]) -> str:
+    if "::" in name or module is None:
+        return name
+
+    return f"{module}::{name}"
+
+
+def _resolve(pointer: _Pointer, declared: t.Set[str]) -> t.Optional[str]:
+    if pointer.target is None:
+        return None
+
+    resolved = []
+    for (part, is_name) in pointer.target:
+        if is_name and "::" not in part:
+            qualified = _qualify(part, pointer.module)
+            part = qualified if qualified in declared else f"std::{part}"
+
+        resolved.append(part)
+
+    return "".join(resolved)
+
+
+def parse_schema(text: str) -> SchemaSnapshot:
+    """
+    Parse object types in SDL text into the snapshot, which `SchemaValidator` checks models with.
+    """
+    parser = _Parser(tokenize(text))
+    parser.parse_declarations()
+    if parser.peek() is not None:
+        token = parser.next()
+        raise SchemaParseError(token.line, f"Unexpected {token.value!r}.")
+
+    return _snapshot(parser.types, parser.scalars)
+
+
+def load_schema(path: str) -> SchemaSnapshot:
+    """
+    Parse a `.esdl` file, or every `.esdl` file in the directory like `dbschema`.
+    """
+    if os.path.isdir(path):
+        paths = sorted(
+            os.path.join(path, x) for x in os.listdir(path) if x.endswith(".esdl")
+        )
+    else:
+        paths = [path]
+
+    texts = []
+    for item in paths:
+        with open(item, encoding="utf-8") as f:
+            texts.append(f.read())
+
+    return parse_schema("\n".join(texts))
+
+
+def _snapshot(types: t.List[_Type], scalars: t.Set[str]) -> SchemaSnapshot:
+    by_name = {x.name: x for x in types}
+    declared = set(by_name) | scalars
+    resolved: t.Dict[str, t.Dict[str, _Pointer]] = {}
+
+    def pointers_of(name: str) -> t.Dict[str, _Pointer]:
+        if name not in resolved:
+            pointers = {x.name: x for x in IMPLICIT_POINTERS}
+
+            # pointers of bases are inherited, and can be overloaded.
+            declared_type = by_name.get(name)
+            if declared_type is not None:
+                for base in declared_type.bases:
+                    pointers.update(pointers_of(base))
+                for pointer in declared_type.pointers:
+                    pointers[pointer.name] = pointer
+
+            resolved[name] = pointers
+
+        return resolved[name]
+
+    snapshots = []
+    for declared_type in types:
+        links: t.List[PointerSnapshot] = []
+        properties: t.List[PointerSnapshot] = []
+
+        for pointer in pointers_of(declared_type.name).values():
+            target = _resolve(pointer, declared)
+            snapshot = PointerSnapshot(
+                name=pointer.name,
+                cardinality="Many" if pointer.multi else "One",
+                required=pointer.required,
+                target=target,
+            )
+
+            if pointer.kind == "link" or (pointer.kind is None and target in by_name):
+                links.append(snapshot)
+            else:
+                properties.append(snapshot)
+
+        snapshots.append(
+            TypeSnapshot(
+                name=declared_type.name,
+                abstract=declared_type.abstract,
+                links=tuple(links),
+                properties=tuple(properties),
+            )
+        )
+
+    return SchemaSnapshot(types=tuple(snapshots))
@@ -1,6 +1,7 @@
 import abc
+import typing as t
 
-from edgegraph.types import QueryResult
+from edgegraph.types import QueryResult, QueryWriter
 
 
 class Expression(metaclass=abc.ABCMeta):
@@ -12,3 +13,51 @@ class Expression(metaclass=abc.ABCMeta):
     @abc.abstractmethod
     def build(self, prefix: str = "") -> QueryResult:
         pass
+
+    def collect(
+        self,
+        prefix: str,
+        structure: t.List[t.Hashable],
+        arguments: t.Dict[str, t.Any],
+    ) -> None:
+        """
+        Collect the structure and the arguments of this expression without building query text.
+        The structure must be identical for every expression that builds the same query text.
+        Expressions that don't override this fall back to their built query.
+        """
+        result = self.build(prefix)
+        structure.append(result.query)
+        arguments.update(result.kwargs)
+
+    def nested(self) -> t.Iterable["Expression"]:
+        """
+        Expressions directly inside this expression, like subqueries and filters.
+        """
+        return ()
+
+    def dependencies(self) -> t.FrozenSet[str]:
+        """
+        Qualified names of types (`module::Type`) which this expression reads.
+        """
+        return frozenset().union(*(x.dependencies() for x in self.nested()))
+
+    def writes(self) -> t.FrozenSet[str]:
+        """
+        Qualified names of types (`module::Type`) which this expression inserts or updates.
+        """
+        return frozenset().union(*(x.writes() for x in self.nested()))
+
+    def is_exclusive(self) -> bool:
+        """
+        Whether this expression, used as a filter, matches at most one object.
+        """
+        return False
+
+    def emit(self, writer: QueryWriter, prefix: str = "") -> None:
+        """
+        Write the query of this expression into the writer.
+        Expressions that don't override this fall back to their built query.
+        """
+        result = self.build(prefix)
+        writer.write(result.query)
+        writer.arguments.update(result.kwargs)
@@ -2,8 +2,9 @@ import typing as t
 
 from edgegraph.errors import ExpressionError
 from edgegraph.expressions.base import Expression
+from edgegraph.expressions.unpack import UnpackExpression
 from edgegraph.reflections import EdgeGraphField
-from edgegraph.types import PrimitiveTypes, QueryResult
+from edgegraph.types import EdgeDBType, PrimitiveTypes, QueryResult, QueryWriter
 
 V = t.TypeVar("V")
 
@@ -14,16 +15,16 @@ class SideExpression(Expression, t.Generic[V]):
     _equation: str
     _origin: t.Union[V, EdgeGraphField, Expression]
     _target: t.Union[V, Expression]
-    _origin_type: t.Optional[PrimitiveTypes] = None
-    _target_type: t.Optional[PrimitiveTypes] = None
+    _origin_type: t.Optional[EdgeDBType] = None
+    _target_type: t.Optional[EdgeDBType] = None
 
     def __init__(
         self,
         equation: str,
         origin: t.Union[EdgeGraphField, Expression, V],
         target: t.Union[Expression, V],
-        origin_type: t.Optional[PrimitiveTypes] = None,
-        target_type: t.Optional[PrimitiveTypes] = None,
+        origin_type: t.Optional[EdgeDBType] = None,
+        target_type: t.Optional[EdgeDBType] = None,
     ):
         super().__init__()
         self._equation = equation
@@ -32,9 +33,83 @@ class SideExpression(Expression, t.Generic[V]):
         self._origin_type = origin_type
         self._target_type = target_type
 
+        # infer type of the value from the field on the other side
+        if (
+            isinstance(origin, EdgeGraphField)
+            and target_type is None
+            and not isinstance(target, Expression)
+            and origin.metadata is not None
+        ):
+            self._target_type = origin.metadata.db_type
+
+        # values of `in` are a set, which is sent as an array like `array_unpack(<array<str>>$x)`.
+        if (
+            equation == "in"
+            and isinstance(target, (list, tuple))
+            and isinstance(self._target_type, PrimitiveTypes)
+        ):
+            self._target = UnpackExpression(list(target), self._target_type)
+            self._target_type = None
+
+    def collect(
+        self,
+        prefix: str,
+        structure: t.List[t.Hashable],
+        arguments: t.Dict[str, t.Any],
+    ) -> None:
+        structure.append((self.type, self._equation))
+
+        if isinstance(self._origin, EdgeGraphField):
+            structure.append(("field", self._origin.name))
+        elif isinstance(self._origin, Expression):
+            structure.append("expression")
+            origin_prefix = f"{prefix}__origin" if len(prefix) > 0 else "origin"
+            self._origin.collect(origin_prefix, structure, arguments)
+        else:
+            structure.append(("value", self._origin_type))
+            origin_key = f"{self.type}_origin"
+            origin_key = f"{prefix}__{origin_key}" if len(prefix) > 0 else origin_key
+            arguments[origin_key] = self._origin
+
+        if isinstance(self._target, Expression):
+            structure.append("expression")
+            target_prefix = f"{prefix}__target" if len(prefix) > 0 else "target"
+            self._target.collect(target_prefix, structure, arguments)
+        else:
+            structure.append(("value", self._target_type))
+            target_key = f"{self.type}_target"
+            target_key = f"{prefix}__{target_key}" if len(prefix) > 0 else target_key
+            arguments[target_key] = self._target
+
+    def nested(self) -> t.Iterable[Expression]:
+        return [
+            side
+            for side in (self._origin, self._target)
+            if isinstance(side, Expression)
+        ]
+
+    def is_exclusive(self) -> bool:
+        if self._equation == "=":
+            return (
+                isinstance(self._origin, EdgeGraphField)
+                and self._origin.name == "id"
+                and not isinstance(self._target, Expression)
+            )
+
+        if self._equation == "and":
+            return any(
+                isinstance(side, Expression) and side.is_exclusive()
+                for side in (self._origin, self._target)
+            )
+
+        return False
+
     def build(self, prefix: str = "") -> QueryResult:
-        result_dict: t.Dict[str, t.Any] = dict()
+        writer = QueryWriter()
+        self.emit(writer, prefix)
+        return writer.result()
 
+    def emit(self, writer: QueryWriter, prefix: str = "") -> None:
         if not (
             isinstance(self._origin, EdgeGraphField)
             or isinstance(self._origin, Expression)
@@ -44,16 +119,19 @@ class SideExpression(Expression, t.Generic[V]):
                     self.type, f"Origin type is not defined for {self._origin}"
                 )
 
-            origin_key = f"{self.type}_{id(self._origin)}"
+            origin_key = f"{self.type}_origin"
             origin_key = f"{prefix}__{origin_key}" if len(prefix) > 0 else origin_key
-            origin_query = f"<{self._origin_type.name}>${origin_key}"
-            result_dict[origin_key] = self._origin
+            writer.write("<", self._origin_type.value, ">$", origin_key)
+            writer.arguments[origin_key] = self._origin
         elif isinstance(self._origin, EdgeGraphField):
-            origin_query = f".{self._origin.name}"
+            writer.write(".", self._origin.name)
         else:
-            (origin_query, update_dict) = self._origin.build()
-            result_dict.update(update_dict)
-            origin_query = f"({origin_query})"
+            origin_prefix = f"{prefix}__origin" if len(prefix) > 0 else "origin"
+            writer.write("(")
+            writer.emit(self._origin, origin_prefix)
+            writer.write(")")
+
+        writer.write(" ", self._equation, " ")
 
         if not isinstance(self._target, Expression):
             if self._target_type is None:
@@ -61,14 +139,12 @@ class SideExpression(Expression, t.Generic[V]):
                     self.type, f"Target type is not defined for {self._target}"
                 )
 
-            target_key = f"{self.type}_{id(self._target)}"
+            target_key = f"{self.type}_target"
             target_key = f"{prefix}__{target_key}" if len(prefix) > 0 else target_key
-            target_query = f"<{self._target_type.value}>${target_key}"
-            result_dict[target_key] = self._target
+            writer.write("<", self._target_type.value, ">$", target_key)
+            writer.arguments[target_key] = self._target
         else:
-            (target_query, update_dict) = self._target.build()
-            result_dict.update(update_dict)
-            target_query = f"({target_query})"
-
-        result_query = f"{origin_query} {self._equation} {target_query}"
-        return QueryResult(result_query, result_dict)
+            target_prefix = f"{prefix}__target" if len(prefix) > 0 else "target"
+            writer.write("(")
+            writer.emit(self._target, target_prefix)
+            writer.write(")")
@@ -0,0 +1,44 @@
+import typing as t
+
+from edgegraph.expressions.base import Expression
+from edgegraph.types import ArrayType, PrimitiveTypes, QueryResult, QueryWriter
+
+
+class UnpackExpression(Expression):
+    """
+    Set of values sent as one array parameter, like `array_unpack(<array<uuid>>$values)`.
+    Its query text does not depend on how many values are sent.
+    """
+
+    type = "unpack"
+
+    _values: t.Any
+    _array_type: ArrayType
+
+    def __init__(self, values: t.Any, element_type: PrimitiveTypes):
+        super().__init__()
+        self._values = values
+        self._array_type = ArrayType(element_type)
+
+    def _key(self, prefix: str) -> str:
+        key = f"{self.type}_values"
+        return f"{prefix}__{key}" if len(prefix) > 0 else key
+
+    def collect(
+        self,
+        prefix: str,
+        structure: t.List[t.Hashable],
+        arguments: t.Dict[str, t.Any],
+    ) -> None:
+        structure.append((self.type, self._array_type))
+        arguments[self._key(prefix)] = self._values
+
+    def build(self, prefix: str = "") -> QueryResult:
+        writer = QueryWriter()
+        self.emit(writer, prefix)
+        return writer.result()
+
+    def emit(self, writer: QueryWriter, prefix: str = "") -> None:
+        key = self._key(prefix)
+        writer.write("array_unpack(<", self._array_type.value, ">$", key, ")")
+        writer.arguments[key] = self._values
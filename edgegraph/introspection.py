@@ -0,0 +1,212 @@
+import hashlib
+import os
+import typing as t
+import weakref
+
+from edgegraph.encoding import dumps, loads
+from edgegraph.reflections import FieldMetadata
+
+# every user-defined object type with its pointers, fetched in one query.
+INTROSPECTION_QUERY = """
+    with module schema select ObjectType {
+        name,
+        abstract,
+        links: {
+            name,
+            cardinality,
+            required,
+            target: { name },
+        },
+        properties: {
+            name,
+            cardinality,
+            required,
+            target: { name },
+        },
+    } filter
+        .name not like 'cfg::%' and
+        .name not like 'std::%' and
+        .name not like 'sys::%' and
+        .name not like 'schema::%';
+"""
+
+# migration applied last, which no other migration is based on.
+LATEST_MIGRATION_QUERY = """
+    with
+        module schema,
+        parents := (detached Migration).parents.name
+    select Migration.name filter Migration.name not in parents
+    limit 1;
+"""
+
+# bumped when the format of the snapshot cache file is changed.
+SNAPSHOT_CACHE_VERSION = 1
+
+# fingerprints of models, which never change after they are reflected.
+_fingerprints: "weakref.WeakKeyDictionary[t.Type[t.Any], str]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+class Introspectable(t.Protocol):
+    async def query(self, query: str, *args, **kwargs) -> t.Any:
+        ...
+
+    async def query_single(self, query: str, *args, **kwargs) -> t.Any:
+        ...
+
+
+class PointerSnapshot(t.NamedTuple):
+    name: str
+    # "One" or "Many"
+    cardinality: str
+    required: bool
+    # qualified name of the linked type or the scalar type
+    target: t.Optional[str] = None
+
+
+class TypeSnapshot(t.NamedTuple):
+    name: str
+    abstract: bool
+    links: t.Tuple[PointerSnapshot, ...]
+    properties: t.Tuple[PointerSnapshot, ...]
+
+
+class SchemaSnapshot(t.NamedTuple):
+    """
+    Object types of a database, which models are checked against without querying again.
+    """
+
+    types: t.Tuple[TypeSnapshot, ...]
+
+    @classmethod
+    def from_result(cls, result: t.Iterable[t.Any]) -> "SchemaSnapshot":
+        return cls(types=tuple(_type_snapshot(x) for x in result))
+
+    @classmethod
+    def from_data(cls, data: t.Any) -> "SchemaSnapshot":
+        return cls(
+            types=tuple(
+                TypeSnapshot(
+                    name,
+                    abstract,
+                    tuple(PointerSnapshot(*x) for x in links),
+                    tuple(PointerSnapshot(*x) for x in properties),
+                )
+                for (name, abstract, links, properties) in data
+            )
+        )
+
+    def to_data(self) -> t.Any:
+        """
+        Plain lists of the snapshot, which can be encoded as JSON.
+        """
+        return [
+            [
+                x.name,
+                x.abstract,
+                [list(pointer) for pointer in x.links],
+                [list(pointer) for pointer in x.properties],
+            ]
+            for x in self.types
+        ]
+
+
+def _pointer_snapshot(pointer: t.Any) -> PointerSnapshot:
+    target = getattr(pointer, "target", None)
+    return PointerSnapshot(
+        name=pointer.name,
+        cardinality=str(pointer.cardinality),
+        required=bool(pointer.required),
+        target=target.name if target is not None else None,
+    )
+
+
+def _type_snapshot(result: t.Any) -> TypeSnapshot:
+    return TypeSnapshot(
+        name=result.name,
+        abstract=bool(result.abstract),
+        links=tuple(_pointer_snapshot(x) for x in result.links),
+        properties=tuple(_pointer_snapshot(x) for x in result.properties),
+    )
+
+
+async def introspect(client: Introspectable) -> SchemaSnapshot:
+    return SchemaSnapshot.from_result(await client.query(INTROSPECTION_QUERY))
+
+
+async def latest_migration(client: Introspectable) -> t.Optional[str]:
+    return await client.query_single(LATEST_MIGRATION_QUERY)
+
+
+def _field_signature(field: FieldMetadata) -> t.List[t.Any]:
+    target = field.target.__model_metadata__.qualified_name if field.target else None
+    db_type = field.db_type.value if field.db_type is not None else None
+    return [field.name, field.is_link, field.is_multi, field.optional, target, db_type]
+
+
+def model_fingerprint(model: t.Type[t.Any]) -> str:
+    """
+    Hash of what the validator checks in the model, which changes when the model is changed.
+    """
+    fingerprint = _fingerprints.get(model)
+    if fingerprint is None:
+        metadata = model.__model_metadata__
+        signature = [
+            metadata.qualified_name,
+            [_field_signature(metadata.fields[x]) for x in sorted(metadata.fields)],
+        ]
+        fingerprint = hashlib.sha256(dumps(signature)).hexdigest()
+        _fingerprints[model] = fingerprint
+
+    return fingerprint
+
+
+class SnapshotCache(t.NamedTuple):
+    """
+    Snapshot of the database at a migration, and fingerprints of models which are valid with it.
+    """
+
+    migration: t.Optional[str]
+    snapshot: SchemaSnapshot
+    # qualified names of models and their fingerprints
+    models: t.Dict[str, str]
+
+    @classmethod
+    def load(cls, path: str) -> t.Optional["SnapshotCache"]:
+        """
+        Read the cache file, or returns None if it doesn't exist or can't be read.
+        """
+        try:
+            with open(path, "rb") as f:
+                data = loads(f.read())
+
+            if data["version"] != SNAPSHOT_CACHE_VERSION:
+                return None
+
+            return cls(
+                migration=data["migration"],
+                snapshot=SchemaSnapshot.from_data(data["snapshot"]),
+                models=dict(data["models"]),
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, path: str) -> None:
+        data = {
+            "version": SNAPSHOT_CACHE_VERSION,
+            "migration": self.migration,
+            "snapshot": self.snapshot.to_data(),
+            "models": self.models,
+        }
+
+        # replaced at once, so other processes never read a half-written file.
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, "wb") as f:
+                f.write(dumps(data))
+            os.replace(temporary, path)
+        finally:
+            # left only when writing or replacing failed.
+            if os.path.exists(temporary):
+                os.unlink(temporary)
@@ -1,19 +1,132 @@
 import abc
+import itertools
 import typing as t
 from dataclasses import dataclass
 from enum import Enum
 
+from pydantic import BaseModel
+
 from edgegraph.errors import ConditionValidationError
 from edgegraph.expressions.base import Expression
-from edgegraph.reflections import Configurable, EdgeGraphField
-from edgegraph.types import PrimitiveTypes
+from edgegraph.query_builder.cache import template_cache
+from edgegraph.query_builder.executor import AsyncQueryable, Executor
+from edgegraph.query_builder.prepared import PreparedStatement
+from edgegraph.reflections import Configurable, EdgeGraphField, FieldMetadata
+from edgegraph.types import (
+    Cardinality,
+    EdgeDBType,
+    Placeholder,
+    QueryResult,
+    QueryWriter,
+)
 
 T = t.TypeVar("T", bound=Configurable)
 
+# revisions of builders, unique in the process so a copied builder never reuses one.
+_revisions = itertools.count()
+
 
 class QueryBuilderBase(Expression, t.Generic[T], metaclass=abc.ABCMeta):
+    # changed by every method which changes the query or its arguments
+    _revision: int
+    # prefix, revisions of this builder and nested builders, and the result built with them
+    _built: t.Optional[t.Tuple[str, t.Tuple[int, ...], QueryResult]]
+
     def __init__(self, base_type: t.Type[T]):
         self.base_type = base_type
+        self._revision = next(_revisions)
+        self._built = None
+
+    def _changed(self) -> None:
+        self._revision = next(_revisions)
+
+    @abc.abstractmethod
+    def collect(
+        self,
+        prefix: str,
+        structure: t.List[t.Hashable],
+        arguments: t.Dict[str, t.Any],
+    ) -> None:
+        pass
+
+    @abc.abstractmethod
+    def emit(self, writer: QueryWriter, prefix: str = "") -> None:
+        pass
+
+    def _render(self, prefix: str = "") -> QueryResult:
+        writer = QueryWriter()
+        self.emit(writer, prefix)
+        return writer.result()
+
+    def _nested_revisions(self) -> t.Tuple[int, ...]:
+        revisions = [self._revision]
+        stack = list(self.nested())
+        while len(stack) > 0:
+            expression = stack.pop()
+            if isinstance(expression, QueryBuilderBase):
+                revisions.append(expression._revision)
+            stack.extend(expression.nested())
+
+        return tuple(revisions)
+
+    def build(self, prefix: str = "") -> QueryResult:
+        """
+        Build the query, or return the one built last time if neither this builder nor nested builders are changed.
+        Expressions other than builders can't be changed, so they are not tracked.
+        """
+        revisions = self._nested_revisions()
+        built = self._built
+        if built is None or built[0] != prefix or built[1] != revisions:
+            built = (prefix, revisions, self._build(prefix))
+            self._built = built
+
+        # arguments are copied, so callers can't change the built result.
+        return QueryResult(built[2].query, dict(built[2].kwargs))
+
+    def _build(self, prefix: str = "") -> QueryResult:
+        structure: t.List[t.Hashable] = [prefix]
+        arguments: t.Dict[str, t.Any] = {}
+        self.collect(prefix, structure, arguments)
+
+        # same structure always renders same query text, only arguments are different.
+        fingerprint = tuple(structure)
+        query = template_cache.get(fingerprint)
+        if query is None:
+            query = self._render(prefix).query
+            template_cache.put(fingerprint, query)
+
+        return QueryResult(query, arguments)
+
+    @property
+    def qualified_name(self) -> str:
+        return self.base_type.__model_metadata__.qualified_name
+
+    def dependencies(self) -> t.FrozenSet[str]:
+        return super().dependencies() | {self.qualified_name}
+
+    def prepare(self) -> PreparedStatement:
+        return PreparedStatement.from_result(self.build())
+
+    @property
+    def cardinality(self) -> Cardinality:
+        """
+        How many objects this query returns, as far as the builder knows.
+        """
+        return Cardinality.MANY
+
+    async def fetch(self, client: t.Union[Executor, AsyncQueryable]) -> t.Any:
+        return await Executor.of(client).fetch(self)
+
+    async def fetch_single(self, client: t.Union[Executor, AsyncQueryable]) -> t.Any:
+        return await Executor.of(client).fetch_single(self)
+
+    async def fetch_required_single(
+        self, client: t.Union[Executor, AsyncQueryable]
+    ) -> t.Any:
+        return await Executor.of(client).fetch_required_single(self)
+
+    async def execute(self, client: t.Union[Executor, AsyncQueryable]) -> None:
+        await Executor.of(client).execute(self)
 
 
 class OrderType(Enum):
@@ -35,8 +148,8 @@ class QueryFieldType(Enum):
 
 class AssignType(Enum):
     ASSIGN = ":="
-    APPEND = "-="
-    REMOVE = "+="
+    APPEND = "+="
+    REMOVE = "-="
 
 
 @dataclass(frozen=True)
@@ -57,7 +170,7 @@ class SelectQueryField(BaseQueryField[T]):
 
 @dataclass(frozen=True)
 class InsertOrUpdateQueryField(BaseQueryField[T]):
-    edgedb_type: t.Optional[PrimitiveTypes] = None  # type represented on edgedb
+    edgedb_type: t.Optional[EdgeDBType] = None  # type represented on edgedb
     value: t.Optional[T] = None
 
     # default is just 'assign', it can be 'append' or 'remove'
@@ -68,7 +181,7 @@ def reference(
     field: t.Union[EdgeGraphField, str],
     expression: t.Optional[Expression] = None,
     subquery: t.Optional[Expression] = None,
-) -> BaseQueryField:
+) -> SelectQueryField:
     if expression is None and subquery is None:
         raise ConditionValidationError(
             f"referencing {field}", "Subquery or Expression is Required"
@@ -103,10 +216,24 @@ def reference(
         field_type = QueryFieldType.EXPRESSION
         target_expression = expression
 
-    return BaseQueryField(
+    return SelectQueryField(
         name=name,
         value_type=value_type,
         query_field_type=field_type,
         expression=target_expression,
         upper_type_name=upper_type_name,
     )
+
+
+def check_field_value(field_metadata: FieldMetadata, value: t.Any) -> None:
+    """
+    Check the value can be assigned to the field. `typing.Optional[T]` is checked as T.
+    """
+    if value is None or isinstance(value, Placeholder):
+        return
+
+    if not isinstance(value, field_metadata.check_type) or isinstance(value, BaseModel):
+        raise ConditionValidationError(
+            field_metadata.name,
+            f"Field type is not correct. Expected {field_metadata.annotation}, got {type(value)}",
+        )
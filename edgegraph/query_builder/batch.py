@@ -0,0 +1,96 @@
+import typing as t
+
+from edgegraph.encoding import loads
+from edgegraph.errors import ConditionValidationError
+from edgegraph.query_builder.cache import template_cache
+from edgegraph.query_builder.executor import AsyncQueryable, Executor, QueryMethod
+from edgegraph.query_builder.select import SelectQueryBuilder
+from edgegraph.types import QueryResult, QueryWriter
+
+
+class BatchQuery:
+    """
+    Independent select queries merged into one free object, which are fetched in one round trip.
+    Each query is built with its name as prefix, so their arguments never collide.
+    """
+
+    type = "BATCH"
+
+    builders: t.Tuple[t.Tuple[str, SelectQueryBuilder], ...]
+
+    def __init__(self, *builders: SelectQueryBuilder):
+        if len(builders) == 0:
+            raise ConditionValidationError(
+                self.type, "At least one query is needed to batch."
+            )
+
+        for builder in builders:
+            if not isinstance(builder, SelectQueryBuilder):
+                raise ConditionValidationError(
+                    str(builder), "Only select queries can be batched."
+                )
+
+        self.builders = tuple((f"q{idx}", x) for (idx, x) in enumerate(builders))
+
+    @property
+    def names(self) -> t.Tuple[str, ...]:
+        return tuple(name for (name, _) in self.builders)
+
+    def dependencies(self) -> t.FrozenSet[str]:
+        return frozenset().union(*(x.dependencies() for (_, x) in self.builders))
+
+    def writes(self) -> t.FrozenSet[str]:
+        return frozenset()
+
+    def emit(self, writer: QueryWriter) -> None:
+        writer.write("select {\n")
+        for (name, builder) in self.builders:
+            writer.write(name, " := (\n")
+            builder.emit(writer, name)
+            writer.write("),\n")
+        writer.write("}\n")
+
+    def build(self) -> QueryResult:
+        structure: t.List[t.Hashable] = [self.type, self.names]
+        arguments: t.Dict[str, t.Any] = {}
+        for (name, builder) in self.builders:
+            builder.collect(name, structure, arguments)
+
+        fingerprint = tuple(structure)
+        query = template_cache.get(fingerprint)
+        if query is None:
+            writer = QueryWriter()
+            self.emit(writer)
+            query = writer.result().query
+            template_cache.put(fingerprint, query)
+
+        return QueryResult(query, arguments)
+
+    def split(self, result: t.Any) -> t.Tuple[t.Any, ...]:
+        """
+        Split the merged object (or dict decoded from JSON) into results of each query, in order.
+        """
+        if isinstance(result, dict):
+            return tuple(result[name] for name in self.names)
+
+        return tuple(getattr(result, name) for name in self.names)
+
+    async def fetch(
+        self, client: t.Union[Executor, AsyncQueryable]
+    ) -> t.Tuple[t.Any, ...]:
+        result = await Executor.of(client).run(
+            QueryMethod.QUERY_REQUIRED_SINGLE, self.build(), self
+        )
+        return self.split(result)
+
+    async def fetch_dicts(
+        self, client: t.Union[Executor, AsyncQueryable]
+    ) -> t.Tuple[t.Any, ...]:
+        result = await Executor.of(client).run(
+            QueryMethod.QUERY_SINGLE_JSON, self.build(), self
+        )
+        return self.split(loads(result))
+
+
+def batch(*builders: SelectQueryBuilder) -> BatchQuery:
+    return BatchQuery(*builders)
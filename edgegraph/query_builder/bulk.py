@@ -0,0 +1,548 @@
+import typing as t
+import uuid
+from dataclasses import dataclass
+
+from pydantic import BaseModel
+
+from edgegraph.encoding import dumps
+from edgegraph.errors import ConditionValidationError
+from edgegraph.query_builder.base import (
+    AssignType,
+    QueryBuilderBase,
+    T,
+    check_field_value,
+)
+from edgegraph.query_builder.executor import AsyncQueryable, Executor, QueryMethod
+from edgegraph.reflections import EdgeGraphField, FieldMetadata
+from edgegraph.types import (
+    Cardinality,
+    EdgeDBType,
+    PrimitiveTypes,
+    QueryResult,
+    QueryWriter,
+)
+
+# variable which each row unpacked from JSON parameter is bound to.
+ROW_VARIABLE = "row"
+
+# numbers which lose precision as JSON numbers, they are sent as strings.
+STRING_ENCODED_TYPES = (PrimitiveTypes.DECIMAL, PrimitiveTypes.BIGINT)
+
+# rows are sent in batches of this size by default when updating.
+DEFAULT_UPDATE_BATCH_ROWS = 1000
+
+# fields which EdgeDB fills by itself and rejects in inserts unless the database allows them.
+# they are columns only when they are given in `fields`.
+SERVER_FIELDS = frozenset({"id"})
+
+Row = t.Union[t.Mapping[str, t.Any], BaseModel]
+UpdateRow = t.Tuple[t.Union[uuid.UUID, BaseModel], t.Mapping[str, t.Any]]
+
+
+@dataclass(frozen=True)
+class BulkColumn:
+    """
+    Field of the model which is read from each row of JSON parameter.
+    """
+
+    name: str
+    metadata: FieldMetadata
+    # type to cast values on EdgeDB, None for links
+    db_type: t.Optional[EdgeDBType] = None
+
+    def encode(self, value: t.Any) -> t.Any:
+        if value is None:
+            return None
+
+        if self.metadata.is_link:
+            if self.metadata.is_multi:
+                return [self._link_id(item) for item in value]
+
+            return self._link_id(value)
+
+        check_field_value(self.metadata, value)
+        if self.db_type in STRING_ENCODED_TYPES:
+            return str(value)
+
+        return value
+
+    def _link_id(self, value: t.Any) -> uuid.UUID:
+        if isinstance(value, BaseModel):
+            value = getattr(value, "id", None)
+
+        if not isinstance(value, uuid.UUID):
+            raise ConditionValidationError(
+                self.name, "Links can be assigned with models or ids of them."
+            )
+
+        return value
+
+    def emit(self, writer: QueryWriter, row_variable: str = ROW_VARIABLE) -> None:
+        getter = f"json_get({row_variable}, '{self.name}')"
+
+        if self.metadata.is_link:
+            assert self.metadata.target is not None
+            target = self.metadata.target.__model_metadata__.qualified_name
+
+            if self.metadata.is_multi:
+                writer.write(
+                    "(select ",
+                    target,
+                    " filter .id in array_unpack(<array<uuid>>",
+                    getter,
+                    "))",
+                )
+            else:
+                writer.write("(select ", target, " filter .id = <uuid>", getter, ")")
+        else:
+            assert self.db_type is not None
+            writer.write("<", self.db_type.value, ">")
+            if self.db_type in STRING_ENCODED_TYPES:
+                writer.write("<str>")
+            writer.write(getter)
+
+
+def bulk_column(
+    base_type: t.Type[t.Any],
+    field: t.Union[EdgeGraphField, str],
+    db_type: t.Optional[EdgeDBType] = None,
+) -> BulkColumn:
+    field_name = field.name if isinstance(field, EdgeGraphField) else field
+
+    field_metadata = base_type.__model_metadata__.fields.get(field_name)
+    if field_metadata is None:
+        raise ConditionValidationError(
+            field_name, f"Field does not exist in {base_type}."
+        )
+
+    if field_metadata.is_link:
+        if field_metadata.target is None:
+            raise ConditionValidationError(
+                field_name, "Linked model of the field can't be found."
+            )
+
+        return BulkColumn(field_name, field_metadata)
+
+    db_type = db_type or field_metadata.db_type
+    if db_type is None:
+        raise ConditionValidationError(
+            field_name, "You must specify `db_type` of the field to read it from rows."
+        )
+
+    if db_type == PrimitiveTypes.BYTES:
+        raise ConditionValidationError(
+            field_name, "Bytes can't be sent in JSON parameter."
+        )
+
+    return BulkColumn(field_name, field_metadata, db_type)
+
+
+def row_values(row: Row) -> t.Mapping[str, t.Any]:
+    # models are taken with their defaults, like `dict()` but linked models are kept to read ids of them.
+    if isinstance(row, BaseModel):
+        return {name: getattr(row, name) for name in row.__fields__}
+
+    return row
+
+
+def row_columns(row: Row) -> t.Iterable[str]:
+    # values of models include ids made by default factories, which are not inserted.
+    if isinstance(row, BaseModel):
+        return [name for name in row.__fields__ if name not in SERVER_FIELDS]
+
+    return row_values(row)
+
+
+def payload(encoded: t.Sequence[bytes]) -> str:
+    return (b"[" + b",".join(encoded) + b"]").decode()
+
+
+def split_batches(
+    encoded: t.Sequence[bytes],
+    max_rows: t.Optional[int] = None,
+    max_bytes: t.Optional[int] = None,
+) -> t.Iterator[str]:
+    """
+    Split encoded rows into JSON arrays of at most `max_rows` rows and `max_bytes` bytes.
+    A row larger than `max_bytes` is sent alone.
+    """
+    batch: t.List[bytes] = []
+    size = 2
+
+    for item in encoded:
+        if len(batch) > 0 and (
+            (max_rows is not None and len(batch) >= max_rows)
+            or (max_bytes is not None and size + len(item) + 1 > max_bytes)
+        ):
+            yield payload(batch)
+            batch = []
+            size = 2
+
+        # rows are joined with commas.
+        size += len(item) + (1 if len(batch) > 0 else 0)
+        batch.append(item)
+
+    if len(batch) > 0:
+        yield payload(batch)
+
+
+class BulkQueryBuilderBase(QueryBuilderBase[T]):
+    """
+    Builder of a statement which runs for each row unpacked from one JSON parameter.
+    Rows are encoded once when they are added, and sent in batches by `chunk` budget.
+    """
+
+    _columns: t.Dict[str, BulkColumn]
+    _encoded: t.List[bytes]
+    _max_rows: t.Optional[int]
+    _max_bytes: t.Optional[int]
+
+    def __init__(self, cls: t.Type[T]):
+        super().__init__(cls)
+        self._columns = {}
+        self._encoded = []
+        self._max_rows = None
+        self._max_bytes = None
+
+    def writes(self) -> t.FrozenSet[str]:
+        return frozenset({self.qualified_name})
+
+    @property
+    def cardinality(self) -> Cardinality:
+        return Cardinality.MANY
+
+    def chunk(
+        self, max_rows: t.Optional[int] = None, max_bytes: t.Optional[int] = None
+    ):
+        if (max_rows is not None and max_rows <= 0) or (
+            max_bytes is not None and max_bytes <= 0
+        ):
+            raise ConditionValidationError(
+                self.base_type.__name__, "Chunk budgets must be greater than 0."
+            )
+
+        self._max_rows = max_rows
+        self._max_bytes = max_bytes
+        self._changed()
+        return self
+
+    def add_rows(self, rows: t.Iterable[t.Any]):
+        """
+        Check and encode rows with columns of the builder. Keys which are not columns are ignored.
+        """
+        for row in rows:
+            self._encoded.append(dumps(self._encode_row(row)))
+
+        self._changed()
+        return self
+
+    def _encode_row(self, row: t.Any) -> t.Dict[str, t.Any]:
+        values = row_values(row)
+        return {
+            name: column.encode(values[name])
+            for (name, column) in self._columns.items()
+            if name in values
+        }
+
+    def _rows_key(self, prefix: str) -> str:
+        return f"{prefix}__rows" if len(prefix) > 0 else "rows"
+
+    def collect(
+        self,
+        prefix: str,
+        structure: t.List[t.Hashable],
+        arguments: t.Dict[str, t.Any],
+    ) -> None:
+        structure.append((self.type, self.base_type))
+        for name in sorted(self._columns):
+            structure.append(self._columns[name])
+
+        arguments[self._rows_key(prefix)] = payload(self._encoded)
+
+    def batches(self, prefix: str = "") -> t.Iterator[QueryResult]:
+        """
+        Queries of each batch, which have the same query text and different rows.
+        """
+        if len(self._encoded) == 0:
+            return
+
+        # query text doesn't depend on rows, so it is built without them.
+        encoded = self._encoded
+        self._encoded = []
+        try:
+            (query, arguments) = self._build(prefix)
+        finally:
+            self._encoded = encoded
+
+        rows_key = self._rows_key(prefix)
+        for payload in split_batches(encoded, self._max_rows, self._max_bytes):
+            yield QueryResult(query, {**arguments, rows_key: payload})
+
+    async def fetch(self, client: t.Union[Executor, AsyncQueryable]) -> t.Any:
+        executor = Executor.of(client)
+        results: t.List[t.Any] = []
+        for result in self.batches():
+            results.extend(await executor.run(QueryMethod.QUERY, result, self))
+
+        return results
+
+    async def execute(self, client: t.Union[Executor, AsyncQueryable]) -> None:
+        executor = Executor.of(client)
+        for result in self.batches():
+            await executor.run(QueryMethod.EXECUTE, result, self)
+
+
+class InsertManyQueryBuilder(BulkQueryBuilderBase[T]):
+    """
+    Inserts many rows in one statement, `for row in json_array_unpack(<json>$rows) union (insert ...)`.
+    Columns are keys of rows unless `fields` are given, and types of them are inferred like `add_field`.
+    Every row must have all columns, models have values of every field including defaults.
+    `id` of models is left to the database unless it is one of `fields`.
+    """
+
+    type = "INSERT_MANY"
+
+    _unless_conflict: t.Optional[t.List[str]]
+    _conflict_update: t.Optional[t.List[str]]
+
+    def __init__(
+        self,
+        cls: t.Type[T],
+        rows: t.Iterable[Row] = (),
+        fields: t.Optional[t.Sequence[t.Union[EdgeGraphField, str]]] = None,
+        db_types: t.Optional[t.Mapping[str, EdgeDBType]] = None,
+    ):
+        super().__init__(cls)
+        self._unless_conflict = None
+        self._conflict_update = None
+
+        rows = list(rows)
+        if fields is None:
+            names = sorted({name for row in rows for name in row_columns(row)})
+        else:
+            names = [
+                field.name if isinstance(field, EdgeGraphField) else field
+                for field in fields
+            ]
+
+        for name in names:
+            self._columns[name] = bulk_column(
+                cls, name, db_types.get(name) if db_types is not None else None
+            )
+
+        self.add_rows(rows)
+
+    def unless_conflict(
+        self,
+        *fields: t.Union[str, EdgeGraphField],
+        update: t.Optional[t.Sequence[t.Union[str, EdgeGraphField]]] = None,
+    ):
+        """
+        Skip rows which conflict on `fields`, or update `update` fields of conflicting objects with rows.
+        """
+        new_fields = []
+        for field in fields:
+            if isinstance(field, str):
+                new_fields.append(field[1:] if field.startswith(".") else field)
+            elif isinstance(field, EdgeGraphField):
+                new_fields.append(field.name)
+            else:
+                raise TypeError("Fields can be str or EdgeGraphField.")
+
+        if self._unless_conflict is None:
+            self._unless_conflict = new_fields
+        else:
+            self._unless_conflict.extend(new_fields)
+
+        if update is not None:
+            update_fields = [
+                field.name if isinstance(field, EdgeGraphField) else field
+                for field in update
+            ]
+            for field_name in update_fields:
+                if field_name not in self._columns:
+                    raise ConditionValidationError(
+                        field_name, "Only columns of rows can be updated on conflict."
+                    )
+
+            self._conflict_update = sorted(update_fields)
+
+        self._changed()
+        return self
+
+    def _encode_row(self, row: t.Any) -> t.Dict[str, t.Any]:
+        # a missing key is inserted as an empty set, which overwrites the database default.
+        values = row_values(row)
+        for name in self._columns:
+            if name not in values:
+                raise ConditionValidationError(
+                    name, "Every row must have values of all columns to insert."
+                )
+
+        return super()._encode_row(values)
+
+    def collect(
+        self,
+        prefix: str,
+        structure: t.List[t.Hashable],
+        arguments: t.Dict[str, t.Any],
+    ) -> None:
+        super().collect(prefix, structure, arguments)
+        structure.append(
+            (
+                tuple(sorted(self._unless_conflict))
+                if self._unless_conflict is not None
+                else None,
+                tuple(self._conflict_update)
+                if self._conflict_update is not None
+                else None,
+            )
+        )
+
+    def emit(self, writer: QueryWriter, prefix: str = "") -> None:
+        qualified_name = self.base_type.__model_metadata__.qualified_name
+        rows_key = self._rows_key(prefix)
+        writer.arguments[rows_key] = payload(self._encoded)
+
+        writer.write(
+            "for ",
+            ROW_VARIABLE,
+            " in json_array_unpack(<json>$",
+            rows_key,
+            ") union (\n",
+        )
+        writer.write("insert ", qualified_name, " {\n")
+        for name in sorted(self._columns):
+            writer.write(name, " := ")
+            self._columns[name].emit(writer)
+            writer.write(",\n")
+        writer.write("}\n")
+
+        if self._unless_conflict is not None:
+            unless_conflicts = ", ".join(f".{x}" for x in sorted(self._unless_conflict))
+            writer.write("unless conflict on (", unless_conflicts, ")\n")
+
+            if self._conflict_update is not None:
+                writer.write("else (\n", "update ", qualified_name, " set {\n")
+                for name in self._conflict_update:
+                    writer.write(name, " := ")
+                    self._columns[name].emit(writer)
+                    writer.write(",\n")
+                writer.write("}\n)\n")
+
+        writer.write(")\n")
+
+
+class UpdateManyQueryBuilder(BulkQueryBuilderBase[T]):
+    """
+    Updates many objects with their own values in one statement.
+    Each row is `(id or model, {field: value})`, and fields which are not in a row keep their values.
+    """
+
+    type = "UPDATE_MANY"
+
+    _assign: t.Dict[str, AssignType]
+
+    def __init__(
+        self,
+        cls: t.Type[T],
+        rows: t.Iterable[UpdateRow] = (),
+        fields: t.Optional[t.Sequence[t.Union[EdgeGraphField, str]]] = None,
+        db_types: t.Optional[t.Mapping[str, EdgeDBType]] = None,
+        assign: t.Optional[t.Mapping[str, AssignType]] = None,
+    ):
+        super().__init__(cls)
+        self._max_rows = DEFAULT_UPDATE_BATCH_ROWS
+        self._assign = {}
+
+        rows = list(rows)
+        if fields is None:
+            names = sorted({name for (_, values) in rows for name in values})
+        else:
+            names = [
+                field.name if isinstance(field, EdgeGraphField) else field
+                for field in fields
+            ]
+
+        for name in names:
+            if name == "id":
+                raise ConditionValidationError(
+                    name, "id of objects to update can't be updated."
+                )
+
+            column = bulk_column(
+                cls, name, db_types.get(name) if db_types is not None else None
+            )
+            self._columns[name] = column
+
+            # AssignType.APPEND or AssignType.REMOVE are for multi links only.
+            field_assign = (assign or {}).get(name, AssignType.ASSIGN)
+            if not (column.metadata.is_link and column.metadata.is_multi):
+                field_assign = AssignType.ASSIGN
+            self._assign[name] = field_assign
+
+        self.add_rows(rows)
+
+    def _encode_row(self, row: t.Any) -> t.Dict[str, t.Any]:
+        (target, values) = row
+        if isinstance(target, BaseModel):
+            target = getattr(target, "id", None)
+
+        if not isinstance(target, uuid.UUID):
+            raise ConditionValidationError(
+                self.base_type.__name__,
+                "Objects to update can be given with models or ids of them.",
+            )
+
+        encoded = super()._encode_row(values)
+        encoded["id"] = target
+        return encoded
+
+    def collect(
+        self,
+        prefix: str,
+        structure: t.List[t.Hashable],
+        arguments: t.Dict[str, t.Any],
+    ) -> None:
+        super().collect(prefix, structure, arguments)
+        structure.append(tuple(sorted(self._assign.items())))
+
+    def emit(self, writer: QueryWriter, prefix: str = "") -> None:
+        qualified_name = self.base_type.__model_metadata__.qualified_name
+        rows_key = self._rows_key(prefix)
+        writer.arguments[rows_key] = payload(self._encoded)
+
+        writer.write(
+            "for ",
+            ROW_VARIABLE,
+            " in json_array_unpack(<json>$",
+            rows_key,
+            ") union (\n",
+        )
+        writer.write("update ", qualified_name, "\n")
+        writer.write("filter .id = <uuid>json_get(", ROW_VARIABLE, ", 'id')\n")
+        writer.write("set {\n")
+
+        for name in sorted(self._columns):
+            column = self._columns[name]
+            assign = self._assign[name]
+            writer.write(name, " ", assign.value, " ")
+
+            # appending or removing nothing is same as keeping, assigning needs the current value.
+            if assign != AssignType.ASSIGN:
+                column.emit(writer)
+            else:
+                writer.write("(")
+                column.emit(writer)
+                writer.write(
+                    " if exists json_get(",
+                    ROW_VARIABLE,
+                    ", '",
+                    name,
+                    "') else .",
+                    name,
+                    ")",
+                )
+            writer.write(",\n")
+
+        writer.write("}\n)\n")
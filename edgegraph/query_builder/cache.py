@@ -0,0 +1,249 @@
+import threading
+import time
+import typing as t
+from collections import OrderedDict
+from collections.abc import Mapping
+
+
+class CacheInfo(t.NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class QueryTemplateCache:
+    """
+    LRU cache of built query text, keyed on the structural fingerprint of a query builder.
+    On a hit, the builder only collects its arguments and reuses the cached query text.
+    """
+
+    _templates: "OrderedDict[t.Hashable, str]"
+    _lock: threading.Lock
+    maxsize: int
+    hits: int
+    misses: int
+
+    def __init__(self, maxsize: int = 1024):
+        self._templates = OrderedDict()
+        self._lock = threading.Lock()
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, fingerprint: t.Hashable) -> t.Optional[str]:
+        with self._lock:
+            query = self._templates.get(fingerprint)
+            if query is None:
+                self.misses += 1
+                return None
+
+            self._templates.move_to_end(fingerprint)
+            self.hits += 1
+            return query
+
+    def put(self, fingerprint: t.Hashable, query: str) -> None:
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._templates[fingerprint] = query
+            self._templates.move_to_end(fingerprint)
+
+            while len(self._templates) > self.maxsize:
+                self._templates.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._templates.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(
+            hits=self.hits,
+            misses=self.misses,
+            maxsize=self.maxsize,
+            currsize=len(self._templates),
+        )
+
+
+class ResultCacheInfo(t.NamedTuple):
+    hits: int
+    misses: int
+    # entries dropped by size limit, by TTL, and by writes to their types.
+    evictions: int
+    expirations: int
+    invalidations: int
+    maxsize: int
+    currsize: int
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+
+class _ResultEntry(t.NamedTuple):
+    value: t.Any
+    expires_at: t.Optional[float]
+    dependencies: t.FrozenSet[str]
+
+
+class ResultCache:
+    """
+    LRU cache of query results, keyed on the query text and its canonicalized arguments.
+    Each entry remembers the types (`module::Type`) its query reads, and is dropped when they are written.
+    Cached results are shared between callers, so they must not be modified.
+
+    Each type has a generation which is increased when it is written.
+    Take `generations` before a read, and `put` skips its result if one of them changed while reading.
+    """
+
+    _entries: "OrderedDict[t.Hashable, _ResultEntry]"
+    _by_type: t.Dict[str, t.Set[t.Hashable]]
+    _generations: t.Dict[str, int]
+    _lock: threading.Lock
+    maxsize: int
+    ttl: t.Optional[float]
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: t.Optional[float] = None,
+        clock: t.Callable[[], float] = time.monotonic,
+    ):
+        self._entries = OrderedDict()
+        self._by_type = {}
+        self._generations = {}
+        self._lock = threading.Lock()
+        self._clock: t.Callable[[], float] = clock
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._reset_counters()
+
+    def _reset_counters(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: t.Hashable) -> t.Tuple[bool, t.Any]:
+        """
+        Returns whether the key is cached and its value, because None is also a result.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (
+                entry.expires_at is not None and entry.expires_at <= self._clock()
+            ):
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return (False, None)
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return (True, entry.value)
+
+    def generations(self, types: t.Iterable[str]) -> t.Dict[str, int]:
+        with self._lock:
+            return {x: self._generations.get(x, 0) for x in types}
+
+    def put(
+        self,
+        key: t.Hashable,
+        value: t.Any,
+        dependencies: t.FrozenSet[str],
+        generations: t.Optional[t.Mapping[str, int]] = None,
+    ) -> None:
+        if self.maxsize <= 0:
+            return
+
+        expires_at = self._clock() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            # the result was read before a write to its types, so it may be stale.
+            if generations is not None and any(
+                self._generations.get(x, 0) != generation
+                for (x, generation) in generations.items()
+            ):
+                return
+
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = _ResultEntry(value, expires_at, dependencies)
+            for dependency in dependencies:
+                self._by_type.setdefault(dependency, set()).add(key)
+
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, types: t.Iterable[str]) -> None:
+        with self._lock:
+            for type_name in types:
+                self._generations[type_name] = self._generations.get(type_name, 0) + 1
+                for key in list(self._by_type.get(type_name, ())):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def _remove(self, key: t.Hashable) -> None:
+        entry = self._entries.pop(key)
+        for dependency in entry.dependencies:
+            keys = self._by_type[dependency]
+            keys.discard(key)
+            if len(keys) == 0:
+                del self._by_type[dependency]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_type.clear()
+            self._reset_counters()
+
+    def info(self) -> ResultCacheInfo:
+        return ResultCacheInfo(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            expirations=self.expirations,
+            invalidations=self.invalidations,
+            maxsize=self.maxsize,
+            currsize=len(self._entries),
+        )
+
+
+def canonical(value: t.Any) -> t.Hashable:
+    """
+    Hashable form of an argument, which is equal for equal arguments.
+    Raises TypeError if the argument can't be hashed.
+    """
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(canonical(x) for x in value))
+
+    if isinstance(value, Mapping):
+        return (
+            "dict",
+            tuple(sorted((key, canonical(x)) for (key, x) in value.items())),
+        )
+
+    if isinstance(value, (set, frozenset)):
+        return ("set", frozenset(canonical(x) for x in value))
+
+    hash(value)
+    # True == 1, so values of different types are not mixed.
+    return (type(value).__name__, value)
+
+
+# process-wide cache used by every QueryBuilder.build()
+template_cache = QueryTemplateCache()
@@ -0,0 +1,237 @@
+import asyncio
+import functools
+import typing as t
+from enum import Enum
+
+from edgegraph.query_builder.cache import ResultCache, canonical
+from edgegraph.types import Cardinality, QueryResult
+
+if t.TYPE_CHECKING:
+    from edgegraph.query_builder.base import QueryBuilderBase
+
+
+class AsyncQueryable(t.Protocol):
+    """
+    Methods of `edgedb.AsyncIOClient` used by the executor. Transactions and in-memory stand-ins also work.
+    """
+
+    async def query(self, query: str, *args, **kwargs) -> t.Any:
+        ...
+
+    async def query_single(self, query: str, *args, **kwargs) -> t.Any:
+        ...
+
+    async def query_required_single(self, query: str, *args, **kwargs) -> t.Any:
+        ...
+
+    async def query_json(self, query: str, *args, **kwargs) -> str:
+        ...
+
+    async def query_single_json(self, query: str, *args, **kwargs) -> str:
+        ...
+
+    async def execute(self, commands: str, *args, **kwargs) -> None:
+        ...
+
+
+class Dependent(t.Protocol):
+    """
+    Source of a query which knows types it reads and writes, like query builders.
+    """
+
+    def dependencies(self) -> t.FrozenSet[str]:
+        ...
+
+    def writes(self) -> t.FrozenSet[str]:
+        ...
+
+
+class TypeValidator(t.Protocol):
+    """
+    Validates models of types on their first use, like `SchemaValidator` in lazy mode.
+    """
+
+    async def validate_types(self, types: t.AbstractSet[str]) -> None:
+        ...
+
+
+# validator which types of every query are validated with before it runs
+_type_validator: t.Optional[TypeValidator] = None
+
+
+def set_type_validator(validator: t.Optional[TypeValidator]) -> None:
+    """
+    Set the validator of this process, which types read or written by builders are validated with before running.
+    """
+    global _type_validator
+    _type_validator = validator
+
+
+def get_type_validator() -> t.Optional[TypeValidator]:
+    return _type_validator
+
+
+class QueryMethod(Enum):
+    QUERY = "query"
+    QUERY_SINGLE = "query_single"
+    QUERY_REQUIRED_SINGLE = "query_required_single"
+    QUERY_JSON = "query_json"
+    QUERY_SINGLE_JSON = "query_single_json"
+    EXECUTE = "execute"
+
+
+class Executor:
+    """
+    Runs queries of builders on the client.
+    Every query goes through `run`, so caching and instrumentation are added only here.
+
+    With a result cache, results of queries which only read are cached,
+    and queries which insert or update types drop cached results depending on those types.
+
+    With coalescing, identical reads which are running at the same time are sent only once,
+    and every caller awaits the same result. Writes are never coalesced.
+
+    With a type validator set by `set_type_validator`, models of types used by a query are validated before it runs.
+    """
+
+    client: AsyncQueryable
+    cache: t.Optional[ResultCache]
+    coalesce: bool
+    # reads sent to the client while coalescing, and reads which awaited one of them.
+    flights: int
+    merged: int
+
+    _in_flight: t.Dict[t.Hashable, "asyncio.Future[t.Any]"]
+
+    def __init__(
+        self,
+        client: AsyncQueryable,
+        cache: t.Optional[ResultCache] = None,
+        coalesce: bool = False,
+    ):
+        self.client = client
+        self.cache = cache
+        self.coalesce = coalesce
+        self.flights = 0
+        self.merged = 0
+        self._in_flight = {}
+
+    @classmethod
+    def of(cls, client: t.Union["Executor", AsyncQueryable]) -> "Executor":
+        if isinstance(client, Executor):
+            return client
+
+        return cls(client)
+
+    async def run(
+        self,
+        method: QueryMethod,
+        result: QueryResult,
+        source: t.Optional[Dependent] = None,
+    ) -> t.Any:
+        if _type_validator is not None and source is not None:
+            await _type_validator.validate_types(
+                source.dependencies() | source.writes()
+            )
+
+        if source is None or (self.cache is None and not self.coalesce):
+            return await self._query(method, result)
+
+        writes = source.writes()
+        if len(writes) > 0 or method == QueryMethod.EXECUTE:
+            value = await self._query(method, result)
+            if self.cache is not None:
+                self.cache.invalidate(writes)
+            return value
+
+        try:
+            key: t.Optional[t.Hashable] = (
+                method.value,
+                result.query,
+                canonical(result.kwargs),
+            )
+        except TypeError:
+            key = None
+
+        if key is None:
+            return await self._query(method, result)
+
+        if self.cache is not None:
+            (found, value) = self.cache.get(key)
+            if found:
+                return value
+
+        if not self.coalesce:
+            return await self._read(key, method, result, source)
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.merged += 1
+        else:
+            # the read runs in its own task, so cancelling any caller, the first one too, doesn't cancel it.
+            future = asyncio.ensure_future(self._read(key, method, result, source))
+            future.add_done_callback(functools.partial(self._land, key))
+            self._in_flight[key] = future
+            self.flights += 1
+
+        return await asyncio.shield(future)
+
+    def _land(self, key: t.Hashable, future: "asyncio.Future[t.Any]") -> None:
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+
+        # the exception is raised to callers, but nobody may await it when all of them are cancelled.
+        if not future.cancelled():
+            future.exception()
+
+    async def _read(
+        self,
+        key: t.Hashable,
+        method: QueryMethod,
+        result: QueryResult,
+        source: Dependent,
+    ) -> t.Any:
+        if self.cache is None:
+            return await self._query(method, result)
+
+        dependencies = source.dependencies()
+        generations = self.cache.generations(dependencies)
+        value = await self._query(method, result)
+        self.cache.put(key, value, dependencies, generations)
+
+        return value
+
+    async def _query(self, method: QueryMethod, result: QueryResult) -> t.Any:
+        return await getattr(self.client, method.value)(result.query, **result.kwargs)
+
+    async def fetch(self, builder: "QueryBuilderBase") -> t.Any:
+        """
+        Fetch results with the client method matching cardinality of the builder.
+        Returns an object or None if the builder matches at most one object, otherwise a set of objects.
+        """
+        if builder.cardinality == Cardinality.ONE:
+            return await self.run(QueryMethod.QUERY_SINGLE, builder.build(), builder)
+
+        return await self.run(QueryMethod.QUERY, builder.build(), builder)
+
+    async def fetch_json(self, builder: "QueryBuilderBase") -> str:
+        """
+        Fetch results as JSON text, with the client method matching cardinality of the builder.
+        """
+        if builder.cardinality == Cardinality.ONE:
+            return await self.run(
+                QueryMethod.QUERY_SINGLE_JSON, builder.build(), builder
+            )
+
+        return await self.run(QueryMethod.QUERY_JSON, builder.build(), builder)
+
+    async def fetch_single(self, builder: "QueryBuilderBase") -> t.Any:
+        return await self.run(QueryMethod.QUERY_SINGLE, builder.build(), builder)
+
+    async def fetch_required_single(self, builder: "QueryBuilderBase") -> t.Any:
+        return await self.run(
+            QueryMethod.QUERY_REQUIRED_SINGLE, builder.build(), builder
+        )
+
+    async def execute(self, builder: "QueryBuilderBase") -> None:
+        await self.run(QueryMethod.EXECUTE, builder.build(), builder)
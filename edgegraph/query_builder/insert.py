@@ -1,7 +1,5 @@
 import typing as t
 
-from pydantic import BaseModel
-
 from edgegraph.errors import ConditionValidationError, QueryContextMissmatchError
 from edgegraph.expressions.base import Expression
 from edgegraph.query_builder.base import (
@@ -10,9 +8,10 @@ from edgegraph.query_builder.base import (
     QueryBuilderBase,
     QueryFieldType,
     T,
+    check_field_value,
 )
 from edgegraph.reflections import EdgeGraphField
-from edgegraph.types import PrimitiveTypes, QueryResult
+from edgegraph.types import Cardinality, EdgeDBType, QueryWriter
 
 V = t.TypeVar("V")
 
@@ -23,18 +22,20 @@ class InsertQueryBuilder(QueryBuilderBase[T]):
     _unless_conflict: t.Optional[t.List[str]]
     _unless_conflict_else: t.Optional[QueryBuilderBase[T]]
     _fields: t.List[InsertOrUpdateQueryField]
+    _field_names: t.Set[str]
 
     def __init__(self, cls: t.Type[T]):
         super().__init__(cls)
         self._unless_conflict = None
         self._unless_conflict_else = None
         self._fields = []
+        self._field_names = set()
 
     def add_field(
         self,
         field: t.Union[EdgeGraphField[T, V], str],
         value: t.Optional[V] = None,
-        db_type: t.Optional[PrimitiveTypes] = None,
+        db_type: t.Optional[EdgeDBType] = None,
         expression: t.Optional[Expression] = None,
         subquery: t.Optional[Expression] = None,
     ):
@@ -44,57 +45,49 @@ class InsertQueryBuilder(QueryBuilderBase[T]):
                 str(field), "You must specify one of `value`, `expression`, `subquery`."
             )
 
-        # check if `value` is available but, value_type is none
-        if value is not None and db_type is None:
-            raise ConditionValidationError(
-                str(field),
-                "You must specify `value_type` argument if you specify `value`.",
-            )
-
         # First get field_name, type, context type name
         # And also check field is available for this model
         if isinstance(field, str):
             field_name = field
-            try:
-                field_info: EdgeGraphField = getattr(self.base_type, field_name)
-                field_type = field_info.type
-                upper_type_name = field_info.base.__name__
-            except AttributeError:
-                raise ConditionValidationError(
-                    field_name, f"Field does not exist in {self.base_type}."
-                )
         elif isinstance(field, EdgeGraphField):
             field_name = field.name
-            field_type = field.type
-            upper_type_name = field.base.__name__
+        else:
+            raise TypeError("field can be EdgeGraphField or str")
+
+        field_metadata = self.base_type.__model_metadata__.fields.get(field_name)
+        if field_metadata is None:
+            raise ConditionValidationError(
+                field_name, f"Field does not exist in {self.base_type}."
+            )
 
-            try:
-                getattr(self.base_type, field_name)
-            except AttributeError:
+        field_type = field_metadata.annotation
+        upper_type_name = (
+            field.base.__name__
+            if isinstance(field, EdgeGraphField)
+            else field_metadata.base.__name__
+        )
+
+        # check if `value` is available but, db_type is not given or inferred from annotation
+        if value is not None and db_type is None:
+            db_type = field_metadata.db_type
+            if db_type is None:
                 raise ConditionValidationError(
-                    field_name, f"Field does not exist in {self.base_type}."
+                    field_name,
+                    "You must specify `db_type` argument if you specify `value`.",
                 )
-        else:
-            raise TypeError("field can be EdgeGraphField or str")
 
         # check field is available in this model
         if upper_type_name != self.base_type.__name__:
             raise QueryContextMissmatchError(upper_type_name, self.base_type)
 
         # check field already exists.
-        if field_name in [field.name for field in self._fields]:
+        if field_name in self._field_names:
             raise ConditionValidationError(
                 field_name, f"Field already exists in {self.base_type}."
             )
 
         # check field type is correct
-        if value is not None and (
-            not isinstance(value, field_type) or isinstance(value, BaseModel)
-        ):
-            raise ConditionValidationError(
-                field_name,
-                f"Field type is not correct. Expected {field_type}, got {type(value)}",
-            )
+        check_field_value(field_metadata, value)
 
         if value is not None:
             query_field_type = QueryFieldType.VALUE
@@ -118,7 +111,9 @@ class InsertQueryBuilder(QueryBuilderBase[T]):
                 assign_type=AssignType.ASSIGN,
             )
         )
+        self._field_names.add(field_name)
 
+        self._changed()
         return self
 
     def unless_conflict(
@@ -145,47 +140,111 @@ class InsertQueryBuilder(QueryBuilderBase[T]):
         if else_query is not None:
             self._unless_conflict_else = else_query
 
+        self._changed()
         return self
 
-    def build(self, prefix: str = "") -> QueryResult:
-        (module, model_name) = self.base_type.get_schema_config()
-        result_args: t.Dict[str, t.Any] = dict()
+    def nested(self) -> t.Iterable[Expression]:
+        nested = [x.expression for x in self._fields if x.expression is not None]
+        if self._unless_conflict_else is not None:
+            nested.append(self._unless_conflict_else)
+
+        return nested
+
+    def writes(self) -> t.FrozenSet[str]:
+        return super().writes() | {self.qualified_name}
+
+    @property
+    def cardinality(self) -> Cardinality:
+        if self._unless_conflict_else is not None:
+            return self._unless_conflict_else.cardinality
+
+        return Cardinality.ONE
+
+    def collect(
+        self,
+        prefix: str,
+        structure: t.List[t.Hashable],
+        arguments: t.Dict[str, t.Any],
+    ) -> None:
         self._fields.sort(key=lambda x: x.name)
+        if self._unless_conflict is not None:
+            self._unless_conflict.sort()
+
+        structure.append(
+            (
+                self.type,
+                self.base_type,
+                len(self._fields),
+                tuple(self._unless_conflict)
+                if self._unless_conflict is not None
+                else None,
+                self._unless_conflict_else is not None,
+            )
+        )
 
-        # build fields with module/model name
-        query = f"insert {module}::{model_name} {{\n"
         for field in self._fields:
             context_prefix = (
                 f"{prefix}__{field.name}" if len(prefix) > 0 else field.name
             )
+            structure.append(
+                (
+                    field.name,
+                    field.query_field_type,
+                    field.edgedb_type,
+                    field.assign_type,
+                )
+            )
 
             if field.expression is not None:
-                expression = field.expression.build(context_prefix)
-                result_args.update(expression.kwargs)
+                field.expression.collect(context_prefix, structure, arguments)
+            else:
+                arguments[context_prefix] = field.value
+
+        if self._unless_conflict_else is not None:
+            unless_conflict_prefix = (
+                f"{prefix}__unless_conflict" if len(prefix) > 0 else "unless_conflict"
+            )
+            self._unless_conflict_else.collect(
+                unless_conflict_prefix, structure, arguments
+            )
 
+    def emit(self, writer: QueryWriter, prefix: str = "") -> None:
+        self._fields.sort(key=lambda x: x.name)
+
+        # build fields with module/model name
+        writer.write(
+            "insert ", self.base_type.__model_metadata__.qualified_name, " {\n"
+        )
+        for field in self._fields:
+            context_prefix = (
+                f"{prefix}__{field.name}" if len(prefix) > 0 else field.name
+            )
+            writer.write(field.name, " ", field.assign_type.value, " ")
+
+            if field.expression is not None:
                 if field.query_field_type == QueryFieldType.EXPRESSION:
-                    query += (
-                        f"{field.name} {field.assign_type.value} {expression.query},\n"
-                    )
+                    writer.emit(field.expression, context_prefix)
+                    writer.write(",\n")
                 else:
                     # Wrap Subquery
-                    query += f"{field.name} {field.assign_type.value} (\n{expression.query}),\n"
+                    writer.write("(\n")
+                    writer.emit(field.expression, context_prefix)
+                    writer.write("),\n")
 
             else:
                 # already we checked field.value_type before .add_field, but this expression is for type safety.
                 assert field.edgedb_type is not None
-                key = f"{prefix}__{field.name}" if prefix != "" else field.name
-                result_args[key] = field.value
-                query += f"{field.name} {field.assign_type.value} <{field.edgedb_type.value}>${key},\n"
+                writer.arguments[context_prefix] = field.value
+                writer.write("<", field.edgedb_type.value, ">$", context_prefix, ",\n")
 
-        query += "}\n"
+        writer.write("}\n")
 
         # build unless conflict
         if self._unless_conflict is not None:
             self._unless_conflict.sort()
 
             unless_conflicts = ", ".join(map(lambda x: f".{x}", self._unless_conflict))
-            query += f"unless conflict on ({unless_conflicts})\n"
+            writer.write("unless conflict on (", unless_conflicts, ")\n")
 
             if self._unless_conflict_else is not None:
                 unless_conflict_prefix = (
@@ -193,9 +252,6 @@ class InsertQueryBuilder(QueryBuilderBase[T]):
                     if len(prefix) > 0
                     else "unless_conflict"
                 )
-                conflict_else = self._unless_conflict_else.build(unless_conflict_prefix)
-                result_args.update(conflict_else.kwargs)
-
-                query += f"else (\n{conflict_else.query})\n"
-
-        return QueryResult(query=query, kwargs=result_args)
+                writer.write("else (\n")
+                writer.emit(self._unless_conflict_else, unless_conflict_prefix)
+                writer.write(")\n")
@@ -0,0 +1,213 @@
+import asyncio
+import functools
+import typing as t
+import uuid
+
+from edgegraph.errors import ConditionValidationError
+from edgegraph.expressions.side import SideExpression
+from edgegraph.expressions.unpack import UnpackExpression
+from edgegraph.query_builder.executor import AsyncQueryable, Executor
+from edgegraph.query_builder.select import SelectQueryBuilder
+from edgegraph.reflections import EdgeGraphField
+from edgegraph.types import PrimitiveTypes
+
+
+class Loader:
+    """
+    Loads objects of a select query by id.
+    Ids requested within one tick of the event loop are fetched together with one query,
+    and each result is cached in the loader, so create a loader for each request.
+    """
+
+    executor: Executor
+    builder: SelectQueryBuilder
+    max_batch_size: t.Optional[int]
+
+    _cache: t.Dict[uuid.UUID, "asyncio.Future[t.Any]"]
+    # futures are queued with their ids, because `clear` may drop them from the cache before dispatch.
+    _pending: t.List[t.Tuple[uuid.UUID, "asyncio.Future[t.Any]"]]
+    _tasks: t.Set["asyncio.Task[None]"]
+
+    def __init__(
+        self,
+        client: t.Union[Executor, AsyncQueryable],
+        builder: SelectQueryBuilder,
+        max_batch_size: t.Optional[int] = None,
+    ):
+        if max_batch_size is not None and max_batch_size <= 0:
+            raise ConditionValidationError(
+                builder.base_type.__name__, "Batch size must be greater than 0."
+            )
+
+        self.executor = Executor.of(client)
+        self.builder = builder
+        self.max_batch_size = max_batch_size
+        self._cache = {}
+        self._pending = []
+        self._tasks = set()
+
+    def _query(self, ids: t.List[uuid.UUID]) -> SelectQueryBuilder:
+        query = self.builder.copy()
+        query.add_filter(
+            SideExpression(
+                equation="in",
+                origin=EdgeGraphField(query.base_type, "id", uuid.UUID),
+                target=UnpackExpression(ids, PrimitiveTypes.UUID),
+            )
+        )
+        return query
+
+    async def load(self, key: uuid.UUID) -> t.Any:
+        """
+        Load an object of the id, or None if it does not exist.
+        """
+        future = self._cache.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            future.add_done_callback(lambda done: self._evict(key, done))
+            self._cache[key] = future
+            self._pending.append((key, future))
+
+            # ids requested until the loop runs ready callbacks go into the same batch.
+            if len(self._pending) == 1:
+                loop.call_soon(self._dispatch)
+
+        # the future is shared by every caller of the id, so a cancelled caller must not cancel it.
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: t.Iterable[uuid.UUID]) -> t.List[t.Any]:
+        return list(await asyncio.gather(*[self.load(key) for key in keys]))
+
+    def clear(self, key: t.Optional[uuid.UUID] = None) -> None:
+        """
+        Forget cached results, of the id or all of them.
+        """
+        if key is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(key, None)
+
+    def _evict(self, key: uuid.UUID, future: "asyncio.Future[t.Any]") -> None:
+        # failed or cancelled ids are not cached, so they can be loaded again.
+        if not (future.cancelled() or future.exception() is not None):
+            return
+
+        if self._cache.get(key) is future:
+            del self._cache[key]
+
+    def _dispatch(self) -> None:
+        (pending, self._pending) = (self._pending, [])
+        size = self.max_batch_size or len(pending)
+
+        for start in range(0, len(pending), size):
+            keys = [key for (key, _) in pending[start : start + size]]
+            futures = [future for (_, future) in pending[start : start + size]]
+            task = asyncio.get_running_loop().create_task(self._fetch(keys, futures))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            # futures left by a cancelled fetch are cancelled, or callers wait for them forever.
+            task.add_done_callback(functools.partial(_cancel, futures))
+
+    async def _fetch(
+        self, keys: t.List[uuid.UUID], futures: t.List["asyncio.Future[t.Any]"]
+    ) -> None:
+        try:
+            rows = await self._query(keys).fetch(self.executor)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        by_id = {row.id: row for row in rows}
+        for (key, future) in zip(keys, futures):
+            if not future.done():
+                future.set_result(by_id.get(key))
+
+
+class LinkLoader:
+    """
+    Loaders of linked objects, one for each model and link field.
+    Use it to resolve links of many parent objects, like resolvers of GraphQL do, without N+1 queries.
+    """
+
+    executor: Executor
+    max_batch_size: t.Optional[int]
+
+    _builders: t.Dict[t.Tuple[t.Type, str], SelectQueryBuilder]
+    _loaders: t.Dict[t.Tuple[t.Type, str], Loader]
+
+    def __init__(
+        self,
+        client: t.Union[Executor, AsyncQueryable],
+        max_batch_size: t.Optional[int] = None,
+    ):
+        self.executor = Executor.of(client)
+        self.max_batch_size = max_batch_size
+        self._builders = {}
+        self._loaders = {}
+
+    def select(self, field: EdgeGraphField, builder: SelectQueryBuilder):
+        """
+        Set the query which linked objects of the field are selected with.
+        Every field of the linked model is selected by default.
+        """
+        metadata = field.metadata
+        if metadata is None or not metadata.is_link:
+            raise ConditionValidationError(field.name, "Field is not a link.")
+
+        if builder.base_type is not metadata.target:
+            raise ConditionValidationError(
+                field.name, f"Query must select {metadata.target}."
+            )
+
+        self._builders[(field.base, field.name)] = builder
+        self._loaders.pop((field.base, field.name), None)
+        return self
+
+    def of(self, field: EdgeGraphField) -> Loader:
+        key = (field.base, field.name)
+        loader = self._loaders.get(key)
+        if loader is not None:
+            return loader
+
+        metadata = field.metadata
+        if metadata is None or not metadata.is_link or metadata.target is None:
+            raise ConditionValidationError(field.name, "Field is not a link.")
+
+        builder = self._builders.get(key)
+        if builder is None:
+            target = metadata.target
+            builder = SelectQueryBuilder(target)
+            for name in sorted(target.__model_metadata__.fields):
+                builder.add_field(getattr(target, name))
+
+        loader = Loader(self.executor, builder, self.max_batch_size)
+        self._loaders[key] = loader
+        return loader
+
+    async def load(self, field: EdgeGraphField, parent: t.Any) -> t.Any:
+        """
+        Load linked objects of the parent, which has the link selected with ids at least.
+        Returns a list for multi links.
+        """
+        value = getattr(parent, field.name)
+        loader = self.of(field)
+
+        if field.metadata is not None and field.metadata.is_multi:
+            return await loader.load_many(_link_id(x) for x in value or [])
+
+        if value is None:
+            return None
+
+        return await loader.load(_link_id(value))
+
+
+def _cancel(futures: t.List["asyncio.Future[t.Any]"], _: t.Any) -> None:
+    for future in futures:
+        future.cancel()
+
+
+def _link_id(value: t.Any) -> uuid.UUID:
+    return value if isinstance(value, uuid.UUID) else value.id
@@ -0,0 +1,70 @@
+import typing as t
+from collections import ChainMap
+from dataclasses import dataclass, field
+
+from edgegraph.errors import ConditionValidationError
+from edgegraph.types import Placeholder, QueryResult
+
+
+@dataclass(frozen=True)
+class PreparedStatement:
+    """
+    Immutable query compiled from a query builder.
+    Only placeholders are bound on each call, query text and constant arguments are reused.
+    Bound arguments are chained to constants instead of copying them, so binding costs only placeholders.
+    """
+
+    query: str
+    placeholders: t.Tuple[t.Tuple[str, t.Tuple[str, ...]], ...]
+    constants: t.Tuple[t.Tuple[str, t.Any], ...] = field(hash=False)
+    _constants: t.Dict[str, t.Any] = field(
+        init=False, repr=False, hash=False, compare=False
+    )
+
+    def __post_init__(self):
+        # changes to arguments of a bound result only go to its own map, not to constants.
+        object.__setattr__(self, "_constants", dict(self.constants))
+
+    @classmethod
+    def from_result(cls, result: QueryResult) -> "PreparedStatement":
+        placeholders: t.Dict[str, t.List[str]] = {}
+        constants: t.List[t.Tuple[str, t.Any]] = []
+
+        for (key, value) in result.kwargs.items():
+            if isinstance(value, Placeholder):
+                placeholders.setdefault(value.name, []).append(key)
+            else:
+                constants.append((key, value))
+
+        return cls(
+            query=result.query,
+            placeholders=tuple(
+                (name, tuple(keys)) for (name, keys) in placeholders.items()
+            ),
+            constants=tuple(constants),
+        )
+
+    @property
+    def names(self) -> t.Tuple[str, ...]:
+        return tuple(name for (name, _) in self.placeholders)
+
+    def bind(self, **values: t.Any) -> QueryResult:
+        kwargs: t.Dict[str, t.Any] = {}
+
+        for (name, keys) in self.placeholders:
+            if name not in values:
+                raise ConditionValidationError(
+                    name, "Placeholder is not bound in prepared statement."
+                )
+
+            value = values[name]
+            for key in keys:
+                kwargs[key] = value
+
+        if len(values) != len(self.placeholders):
+            unknown = ", ".join(sorted(set(values.keys()) - set(self.names)))
+            raise ConditionValidationError(
+                unknown, "Placeholder does not exist in prepared statement."
+            )
+
+        return QueryResult(self.query, ChainMap(kwargs, self._constants))
@@ -1,7 +1,18 @@
+import copy
 import typing as t
-
+import uuid
+
+from edgegraph.deserializer import (
+    ID_SHAPE,
+    Deserializer,
+    Shape,
+    ShapeField,
+    compile_deserializer,
+)
+from edgegraph.encoding import loads
 from edgegraph.errors import ConditionValidationError, QueryContextMissmatchError
 from edgegraph.expressions.base import Expression
+from edgegraph.expressions.side import SideExpression
 from edgegraph.query_builder.base import (
     BaseQueryField,
     EmptyStrategyType,
@@ -11,8 +22,9 @@ from edgegraph.query_builder.base import (
     SelectQueryField,
     T,
 )
+from edgegraph.query_builder.executor import AsyncQueryable, Executor, QueryMethod
 from edgegraph.reflections import EdgeGraphField
-from edgegraph.types import QueryResult
+from edgegraph.types import Cardinality, PrimitiveTypes, QueryResult, QueryWriter
 
 
 class SelectQueryBuilder(QueryBuilderBase[T]):
@@ -20,8 +32,10 @@ class SelectQueryBuilder(QueryBuilderBase[T]):
     _limit: t.Optional[int]
     _offset: t.Optional[int]
     _order_by: t.Optional[t.Tuple[str, OrderType]]
+    _then_order_by: t.List[t.Tuple[str, OrderType]]
     _empty_strategy: t.Optional[EmptyStrategyType]
     _fields: t.List[SelectQueryField]
+    _field_names: t.Set[str]
     _filters: t.List[Expression]
 
     def __init__(self, cls: t.Type[T]):
@@ -29,16 +43,20 @@ class SelectQueryBuilder(QueryBuilderBase[T]):
         self._limit = None
         self._offset = None
         self._order_by = None
+        self._then_order_by = []
         self._empty_strategy = None
         self._fields = []
+        self._field_names = set()
         self._filters = []
 
     def limit(self, limit: int):
         self._limit = limit
+        self._changed()
         return self
 
     def offset(self, offset: int):
         self._offset = offset
+        self._changed()
         return self
 
     def order(
@@ -50,17 +68,37 @@ class SelectQueryBuilder(QueryBuilderBase[T]):
         field_name = field.name
 
         # check avilable class fields and queries fields
-        available_fields = [
-            *self.base_type.__hints__.keys(),
-            *[field.name for field in self._fields],
-        ]
-        if field_name not in available_fields:
+        if (
+            field_name not in self.base_type.__model_metadata__.fields
+            and field_name not in self._field_names
+        ):
             raise ConditionValidationError(
                 f"Field {field_name} does not exist in {self.base_type}."
             )
 
         self._order_by = (field_name, order)
         self._empty_strategy = empty
+        self._changed()
+        return self
+
+    def then_order(self, field: EdgeGraphField[T, t.Any], order: OrderType):
+        """
+        Order by another field among rows which have the same value of previous order fields.
+        """
+        field_name = field.name
+
+        if self._order_by is None:
+            raise ConditionValidationError(
+                field_name, "then_order can be used only after order."
+            )
+
+        if field_name not in self.base_type.__model_metadata__.fields:
+            raise ConditionValidationError(
+                f"Field {field_name} does not exist in {self.base_type}."
+            )
+
+        self._then_order_by.append((field_name, order))
+        self._changed()
         return self
 
     def add_field(
@@ -91,7 +129,7 @@ class SelectQueryBuilder(QueryBuilderBase[T]):
             )
 
         # Check if field is already in fields
-        if selection_field.name in [f.name for f in self._fields]:
+        if selection_field.name in self._field_names:
             raise ConditionValidationError(
                 selection_field.name, "Field already exists."
             )
@@ -103,133 +141,366 @@ class SelectQueryBuilder(QueryBuilderBase[T]):
                     selection_field.name, "Field.expression does not exist."
                 )
 
-            filtered = [
-                *filter(
-                    lambda f: f[0] == selection_field.name,
-                    self.base_type.__hints__.items(),
-                )
-            ]
-
-            if len(filtered) == 0:
+            field_metadata = self.base_type.__model_metadata__.fields.get(
+                selection_field.name
+            )
+            if field_metadata is None:
                 raise ConditionValidationError(
                     selection_field.name, "Field does not exist."
                 )
 
-            (_, filtered_type) = filtered[0]
-            if selection_field.value_type is None or (
-                filtered_type is not selection_field.value_type
-                and issubclass(t.get_args(filtered_type)[0], selection_field.value_type)
+            if (
+                selection_field.value_type is None
+                or field_metadata.annotation != selection_field.value_type
             ):
-                raise QueryContextMissmatchError(filtered_type)
+                raise QueryContextMissmatchError(field_metadata.annotation)
         elif selection_field.query_field_type == QueryFieldType.EXPRESSION:
             if selection_field.expression is None:
                 raise ConditionValidationError(
                     selection_field.name, "Field.expression does not exist."
                 )
         else:
-            available_fields = self.base_type.__hints__.keys()
-            if selection_field.name not in available_fields:
+            if selection_field.name not in self.base_type.__model_metadata__.fields:
                 raise ConditionValidationError(
                     f"Field {selection_field.name} does not exist in {self.base_type}."
                 )
 
         self._fields.append(selection_field)
+        self._field_names.add(selection_field.name)
+        self._changed()
         return self
 
     def add_filter(self, expr: Expression):
         if expr in self._filters:
             raise ConditionValidationError(str(expr), "Filter already exists.")
         self._filters.append(expr)
+        self._changed()
         return self
 
-    def build(self, prefix: str = "") -> QueryResult:
-        arguments: t.Dict[str, t.Any] = {}
-        (module, model_name) = self.base_type.get_schema_config()
+    def nested(self) -> t.Iterable[Expression]:
+        nested = [x.expression for x in self._fields if x.expression is not None]
+        nested.extend(self._filters)
+        return nested
+
+    @property
+    def cardinality(self) -> Cardinality:
+        if self._limit == 1 or any(filt.is_exclusive() for filt in self._filters):
+            return Cardinality.ONE
 
+        return Cardinality.MANY
+
+    def collect(
+        self,
+        prefix: str,
+        structure: t.List[t.Hashable],
+        arguments: t.Dict[str, t.Any],
+    ) -> None:
         self._fields.sort(key=lambda f: f.name)
-        self._filters.sort()
 
-        # build selected fields with module/model name
-        query = f"select {module}::{model_name} {{\n"
-        for field in self._fields:
-            keyword_prefix = (
-                field.name if len(prefix) == 0 else f"{prefix}__{field.name}"
+        structure.append(
+            (
+                self.type,
+                self.base_type,
+                len(self._fields),
+                len(self._filters),
+                self._order_by,
+                tuple(self._then_order_by),
+                self._empty_strategy,
+                self._offset,
+                self._limit,
             )
+        )
+        self._collect_fields(prefix, structure, arguments)
 
-            if field.query_field_type == QueryFieldType.SUBQUERY:
-                if field.expression is None:
-                    raise ConditionValidationError(
-                        field.name, "Field.expression does not exist."
-                    )
+        for idx, filt in enumerate(self._filters):
+            filter_prefix = (
+                f"filter_{idx}" if len(prefix) == 0 else f"{prefix}__filter_{idx}"
+            )
+            filt.collect(filter_prefix, structure, arguments)
 
-                if not isinstance(field.expression, SelectQueryBuilder):
-                    raise ConditionValidationError(
-                        field.name, "Field.expression must be SelectQueryBuilder"
-                    )
+    def collect_shape(
+        self,
+        prefix: str,
+        structure: t.List[t.Hashable],
+        arguments: t.Dict[str, t.Any],
+    ) -> None:
+        structure.append(("SHAPE", self.base_type, len(self._fields)))
+        self._collect_fields(prefix, structure, arguments)
+
+    def _collect_fields(
+        self,
+        prefix: str,
+        structure: t.List[t.Hashable],
+        arguments: t.Dict[str, t.Any],
+    ) -> None:
+        for field in self._fields:
+            structure.append((field.name, field.query_field_type))
+            if field.query_field_type == QueryFieldType.NONE:
+                continue
 
-                subquery_shape = field.expression.build_shape(keyword_prefix)
-                arguments.update(subquery_shape.kwargs)
-                query += f"{field.name}: {subquery_shape.query},"
-                query += "\n"
+            field_prefix = f"{prefix}__{field.name}" if len(prefix) > 0 else field.name
 
+            # invalid fields are not collected, they raise errors when rendering.
+            if field.query_field_type == QueryFieldType.SUBQUERY:
+                if isinstance(field.expression, SelectQueryBuilder):
+                    field.expression.collect_shape(field_prefix, structure, arguments)
+                else:
+                    structure.append(None)
             elif field.query_field_type == QueryFieldType.EXPRESSION:
-                if field.expression is None:
-                    raise ConditionValidationError(
-                        field.name, "Field.expression does not exist."
-                    )
+                if field.expression is not None:
+                    field.expression.collect(field_prefix, structure, arguments)
+                else:
+                    structure.append(None)
 
-                expression = field.expression.build(keyword_prefix)
-                arguments.update(expression.kwargs)
-                query += f"{field.name}: {expression.kwargs},\n"
-
-            else:
-                query += f"{field.name},\n"
+    def emit(self, writer: QueryWriter, prefix: str = "") -> None:
+        self._fields.sort(key=lambda f: f.name)
 
-        query += "}\n"
+        # build selected fields with module/model name
+        writer.write("select ", self.base_type.__model_metadata__.qualified_name, " ")
+        self.emit_shape(writer, prefix)
+        writer.write("\n")
 
         # build filters
         if len(self._filters) > 0:
-            query += "filter "
+            writer.write("filter ")
 
+            # filters are grouped, or `or` in one of them takes the others as its operand.
+            grouped = len(self._filters) > 1
             for idx, filt in enumerate(self._filters):
                 filter_prefix = (
-                    f"filter_{id(filt)}"
-                    if len(prefix) == 0
-                    else f"{prefix}__filter_{id(filt)}"
+                    f"filter_{idx}" if len(prefix) == 0 else f"{prefix}__filter_{idx}"
                 )
 
-                filter_result = filt.build(filter_prefix)
-                arguments.update(filter_result.kwargs)
-                query += f"{filter_result.query}"
+                if grouped:
+                    writer.write("(")
+                filt.emit(writer, filter_prefix)
+                if grouped:
+                    writer.write(")")
 
                 if (idx + 1) != len(self._filters):
-                    query += " AND "
+                    writer.write(" AND ")
 
-            query += "\n"
+            writer.write("\n")
 
         # build order by
         if self._order_by:
             field_name, order = self._order_by
-            query += f"order by {field_name} {str(order.value).lower()}"
+            writer.write("order by ", field_name, " ", str(order.value).lower())
             if self._empty_strategy:
-                query += f" empty {str(self._empty_strategy.value).lower()}"
-            query += "\n"
+                writer.write(" empty ", str(self._empty_strategy.value).lower())
+            for (field_name, order) in self._then_order_by:
+                writer.write(" then ", field_name, " ", str(order.value).lower())
+            writer.write("\n")
 
         # build limit and offset
         if self._offset is not None:
-            query += f"offset {self._offset}"
-            query += "\n"
+            writer.write("offset ", str(self._offset), "\n")
 
         if self._limit is not None:
-            query += f"limit {self._limit}"
-            query += "\n"
+            writer.write("limit ", str(self._limit), "\n")
+
+    def shape(self) -> Shape:
+        """
+        Selected fields and shapes of linked models, in the order of the query.
+        """
+        metadata = self.base_type.__model_metadata__.fields
+        fields = []
 
-        return QueryResult(query, arguments)
+        for field in sorted(self._fields, key=lambda f: f.name):
+            field_metadata = metadata.get(field.name)
+            is_multi = field_metadata is not None and field_metadata.is_multi
+
+            if field.query_field_type == QueryFieldType.SUBQUERY and isinstance(
+                field.expression, SelectQueryBuilder
+            ):
+                fields.append(
+                    ShapeField(
+                        field.name,
+                        is_multi,
+                        field.expression.base_type,
+                        field.expression.shape(),
+                    )
+                )
+            elif (
+                field.query_field_type == QueryFieldType.NONE
+                and field_metadata is not None
+                and field_metadata.target is not None
+            ):
+                fields.append(
+                    ShapeField(field.name, is_multi, field_metadata.target, ID_SHAPE)
+                )
+            else:
+                fields.append(ShapeField(field.name, is_multi))
+
+        return tuple(fields)
+
+    def deserializer(
+        self, trusted: bool = False, from_json: bool = False
+    ) -> Deserializer:
+        """
+        Deserializer of rows selected by this builder. It is compiled once for each shape.
+        """
+        return compile_deserializer(self.base_type, self.shape(), trusted, from_json)
+
+    async def fetch_dicts(self, client: t.Union[Executor, AsyncQueryable]) -> t.Any:
+        """
+        Fetch results with `query_json`, decoded into plain dicts without `edgedb.Object`.
+        """
+        return loads(await Executor.of(client).fetch_json(self))
+
+    async def fetch_models(
+        self,
+        client: t.Union[Executor, AsyncQueryable],
+        trusted: bool = False,
+        from_json: bool = False,
+    ) -> t.Any:
+        """
+        Fetch results converted into models, a model or None when the builder matches at most one object.
+        With `from_json`, results are fetched with `query_json` and decoded straight into models.
+        """
+        if from_json:
+            rows = await self.fetch_dicts(client)
+        else:
+            rows = await Executor.of(client).fetch(self)
+
+        deserializer = self.deserializer(trusted, from_json)
+        if self.cardinality == Cardinality.ONE:
+            return None if rows is None else deserializer(rows)
+
+        return deserializer.many(rows)
+
+    async def stream(
+        self, client: t.Union[Executor, AsyncQueryable], batch_size: int = 1000
+    ) -> t.AsyncIterator[t.Any]:
+        """
+        Iterate all results, fetching `batch_size` rows per query.
+        Pages are split by keyset of the order field and `id`, instead of `offset`.
+        Every page filters rows after the last row of the previous page, so deep pages are as fast as the first one.
+        """
+        if batch_size <= 0:
+            raise ConditionValidationError(
+                "batch_size", "Batch size must be greater than 0."
+            )
+
+        if self._offset is not None or self._limit is not None:
+            raise ConditionValidationError(
+                self.base_type.__name__,
+                "Streaming pages with its own limit, offset and limit can't be used.",
+            )
+
+        if self._empty_strategy is not None or len(self._then_order_by) > 0:
+            raise ConditionValidationError(
+                self.base_type.__name__,
+                "Streaming supports only one order field without empty strategy.",
+            )
+
+        if self._order_by is not None:
+            field_metadata = self.base_type.__model_metadata__.fields.get(
+                self._order_by[0]
+            )
+            if field_metadata is None or field_metadata.optional:
+                raise ConditionValidationError(
+                    self._order_by[0],
+                    "Streaming can be ordered only by a required field of the model.",
+                )
+
+        executor = Executor.of(client)
+        last: t.Any = None
+
+        while True:
+            # the page is the source, so types of it are validated like other reads.
+            page = self._page(last, batch_size)
+            rows = await executor.run(QueryMethod.QUERY, page.build(), page)
+            for row in rows:
+                yield row
+
+            if len(rows) < batch_size:
+                return
+
+            last = rows[-1]
+
+    def copy(self) -> "SelectQueryBuilder":
+        """
+        Copy of this builder, which fields and filters can be added to without changing this one.
+        """
+        copied = copy.copy(self)
+        copied._fields = list(self._fields)
+        copied._field_names = set(self._field_names)
+        copied._filters = list(self._filters)
+        copied._then_order_by = list(self._then_order_by)
+        copied._changed()
+        return copied
+
+    def _page(self, last: t.Any, batch_size: int) -> "SelectQueryBuilder":
+        page = self.copy()
+        page._limit = batch_size
+
+        id_field: EdgeGraphField = EdgeGraphField(self.base_type, "id", uuid.UUID)
+
+        if self._order_by is None:
+            page._order_by = ("id", OrderType.ASC)
+            page._then_order_by = []
+            if last is not None:
+                page._filters.append(
+                    SideExpression(
+                        equation=">",
+                        origin=id_field,
+                        target=last.id,
+                        target_type=PrimitiveTypes.UUID,
+                    )
+                )
+
+            page._changed()
+            return page
+
+        (field_name, order) = self._order_by
+        order_field = getattr(self.base_type, field_name)
+        page._then_order_by = [("id", OrderType.ASC)]
+
+        # value of the order field is read from the last row.
+        if field_name not in page._field_names:
+            page.add_field(order_field)
+
+        if last is not None:
+            value = getattr(last, field_name)
+            page._filters.append(
+                SideExpression(
+                    equation="or",
+                    origin=SideExpression(
+                        equation=">" if order == OrderType.ASC else "<",
+                        origin=order_field,
+                        target=value,
+                    ),
+                    target=SideExpression(
+                        equation="and",
+                        origin=SideExpression(
+                            equation="=", origin=order_field, target=value
+                        ),
+                        target=SideExpression(
+                            equation=">",
+                            origin=id_field,
+                            target=last.id,
+                            target_type=PrimitiveTypes.UUID,
+                        ),
+                    ),
+                )
+            )
+
+        page._changed()
+        return page
 
     def build_shape(self, prefix: str = "") -> QueryResult:
-        arguments: t.Dict[str, t.Any] = {}
-        query = "{\n"
+        writer = QueryWriter()
+        self.emit_shape(writer, prefix)
+        return writer.result()
+
+    def emit_shape(self, writer: QueryWriter, prefix: str = "") -> None:
+        writer.write("{\n")
         for field in self._fields:
+            if field.query_field_type == QueryFieldType.NONE:
+                writer.write(field.name, ",\n")
+                continue
+
             field_prefix = f"{prefix}__{field.name}" if len(prefix) > 0 else field.name
 
             if field.query_field_type == QueryFieldType.SUBQUERY:
@@ -243,22 +514,17 @@ class SelectQueryBuilder(QueryBuilderBase[T]):
                         field.name, "Field.expression must be SelectQueryBuilder"
                     )
 
-                subquery = field.expression.build_shape(field_prefix)
-                arguments.update(subquery.kwargs)
-                query += f"{field.name}: {subquery.query},"
-                query += "\n"
+                writer.write(field.name, ": ")
+                field.expression.emit_shape(writer, field_prefix)
+                writer.write(",\n")
             elif field.query_field_type == QueryFieldType.EXPRESSION:
                 if field.expression is None:
                     raise ConditionValidationError(
                         field.name, "Field.expression does not exist."
                     )
 
-                expression = field.expression.build(field_prefix)
-                arguments.update(expression.kwargs)
-                query += f"{field.name}: {expression.query},\n"
-            else:
-                query += f"{field.name},\n"
-
-        query += "}"
+                writer.write(field.name, ": ")
+                field.expression.emit(writer, field_prefix)
+                writer.write(",\n")
 
-        return QueryResult(query, arguments)
+        writer.write("}")
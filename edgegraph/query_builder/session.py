@@ -0,0 +1,214 @@
+import typing as t
+
+from edgegraph.errors import ConditionValidationError
+from edgegraph.expressions.base import Expression
+from edgegraph.query_builder.base import QueryBuilderBase
+from edgegraph.query_builder.cache import ResultCache
+from edgegraph.query_builder.executor import (
+    Executor,
+    QueryMethod,
+    get_type_validator,
+)
+from edgegraph.query_builder.insert import InsertQueryBuilder
+from edgegraph.query_builder.update import UpdateQueryBuilder
+from edgegraph.types import Cardinality, QueryResult, QueryWriter
+
+WriteBuilder = t.Union[InsertQueryBuilder, UpdateQueryBuilder]
+
+
+class TransactionalClient(t.Protocol):
+    """
+    `edgedb.AsyncIOClient`, which runs a block in a retrying transaction.
+    """
+
+    def transaction(self) -> t.Any:
+        ...
+
+
+class Session:
+    """
+    Unit of work, which queues insert and update builders and flushes them in one transaction.
+
+    Queued builders are merged into as few statements as possible, each bound by `with`.
+    A queued builder used as a subquery of another one is referred by its name, so it runs only once.
+    A builder which reads types written earlier in the statement starts a new statement,
+    because a statement does not see its own changes.
+    """
+
+    client: TransactionalClient
+    cache: t.Optional[ResultCache]
+
+    _queue: t.List[WriteBuilder]
+
+    def __init__(
+        self, client: TransactionalClient, cache: t.Optional[ResultCache] = None
+    ):
+        self.client = client
+        self.cache = cache
+        self._queue = []
+
+    def add(self, builder: WriteBuilder) -> WriteBuilder:
+        if not isinstance(builder, (InsertQueryBuilder, UpdateQueryBuilder)):
+            raise ConditionValidationError(
+                str(builder), "Only insert or update queries can be queued."
+            )
+
+        if not any(x is builder for x in self._queue):
+            self._queue.append(builder)
+
+        return builder
+
+    def clear(self) -> None:
+        self._queue = []
+
+    def statements(self) -> t.List[t.List[WriteBuilder]]:
+        """
+        Queued builders ordered by their dependencies, and grouped into statements.
+        """
+        queued = {id(x) for x in self._queue}
+        statements: t.List[t.List[WriteBuilder]] = []
+        written: t.Set[str] = set()
+
+        for builder in _ordered(self._queue, queued):
+            if len(statements) == 0 or len(_reads(builder, queued) & written) > 0:
+                statements.append([])
+                written = set()
+
+            statements[-1].append(builder)
+            written |= builder.writes()
+
+        return statements
+
+    def _names(self) -> t.Dict[int, str]:
+        return {id(x): f"w{idx}" for (idx, x) in enumerate(self._queue)}
+
+    def build(
+        self,
+        statement: t.List[WriteBuilder],
+        results: t.Mapping[int, t.Any],
+    ) -> QueryResult:
+        """
+        Build one statement. Queued builders which ran in earlier statements are selected by ids of their results.
+        """
+        writer = QueryWriter()
+        names = self._names()
+
+        writer.write("with\n")
+        for builder in statement:
+            for nested in _queued_nested(builder, names):
+                if id(nested) in writer.aliases or id(nested) not in results:
+                    continue
+
+                name = names[id(nested)]
+                writer.aliases[id(nested)] = name
+                _emit_by_ids(writer, nested, name, results[id(nested)])
+
+            name = names[id(builder)]
+            writer.write(name, " := (\n")
+            builder.emit(writer, name)
+            writer.write("),\n")
+            writer.aliases[id(builder)] = name
+
+        writer.write("select {\n")
+        for builder in statement:
+            writer.write(names[id(builder)], " := ", names[id(builder)], ",\n")
+        writer.write("}\n")
+
+        return writer.result()
+
+    async def flush(self) -> t.List[t.Any]:
+        """
+        Run queued builders in one transaction, and returns their results in the queued order.
+        """
+        statements = self.statements()
+        if len(statements) == 0:
+            return []
+
+        # merged statements have no builder as their source, so types are validated here.
+        validator = get_type_validator()
+        if validator is not None:
+            await validator.validate_types(
+                frozenset().union(*(x.dependencies() | x.writes() for x in self._queue))
+            )
+
+        names = self._names()
+        results: t.Dict[int, t.Any] = {}
+        async for tx in self.client.transaction():
+            async with tx:
+                # the block is run again when the transaction is retried.
+                results = {}
+                for statement in statements:
+                    merged = await Executor(tx).run(
+                        QueryMethod.QUERY_REQUIRED_SINGLE,
+                        self.build(statement, results),
+                    )
+                    for builder in statement:
+                        results[id(builder)] = getattr(merged, names[id(builder)])
+
+        if self.cache is not None:
+            self.cache.invalidate(frozenset().union(*(x.writes() for x in self._queue)))
+
+        flushed = [results[id(x)] for x in self._queue]
+        self._queue = []
+        return flushed
+
+
+def _queued_nested(
+    expression: Expression, queued: t.Container[int]
+) -> t.Iterator[WriteBuilder]:
+    for nested in expression.nested():
+        if id(nested) in queued:
+            yield t.cast(WriteBuilder, nested)
+        else:
+            yield from _queued_nested(nested, queued)
+
+
+def _ordered(
+    queue: t.List[WriteBuilder], queued: t.Container[int]
+) -> t.List[WriteBuilder]:
+    # queued builders used as subqueries come before builders using them.
+    ordered: t.List[WriteBuilder] = []
+    visited: t.Set[int] = set()
+
+    def visit(builder: t.Any) -> None:
+        if id(builder) in visited:
+            return
+
+        visited.add(id(builder))
+        for nested in _queued_nested(builder, queued):
+            visit(nested)
+        ordered.append(builder)
+
+    for builder in queue:
+        visit(builder)
+
+    return ordered
+
+
+def _reads(expression: Expression, queued: t.Container[int]) -> t.FrozenSet[str]:
+    # queued subqueries are referred by their names, so they are not read again.
+    reads = frozenset().union(
+        *(_reads(x, queued) for x in expression.nested() if id(x) not in queued)
+    )
+
+    # inserts only write their type, else queries of them are read as nested ones.
+    # but `unless conflict` reads objects of the type to find conflicts.
+    if isinstance(expression, QueryBuilderBase) and (
+        not isinstance(expression, InsertQueryBuilder)
+        or expression._unless_conflict is not None
+    ):
+        reads |= {expression.qualified_name}
+
+    return reads
+
+
+def _emit_by_ids(
+    writer: QueryWriter, builder: QueryBuilderBase, name: str, result: t.Any
+) -> None:
+    writer.write(name, " := (select ", builder.qualified_name, " filter .id ")
+    if builder.cardinality == Cardinality.ONE:
+        writer.write("= <optional uuid>$", name, "__id),\n")
+        writer.arguments[f"{name}__id"] = result.id if result is not None else None
+    else:
+        writer.write("in array_unpack(<array<uuid>>$", name, "__ids)),\n")
+        writer.arguments[f"{name}__ids"] = [x.id for x in result]
@@ -1,7 +1,5 @@
 import typing as t
 
-from pydantic import BaseModel
-
 from edgegraph.errors import ConditionValidationError, QueryContextMissmatchError
 from edgegraph.expressions.base import Expression
 from edgegraph.query_builder.base import (
@@ -10,10 +8,11 @@ from edgegraph.query_builder.base import (
     QueryBuilderBase,
     QueryFieldType,
     T,
+    check_field_value,
 )
 from edgegraph.query_builder.select import SelectQueryBuilder
 from edgegraph.reflections import EdgeGraphField
-from edgegraph.types import PrimitiveTypes, QueryResult
+from edgegraph.types import Cardinality, EdgeDBType, QueryWriter
 
 V = t.TypeVar("V")
 
@@ -23,12 +22,14 @@ class UpdateQueryBuilder(QueryBuilderBase[T]):
     _target_subquery: t.Optional[SelectQueryBuilder]
     _filters: t.Optional[t.List[Expression]]
     _fields: t.List[InsertOrUpdateQueryField]
+    _field_names: t.Set[str]
 
     def __init__(self, cls: t.Type[T]):
         super().__init__(cls)
         self._target_subquery = None
         self._filters = None
         self._fields = []
+        self._field_names = set()
 
     def set_target(
         self,
@@ -55,6 +56,7 @@ class UpdateQueryBuilder(QueryBuilderBase[T]):
             )
 
         self._target_subquery = subquery
+        self._changed()
         return self
 
     def add_filter(self, expr: Expression):
@@ -72,14 +74,38 @@ class UpdateQueryBuilder(QueryBuilderBase[T]):
             self._filters = []
 
         self._filters.append(expr)
+        self._changed()
         return self
 
+    def nested(self) -> t.Iterable[Expression]:
+        nested = [x.expression for x in self._fields if x.expression is not None]
+        nested.extend(self._filters or [])
+        if self._target_subquery is not None:
+            nested.append(self._target_subquery)
+
+        return nested
+
+    def writes(self) -> t.FrozenSet[str]:
+        return super().writes() | {self.qualified_name}
+
+    @property
+    def cardinality(self) -> Cardinality:
+        if self._target_subquery is not None:
+            return self._target_subquery.cardinality
+
+        if self._filters is not None and any(
+            filt.is_exclusive() for filt in self._filters
+        ):
+            return Cardinality.ONE
+
+        return Cardinality.MANY
+
     def add_field(
         self,
         field: EdgeGraphField[T, V],
         assign: AssignType = AssignType.ASSIGN,
         value: t.Optional[V] = None,
-        db_type: t.Optional[PrimitiveTypes] = None,
+        db_type: t.Optional[EdgeDBType] = None,
         expression: t.Optional[Expression] = None,
         subquery: t.Optional[Expression] = None,
     ):
@@ -90,53 +116,45 @@ class UpdateQueryBuilder(QueryBuilderBase[T]):
                 "You must specify one of `value`, `expression`, `subquery`.",
             )
 
-        # check if `value` is available but, value_type is none
-        if value is not None and db_type is None:
-            raise ConditionValidationError(
-                str(field),
-                "You must specify `value_type` argument if you specify `value`.",
-            )
-
         # First get field_name, type, context type name
         # And also check field is available for this model
         if isinstance(field, EdgeGraphField):
             field_name = field.name
-            field_type = field.type
             upper_type_name = field.base.__name__
+        else:
+            raise TypeError("field can be EdgeGraphField or str")
 
-            try:
-                getattr(self.base_type, field_name)
-            except AttributeError:
+        field_metadata = self.base_type.__model_metadata__.fields.get(field_name)
+        if field_metadata is None:
+            raise ConditionValidationError(
+                field_name, f"Field does not exist in {self.base_type}."
+            )
+
+        field_type = field_metadata.annotation
+
+        # check if `value` is available but, db_type is not given or inferred from annotation
+        if value is not None and db_type is None:
+            db_type = field_metadata.db_type
+            if db_type is None:
                 raise ConditionValidationError(
-                    field_name, f"Field does not exist in {self.base_type}."
+                    field_name,
+                    "You must specify `db_type` argument if you specify `value`.",
                 )
-        else:
-            raise TypeError("field can be EdgeGraphField or str")
 
         # check field is available in this model
         if upper_type_name != self.base_type.__name__:
             raise QueryContextMissmatchError(upper_type_name, self.base_type)
 
         # check field already exists.
-        if field_name in [field.name for field in self._fields]:
+        if field_name in self._field_names:
             raise ConditionValidationError(
                 field_name, f"Field already exists in {self.base_type}."
             )
 
-        # check field_type is typing.Optional[T]
-        if t.get_origin(field_type) is t.Union and type(None) in t.get_args(field_type):
-            field_type = t.get_args(field_type)[0]
-
         # TODO(Hazealign): if type is just and typing.Union[T] what shall we do?
 
-        # check field type is correct
-        if value is not None and (
-            not isinstance(value, field_type) or isinstance(value, BaseModel)
-        ):
-            raise ConditionValidationError(
-                field_name,
-                f"Field type is not correct. Expected {field_type}, got {type(value)}",
-            )
+        # check field type is correct, typing.Optional[T] is checked as T.
+        check_field_value(field_metadata, value)
 
         if value is not None:
             query_field_type = QueryFieldType.VALUE
@@ -164,68 +182,113 @@ class UpdateQueryBuilder(QueryBuilderBase[T]):
                 assign_type=assign,
             )
         )
+        self._field_names.add(field_name)
 
+        self._changed()
         return self
 
-    def build(self, prefix: str = "") -> QueryResult:
-        (module, model_name) = self.base_type.get_schema_config()
-        result_args: t.Dict[str, t.Any] = dict()
+    def collect(
+        self,
+        prefix: str,
+        structure: t.List[t.Hashable],
+        arguments: t.Dict[str, t.Any],
+    ) -> None:
         self._fields.sort(key=lambda x: x.name)
 
-        query = "update "
+        structure.append(
+            (
+                self.type,
+                self.base_type,
+                len(self._fields),
+                len(self._filters) if self._filters is not None else None,
+                self._target_subquery is not None,
+            )
+        )
+
+        if self._target_subquery is not None:
+            target_prefix = f"{prefix}__target" if len(prefix) != 0 else "target"
+            self._target_subquery.collect(target_prefix, structure, arguments)
+
+        if self._filters is not None:
+            for idx, filt in enumerate(self._filters):
+                filter_prefix = (
+                    f"filter_{idx}" if len(prefix) == 0 else f"{prefix}__filter_{idx}"
+                )
+                filt.collect(filter_prefix, structure, arguments)
+
+        for field in self._fields:
+            context_prefix = (
+                f"{prefix}__{field.name}" if len(prefix) > 0 else field.name
+            )
+            structure.append(
+                (
+                    field.name,
+                    field.query_field_type,
+                    field.edgedb_type,
+                    field.assign_type,
+                )
+            )
+
+            if field.expression is not None:
+                field.expression.collect(context_prefix, structure, arguments)
+            else:
+                arguments[context_prefix] = field.value
+
+    def emit(self, writer: QueryWriter, prefix: str = "") -> None:
+        self._fields.sort(key=lambda x: x.name)
+
+        writer.write("update ")
 
         if self._target_subquery is not None:
             target_prefix = f"{prefix}__target" if len(prefix) != 0 else "target"
-            target_subquery = self._target_subquery.build(target_prefix)
-            result_args.update(target_subquery.kwargs)
-            query += f"(\n{target_subquery.query})\n"
+            writer.write("(\n")
+            writer.emit(self._target_subquery, target_prefix)
+            writer.write(")\n")
         else:
-            query += f"{module}::{model_name}\n"
+            writer.write(self.base_type.__model_metadata__.qualified_name, "\n")
 
         if self._filters is not None:
-            query += "filter "
+            writer.write("filter ")
 
+            # filters are grouped, or `or` in one of them takes the others as its operand.
+            grouped = len(self._filters) > 1
             for idx, filt in enumerate(self._filters):
                 filter_prefix = (
-                    f"filter_{id(filt)}"
-                    if len(prefix) == 0
-                    else f"{prefix}__filter_{id(filt)}"
+                    f"filter_{idx}" if len(prefix) == 0 else f"{prefix}__filter_{idx}"
                 )
 
-                filter_result = filt.build(filter_prefix)
-                result_args.update(filter_result.kwargs)
-                query += f"{filter_result.query}"
+                if grouped:
+                    writer.write("(")
+                writer.emit(filt, filter_prefix)
+                if grouped:
+                    writer.write(")")
 
                 if (idx + 1) != len(self._filters):
-                    query += " AND "
+                    writer.write(" AND ")
 
-                query += "\n"
+                writer.write("\n")
 
-        query += "set {\n"
+        writer.write("set {\n")
         for field in self._fields:
-            if field.expression is not None:
-                context_prefix = (
-                    f"{prefix}__{field.name}" if len(prefix) > 0 else field.name
-                )
-
-                expression = field.expression.build(context_prefix)
-                result_args.update(expression.kwargs)
+            context_prefix = (
+                f"{prefix}__{field.name}" if len(prefix) > 0 else field.name
+            )
+            writer.write(field.name, " ", field.assign_type.value, " ")
 
+            if field.expression is not None:
                 if field.query_field_type == QueryFieldType.EXPRESSION:
-                    query += (
-                        f"{field.name} {field.assign_type.value} {expression.query},\n"
-                    )
+                    writer.emit(field.expression, context_prefix)
+                    writer.write(",\n")
                 else:
                     # Wrap Subquery
-                    query += f"{field.name} {field.assign_type.value} (\n{expression.query}),\n"
+                    writer.write("(\n")
+                    writer.emit(field.expression, context_prefix)
+                    writer.write("),\n")
 
             else:
                 # already we checked field.value_type before .add_field, but this expression is for type safety.
                 assert field.edgedb_type is not None
-                key = f"{prefix}__{field.name}" if prefix != "" else field.name
-                result_args[key] = field.value
-                query += f"{field.name} {field.assign_type.value} <{field.edgedb_type.value}>${key},\n"
-
-        query += "}\n"
+                writer.arguments[context_prefix] = field.value
+                writer.write("<", field.edgedb_type.value, ">$", context_prefix, ",\n")
 
-        return QueryResult(query, result_args)
+        writer.write("}\n")
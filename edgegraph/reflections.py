@@ -1,3 +1,5 @@
+import inspect
+import types
 import typing as t
 from dataclasses import dataclass
 
@@ -5,11 +7,15 @@ from pydantic import BaseModel
 from pydantic.typing import resolve_annotations
 
 from edgegraph.errors import CandidateTypeError
+from edgegraph.types import ArrayType, EdgeDBType, infer_primitive_type
 
 ModelMetaclass: t.Type = type(BaseModel)
 Base = t.TypeVar("Base")
 T = t.TypeVar("T")
 
+# default reflection mode for models which don't set `SchemaConfig.lazy`
+_lazy_reflection: bool = False
+
 
 @dataclass(frozen=True)
 class EdgeGraphField(t.Generic[Base, T]):
@@ -17,20 +23,188 @@ class EdgeGraphField(t.Generic[Base, T]):
     name: str
     type: t.Type[T]
 
+    @property
+    def metadata(self) -> t.Optional["FieldMetadata"]:
+        model_metadata = getattr(self.base, "__model_metadata__", None)
+        if model_metadata is None:
+            return None
+
+        return model_metadata.fields.get(self.name)
+
+
+@dataclass(frozen=True)
+class FieldMetadata:
+    name: str
+    # the model which declares this field
+    base: t.Type
+    annotation: t.Any
+    # python type to check values against, `Optional` and generic parameters are removed.
+    check_type: t.Type
+    optional: bool
+    is_link: bool
+    is_multi: bool
+    # linked model when this field is a link
+    target: t.Optional[t.Type["Configurable"]] = None
+    # type to cast values on EdgeDB, inferred from annotation
+    db_type: t.Optional[EdgeDBType] = None
+
+
+@dataclass(frozen=True)
+class ModelMetadata:
+    module: str
+    name: str
+    qualified_name: str
+    fields: t.Mapping[str, FieldMetadata]
+
 
 class Configurable:
     __hints__: t.ClassVar[t.Dict[str, t.Type[t.Any]]]
+    __model_metadata__: t.ClassVar[ModelMetadata]
 
     @classmethod
     def get_schema_config(cls) -> t.Tuple[str, str]:
-        model_name = cls.SchemaConfig.name if cls.SchemaConfig.name else cls.__name__
-        module = cls.SchemaConfig.module
-
-        return module, model_name
+        metadata = cls.__model_metadata__
+        return metadata.module, metadata.name
 
     class SchemaConfig:
         module: str = "default"
         name: str
+        # resolve fields on first use instead of class creation, `None` follows set_lazy_reflection()
+        lazy: t.Optional[bool] = None
+
+
+def _is_model(candidate: t.Any) -> bool:
+    return inspect.isclass(candidate) and issubclass(candidate, Configurable)
+
+
+def _field_metadata(base: t.Type, name: str, annotation: t.Any) -> FieldMetadata:
+    field_type = annotation
+    optional = False
+
+    # unwrap typing.Optional[T]
+    args = t.get_args(field_type)
+    if t.get_origin(field_type) is t.Union and type(None) in args:
+        optional = True
+        args = tuple(arg for arg in args if arg is not type(None))
+        field_type = args[0] if len(args) == 1 else t.Union[args]
+
+    origin = t.get_origin(field_type)
+    if origin in (list, set, frozenset, tuple):
+        item_type = next(iter(t.get_args(field_type)), None)
+        target = item_type if _is_model(item_type) else None
+        item_db_type = infer_primitive_type(item_type)
+        return FieldMetadata(
+            name=name,
+            base=base,
+            annotation=annotation,
+            check_type=origin,
+            optional=optional,
+            is_link=target is not None,
+            is_multi=target is not None,
+            target=target,
+            db_type=ArrayType(item_db_type) if item_db_type is not None else None,
+        )
+
+    if origin is not None:
+        check_type = origin if inspect.isclass(origin) else object
+    else:
+        check_type = field_type if inspect.isclass(field_type) else object
+
+    return FieldMetadata(
+        name=name,
+        base=base,
+        annotation=annotation,
+        check_type=check_type,
+        optional=optional,
+        is_link=_is_model(field_type),
+        is_multi=False,
+        target=field_type if _is_model(field_type) else None,
+        db_type=infer_primitive_type(field_type),
+    )
+
+
+def _model_metadata(
+    cls: t.Type[Configurable], hints: t.Dict[str, t.Any]
+) -> ModelMetadata:
+    module = cls.SchemaConfig.module
+    name = getattr(cls.SchemaConfig, "name", None) or cls.__name__
+
+    # inherited fields first, like pydantic does.
+    fields: t.Dict[str, FieldMetadata] = {}
+    for base in reversed(cls.__mro__[1:]):
+        if "__model_metadata__" in base.__dict__:
+            # lazy bases are reflected here
+            fields.update(getattr(base, "__model_metadata__").fields)
+
+    for (field_name, annotation) in hints.items():
+        if field_name.startswith("_") or t.get_origin(annotation) is t.ClassVar:
+            continue
+
+        fields[field_name] = _field_metadata(cls, field_name, annotation)
+
+    return ModelMetadata(
+        module=module,
+        name=name,
+        qualified_name=f"{module}::{name}",
+        fields=types.MappingProxyType(fields),
+    )
+
+
+def set_lazy_reflection(enabled: bool) -> None:
+    """
+    Set default reflection mode of models, which is applied to models defined after this call.
+    Lazy models resolve annotations and build fields on first attribute access or first builder use.
+    """
+    global _lazy_reflection
+    _lazy_reflection = enabled
+
+
+class _LazyReflection:
+    """
+    Stands in for `__hints__` and `__model_metadata__` until the model is reflected.
+    """
+
+    name: str
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __get__(self, instance: t.Any, owner: t.Type) -> t.Any:
+        reflect(owner)
+        return owner.__dict__[self.name]
+
+
+def is_reflected(cls: t.Type) -> bool:
+    return not isinstance(cls.__dict__.get("__model_metadata__"), _LazyReflection)
+
+
+def reflect(cls: t.Type) -> None:
+    """
+    Resolve annotations of the model, and set EdgeGraphFields and metadata.
+    """
+    if "__model_metadata__" in cls.__dict__ and is_reflected(cls):
+        return
+
+    hints: t.Dict[str, t.Type[t.Any]] = resolve_annotations(
+        cls.__dict__.get("__annotations__", {}),
+        cls.__module__,
+    )
+
+    for name, value in hints.items():
+        # set name and value as tuple
+        # noinspection PyTypeChecker
+        field_value = EdgeGraphField(
+            name=name,
+            type=value,
+            base=cls,
+        )
+
+        # set EdgeGraphField in field namespace
+        setattr(cls, name, field_value)
+
+    cls.__hints__ = hints
+    # metadata is set at last, it marks this model is reflected.
+    cls.__model_metadata__ = _model_metadata(cls, hints)
 
 
 class EdgeMetaclass(ModelMetaclass):  # type: ignore
@@ -46,26 +220,27 @@ class EdgeMetaclass(ModelMetaclass):  # type: ignore
             cls, cls_name, bases, namespace=namespace, **kwargs
         )
 
-        hints: t.Dict[str, t.Type[t.Any]] = resolve_annotations(
-            namespace.get("__annotations__", {}),
-            namespace.get("__module__", None),
-        )
+        lazy = getattr(result_type.SchemaConfig, "lazy", None)
+        if lazy is None:
+            lazy = _lazy_reflection
 
-        for name, value in hints.items():
-            # set name and value as tuple
-            # noinspection PyTypeChecker
-            field_value = EdgeGraphField(
-                name=name,
-                type=value,
-                base=result_type,
+        if lazy:
+            setattr(result_type, "__hints__", _LazyReflection("__hints__"))
+            setattr(
+                result_type, "__model_metadata__", _LazyReflection("__model_metadata__")
             )
+        else:
+            reflect(result_type)
 
-            # set EdgeGraphField in field namespace
-            setattr(result_type, name, field_value)
+        return result_type
 
-        result_type.__hints__ = hints
+    def __getattr__(cls, name: str) -> t.Any:
+        # only called when attribute is not found, fields of lazy models are not set yet.
+        if is_reflected(cls) or name not in cls.__dict__.get("__annotations__", {}):
+            raise AttributeError(name)
 
-        return result_type
+        reflect(cls)
+        return getattr(cls, name)
 
 
 def field(candidate: t.Any) -> EdgeGraphField:
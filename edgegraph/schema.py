@@ -2,7 +2,13 @@ import typing as t
 
 from pydantic import BaseModel
 
-from edgegraph.query_builder.base import SelectQueryField
+from edgegraph.query_builder.base import AssignType, SelectQueryField
+from edgegraph.query_builder.bulk import (
+    InsertManyQueryBuilder,
+    Row,
+    UpdateManyQueryBuilder,
+    UpdateRow,
+)
 from edgegraph.query_builder.insert import InsertQueryBuilder
 from edgegraph.query_builder.select import SelectQueryBuilder
 from edgegraph.query_builder.update import UpdateQueryBuilder
@@ -33,6 +39,23 @@ class EdgeModel(BaseModel, Configurable, metaclass=EdgeMetaclass):
     def insert(cls) -> InsertQueryBuilder:
         return InsertQueryBuilder(cls)
 
+    @classmethod
+    def insert_many(
+        cls,
+        rows: t.Iterable[Row],
+        fields: t.Optional[t.Sequence[t.Union[EdgeGraphField, str]]] = None,
+    ) -> InsertManyQueryBuilder:
+        return InsertManyQueryBuilder(cls, rows, fields)
+
     @classmethod
     def update(cls) -> UpdateQueryBuilder:
         return UpdateQueryBuilder(cls)
+
+    @classmethod
+    def update_many(
+        cls,
+        rows: t.Iterable[UpdateRow],
+        fields: t.Optional[t.Sequence[t.Union[EdgeGraphField, str]]] = None,
+        assign: t.Optional[t.Mapping[str, AssignType]] = None,
+    ) -> UpdateManyQueryBuilder:
+        return UpdateManyQueryBuilder(cls, rows, fields, assign=assign)
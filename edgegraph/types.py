@@ -1,10 +1,52 @@
+import datetime
+import decimal
 import typing as t
+import uuid
+from dataclasses import dataclass
 from enum import Enum
 
 
 class QueryResult(t.NamedTuple):
     query: str
-    kwargs: t.Dict[str, t.Any]
+    kwargs: t.Mapping[str, t.Any]
+
+
+class QueryWriter:
+    """
+    Accumulates query parts and arguments while building, and joins them only once at the end.
+    A writer is passed down to nested expressions, so nested queries are never copied as whole strings.
+    """
+
+    parts: t.List[str]
+    arguments: t.Dict[str, t.Any]
+    # names of nested expressions which are already bound by `with`, keyed by their ids
+    aliases: t.Dict[int, str]
+
+    def __init__(self):
+        self.parts = []
+        self.arguments = {}
+        self.aliases = {}
+
+    def write(self, *parts: str) -> None:
+        self.parts.extend(parts)
+
+    def emit(self, expression: t.Any, prefix: str) -> None:
+        """
+        Write a nested expression, or only its name if it is bound by `with`.
+        """
+        alias = self.aliases.get(id(expression))
+        if alias is not None:
+            self.write(alias)
+        else:
+            expression.emit(self, prefix)
+
+    def result(self) -> QueryResult:
+        return QueryResult("".join(self.parts), self.arguments)
+
+
+class Cardinality(Enum):
+    ONE = "One"
+    MANY = "Many"
 
 
 class PrimitiveTypes(Enum):
@@ -29,3 +71,54 @@ class PrimitiveTypes(Enum):
     LOCAL_TIME = "cal::local_time"
     RELATIVE_DURATION = "cal::relative_duration"
     SEQUENCE = "sequence"
+
+
+@dataclass(frozen=True)
+class ArrayType:
+    element: PrimitiveTypes
+
+    @property
+    def value(self) -> str:
+        return f"array<{self.element.value}>"
+
+
+# types which can be casted in EdgeQL, like `<str>$value` or `<array<str>>$value`
+EdgeDBType = t.Union[PrimitiveTypes, ArrayType]
+
+# python types and their EdgeDB types, subclasses are resolved with their mro.
+PYTHON_PRIMITIVE_TYPES: t.Dict[t.Type, PrimitiveTypes] = {
+    str: PrimitiveTypes.STR,
+    bool: PrimitiveTypes.BOOL,
+    int: PrimitiveTypes.INT64,
+    float: PrimitiveTypes.FLOAT64,
+    decimal.Decimal: PrimitiveTypes.DECIMAL,
+    bytes: PrimitiveTypes.BYTES,
+    uuid.UUID: PrimitiveTypes.UUID,
+    datetime.datetime: PrimitiveTypes.DATETIME,
+    datetime.date: PrimitiveTypes.LOCAL_DATE,
+    datetime.time: PrimitiveTypes.LOCAL_TIME,
+    datetime.timedelta: PrimitiveTypes.DURATION,
+}
+
+
+def infer_primitive_type(python_type: t.Any) -> t.Optional[PrimitiveTypes]:
+    for candidate in getattr(python_type, "__mro__", ()):
+        primitive_type = PYTHON_PRIMITIVE_TYPES.get(candidate)
+        if primitive_type is not None:
+            return primitive_type
+
+    return None
+
+
+@dataclass(frozen=True)
+class Placeholder:
+    """
+    Named value which is bound later by PreparedStatement.bind(...).
+    """
+
+    name: str
+
+
+def placeholder(name: str) -> t.Any:
+    # typed as Any, so it can be passed in place of any value.
+    return Placeholder(name)
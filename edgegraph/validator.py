@@ -1,11 +1,45 @@
 import asyncio
 import typing as t
+from enum import Enum
 
 import edgedb as e
 
 from edgegraph.errors import ValidatedErrorValue, ValidationError
+from edgegraph.introspection import (
+    Introspectable,
+    PointerSnapshot,
+    SchemaSnapshot,
+    SnapshotCache,
+    TypeSnapshot,
+    introspect,
+    latest_migration,
+    model_fingerprint,
+)
+from edgegraph.query_builder.executor import get_type_validator, set_type_validator
+from edgegraph.reflections import FieldMetadata, ModelMetadata
 from edgegraph.schema import EdgeModel
 
+MODEL_ERROR_MESSAGE = "Validation Failure with EdgeDB Inspection."
+INTROSPECTION_ERROR_MESSAGE = "Introspection of EdgeDB failed."
+
+
+class IntrospectionClient(Introspectable, t.Protocol):
+    """
+    `edgedb.AsyncIOClient`, or a stand-in which answers introspection queries.
+    """
+
+    async def aclose(self) -> None:
+        ...
+
+
+class ValidationMode(Enum):
+    # every model is validated in `validate()`
+    EAGER = "eager"
+    # each model is validated when a query of it runs first
+    LAZY = "lazy"
+    # like lazy, and models not used yet are validated in a background task
+    BACKGROUND = "background"
+
 
 class SchemaValidator:
     _edgedb_dsn: str
@@ -20,7 +54,19 @@ class SchemaValidator:
     _tls_security: t.Optional[str]
     _wait_until_available: int
     _timeout: int
-    _client: e.AsyncIOClient
+    _client: t.Optional[IntrospectionClient]
+    _snapshot_cache: t.Optional[str]
+    _schema: t.Optional[SchemaSnapshot]
+    _mode: ValidationMode
+    _on_error: t.Optional[t.Callable[[ValidationError], t.Any]]
+
+    # state of lazy and background modes
+    _by_name: t.Dict[str, t.Type[EdgeModel]]
+    _results: t.Dict[str, t.List[ValidatedErrorValue]]
+    _snapshot: t.Optional[SchemaSnapshot]
+    _types: t.Optional[t.Dict[str, TypeSnapshot]]
+    _lock: t.Optional[asyncio.Lock]
+    _task: t.Optional["asyncio.Task[None]"]
 
     def __init__(
         self,
@@ -38,9 +84,29 @@ class SchemaValidator:
         # currently those features are not implemented
         fail_fast: bool = False,
         check_validation_rules: bool = False,
+        # use this client instead of creating one with options above
+        client: t.Optional[IntrospectionClient] = None,
+        # path of the file which the schema snapshot and validated models are cached in
+        snapshot_cache: t.Optional[str] = None,
+        # validate with this snapshot, like one parsed from .esdl files, without connecting to EdgeDB
+        schema: t.Optional[SchemaSnapshot] = None,
+        # when models are validated, see `ValidationMode`
+        mode: ValidationMode = ValidationMode.EAGER,
+        # errors found in lazy or background mode are passed to this instead of being raised
+        on_error: t.Optional[t.Callable[[ValidationError], t.Any]] = None,
     ):
         self._edgedb_dsn = edgedb_dsn
+        self._snapshot_cache = snapshot_cache
+        self._schema = schema
+        self._mode = mode
+        self._on_error = on_error
         self._models = models
+        self._by_name = {}
+        self._results = {}
+        self._snapshot = None
+        self._types = None
+        self._lock = None
+        self._task = None
         self._fail_fast = fail_fast
         self._check_validation_rules = check_validation_rules
         self._max_concurrency = max_concurrency
@@ -51,45 +117,29 @@ class SchemaValidator:
         self._tls_security = tls_security
         self._wait_until_available = wait_until_available
         self._timeout = timeout
-        self._client = e.create_async_client(
-            dsn=self._edgedb_dsn,
-            max_concurrency=self._max_concurrency,
-            credentials=self._credentials,
-            credentials_file=self._credentials_file,
-            tls_ca=self._tls_ca,
-            tls_ca_file=self._tls_ca_file,
-            tls_security=self._tls_security,
-            wait_until_available=self._wait_until_available,
-            timeout=self._timeout,
-        )
+        self._client = None
+        if schema is None:
+            self._client = client or e.create_async_client(
+                dsn=self._edgedb_dsn,
+                max_concurrency=self._max_concurrency,
+                credentials=self._credentials,
+                credentials_file=self._credentials_file,
+                tls_ca=self._tls_ca,
+                tls_ca_file=self._tls_ca_file,
+                tls_security=self._tls_security,
+                wait_until_available=self._wait_until_available,
+                timeout=self._timeout,
+            )
 
-    async def _inspect_and_validate_outlines(
+    def _validate_outlines(
         self,
-        client: e.AsyncIOClient,
+        snapshot: SchemaSnapshot,
     ) -> t.List[ValidatedErrorValue]:
         outline_error_message = "Validation Failure in Outline Inspection."
 
-        # TODO(Hazealign): Migrate to Query Builder when Query Builder implemented
-        result: e.Set = await client.query(
-            """
-                with module schema select ObjectType {
-                    name
-                } filter
-                    .name not like 'cfg::%' and
-                    .name not like 'std::%' and
-                    .name not like 'sys::%' and
-                    .name not like 'std::%' and
-                    .name not like 'schema::%' and
-                    .abstract = false;
-            """
-        )
-
-        target: t.List[str] = []
-        for model in self._models:
-            (module, name) = model.get_schema_config()
-            target.append(f"{module}::{name}")
+        target = {model.__model_metadata__.qualified_name for model in self._models}
 
-        origin = [x.name for x in result]
+        origin = [x.name for x in snapshot.types if not x.abstract]
         errors = []
 
         if len(origin) != len(target):
@@ -124,32 +174,23 @@ class SchemaValidator:
         self,
         module: str,
         typ: str,
-        result: e.Object,
-        schema: t.Dict[str, t.Any],
+        pointers: t.Mapping[str, PointerSnapshot],
+        metadata: ModelMetadata,
     ) -> t.List[ValidatedErrorValue]:
-        origin = []
-        for link in result.links:
-            if link.name != "__type__":
-                origin.append(link.name)
-
-        for prop in result.properties:
-            if prop.name != "__type__":
-                origin.append(prop.name)
-
-        target = schema["properties"].keys()
+        target = metadata.fields
         errors: t.List[ValidatedErrorValue] = []
 
-        if len(origin) != len(target):
+        if len(pointers) != len(target):
             errors.append(
                 ValidatedErrorValue(
                     module=module,
                     type=typ,
-                    error_message=f"{len(origin)} properties / link found in EdgeDB,"
+                    error_message=f"{len(pointers)} properties / link found in EdgeDB,"
                     f" {len(target)} expected with local schema.",
                 )
             )
 
-        for item in origin:
+        for item in pointers:
             if item not in target:
                 errors.append(
                     ValidatedErrorValue(
@@ -166,11 +207,12 @@ class SchemaValidator:
         self,
         module: str,
         typ: str,
-        links: e.Set,
-        field: t.Tuple[str, t.Dict[str, t.Any]],
+        links: t.Mapping[str, PointerSnapshot],
+        field: FieldMetadata,
     ) -> t.Optional[ValidatedErrorValue]:
-        (field_name, field_info) = field
-        if field_name not in [link.name for link in links]:
+        field_name = field.name
+        link = links.get(field_name)
+        if link is None:
             return ValidatedErrorValue(
                 module=module,
                 type=typ,
@@ -178,29 +220,23 @@ class SchemaValidator:
                 error_message=f"{field_name} not found in target",
             )
 
-        # check cardinality and type
-        for link in links:
-            if field_name == link.name:
-                # check this is defined as array
-                if field_info.get("$ref") is not None:
-                    if str(link.cardinality) != "One":
-                        return ValidatedErrorValue(
-                            module=module,
-                            type=typ,
-                            property=field_name,
-                            error_message=f"{field_name}'s cardinality in EdgeDB is not One, but defined as One",
-                        )
-
-                elif (
-                    field_info.get("type") == "array"
-                    and field_info.get("items", dict()).get("$ref") is not None
-                ) and str(link.cardinality) != "Many":
-                    return ValidatedErrorValue(
-                        module=module,
-                        type=typ,
-                        property=field_name,
-                        error_message=f"{field_name}'s cardinality in EdgeDB is not Many, but defined as Array",
-                    )
+        # check cardinality, and this is defined as array
+        if not field.is_multi:
+            if link.cardinality != "One":
+                return ValidatedErrorValue(
+                    module=module,
+                    type=typ,
+                    property=field_name,
+                    error_message=f"{field_name}'s cardinality in EdgeDB is not One, but defined as One",
+                )
+
+        elif link.cardinality != "Many":
+            return ValidatedErrorValue(
+                module=module,
+                type=typ,
+                property=field_name,
+                error_message=f"{field_name}'s cardinality in EdgeDB is not Many, but defined as Array",
+            )
 
         return None
 
@@ -208,13 +244,13 @@ class SchemaValidator:
         self,
         module: str,
         typ: str,
-        properties: e.Set,
-        field: t.Tuple[str, t.Dict[str, t.Any]],
+        properties: t.Mapping[str, PointerSnapshot],
+        field: FieldMetadata,
     ) -> t.Optional[ValidatedErrorValue]:
         # TODO(Hazealign): Check property type with EdgeDB PrimitiveTypes
 
-        (field_name, field_info) = field
-        if field_name not in [prop.name for prop in properties]:
+        field_name = field.name
+        if field_name not in properties:
             return ValidatedErrorValue(
                 module=module,
                 type=typ,
@@ -222,68 +258,18 @@ class SchemaValidator:
                 error_message=f"{field_name} not found in target",
             )
 
-        # check cardinalities
-        for prop in properties:
-            if field_name == prop.name:
-                # check this is defined as array
-                if field_info.get("$ref") is not None:
-                    if str(prop.cardinality) != "One":
-                        return ValidatedErrorValue(
-                            module=module,
-                            type=typ,
-                            property=field_name,
-                            error_message=f"{field_name}'s cardinality in EdgeDB is not One, but defined as One",
-                        )
-
-                elif (
-                    field_info.get("type") == "array"
-                    and field_info.get("items", dict()).get("$ref") is not None
-                ) and str(prop.cardinality) != "Many":
-                    return ValidatedErrorValue(
-                        module=module,
-                        type=typ,
-                        property=field_name,
-                        error_message=f"{field_name}'s cardinality in EdgeDB is not Many, but defined as Array",
-                    )
-
         return None
 
-    async def _inspect_and_validate_model(
+    def _validate_model(
         self,
-        client: e.AsyncIOClient,
+        types: t.Mapping[str, TypeSnapshot],
         model: t.Type[EdgeModel],
     ) -> t.List[ValidatedErrorValue]:
-        schema = model.schema()
-
-        (module, name) = model.get_schema_config()
-        type_name = f"{module}::{name}"
-
-        # TODO(Hazealign): Migrate to Query Builder when Query Builder implemented
-        result: e.Object = await client.query_single(
-            """
-                with module schema select ObjectType {
-                    name,
-                    abstract,
-                    bases: { name },
-                    links: {
-                        name,
-                        cardinality,
-                        required,
-                        target: { name },
-                    },
-                    properties: {
-                        name,
-                        cardinality,
-                        required,
-                        target: { name },
-                    },
-                    constraints: { name },
-                } filter .name = '{type_name}' limit 1;
-            """.replace(
-                "{type_name}", type_name
-            )
-        )
+        metadata = model.__model_metadata__
+        (module, name) = (metadata.module, metadata.name)
+        type_name = metadata.qualified_name
 
+        result = types.get(type_name)
         if result is None:
             return [
                 ValidatedErrorValue(
@@ -304,24 +290,25 @@ class SchemaValidator:
                 )
             )
 
+        # pointers are indexed by name once, so each field is looked up in constant time.
+        links = {x.name: x for x in result.links if x.name != "__type__"}
+        properties = {x.name: x for x in result.properties}
+
         # check errors in outline
-        error_outlines = self._check_outline_properties(module, name, result, schema)
+        error_outlines = self._check_outline_properties(
+            module, name, {**links, **properties}, metadata
+        )
         if len(error_outlines) > 0:
             return error_outlines
 
-        for (field_name, field_info) in schema["properties"].items():
+        for field in metadata.fields.values():
             # Process as Link
-            if field_info.get("$ref") is not None or (
-                field_info.get("type") == "array"
-                and field_info.get("items").get("$ref") is not None
-            ):
-                property_error = self._check_is_valid_link(
-                    module, name, result.links, (field_name, field_info)
-                )
+            if field.is_link:
+                property_error = self._check_is_valid_link(module, name, links, field)
             # Process as Property
             else:
                 property_error = self._check_is_valid_property(
-                    module, name, result.properties, (field_name, field_info)
+                    module, name, properties, field
                 )
 
             if property_error is not None:
@@ -332,8 +319,19 @@ class SchemaValidator:
     async def validate(self) -> bool:
         """
         Validate all models in the database.
-        We don't use ReflectedModels in this Validation. And uses pydantics schema for Validation.
-        This brings to some advantage for checking referenced types.
+        We don't use ReflectedModels in this Validation. And uses field metadata of each models,
+        which is built once when the model class is created.
+
+        With `snapshot_cache`, the snapshot of the database and fingerprints of valid models are saved in the file.
+        While the database is at the same migration, only changed models are validated again,
+        and validation is skipped if no model is changed.
+
+        With `schema`, models are validated against the given snapshot without EdgeDB.
+
+        In lazy mode, this only checks classes of models and sets this validator as the type validator of executors.
+        Each model is validated before its first query runs, and the result is kept for the process.
+        In background mode, models which are not used yet are validated in a task started here,
+        and errors of them are passed to `on_error`. Outlines are only checked in background mode.
 
         :return: bool - True if all models are valid, otherwise raises ValidationError
         :raise: ValidationError - if any model is invalid
@@ -353,38 +351,180 @@ class SchemaValidator:
                 subclass_errors, "Validation Failure in Model's inheritance."
             )
 
-        # inspect and validate outlines
+        if self._mode != ValidationMode.EAGER:
+            self._by_name = {
+                model.__model_metadata__.qualified_name: model for model in self._models
+            }
+            set_type_validator(self)
+            if self._mode == ValidationMode.BACKGROUND and self._task is None:
+                self._task = asyncio.get_running_loop().create_task(
+                    self._validate_in_background()
+                )
+            return True
+
+        # snapshot and valid models are reused while the database is at the same migration.
+        migration: t.Optional[str] = None
+        cached: t.Optional[SnapshotCache] = None
+        fingerprints: t.Dict[str, str] = {}
+        if self._client is not None and self._snapshot_cache is not None:
+            fingerprints = {
+                model.__model_metadata__.qualified_name: model_fingerprint(model)
+                for model in self._models
+            }
+            migration = await latest_migration(self._client)
+            cached = SnapshotCache.load(self._snapshot_cache)
+            if cached is None or migration is None or cached.migration != migration:
+                cached = None
+            elif cached.models == fingerprints:
+                return True
+
+        if self._schema is not None:
+            snapshot = self._schema
+            validated = {}
+        elif cached is not None:
+            snapshot = cached.snapshot
+            validated = cached.models
+        else:
+            # every type is inspected with one query, and models are checked with it in memory.
+            snapshot = await introspect(t.cast(IntrospectionClient, self._client))
+            validated = {}
+
+        # validate outlines
         # it can check not included types in self._models
-        outline_errors = await self._inspect_and_validate_outlines(client=self._client)
+        outline_errors = self._validate_outlines(snapshot)
         if len(outline_errors) > 0:
             raise ValidationError(
                 outline_errors,
                 "Validation Failure in Outline Inspection with EdgeDB.",
             )
 
-        # use asyncio.gather to run all inspections-validations in parallel.
-        # inspect and validate each models
-        unflatten_errors: t.List[t.List[ValidatedErrorValue]] = list(
-            await asyncio.gather(
-                *[
-                    self._inspect_and_validate_model(client=self._client, model=model)
-                    for model in self._models
-                ]
-            )
-        )
-
-        # flatten errors from each model validation errors
-        errors = [item for sublist in unflatten_errors for item in sublist]
+        # validate each models, which are changed since they are validated.
+        types = {x.name: x for x in snapshot.types}
+        errors: t.List[ValidatedErrorValue] = []
+        valid: t.Dict[str, str] = {}
+        for model in self._models:
+            type_name = model.__model_metadata__.qualified_name
+            fingerprint = fingerprints.get(type_name)
+            if fingerprint is None or validated.get(type_name) != fingerprint:
+                model_errors = self._validate_model(types, model)
+                errors.extend(model_errors)
+                if len(model_errors) > 0 or fingerprint is None:
+                    continue
+
+            valid[type_name] = fingerprint
+
+        if self._snapshot_cache is not None and migration is not None:
+            try:
+                SnapshotCache(migration, snapshot, valid).save(self._snapshot_cache)
+            except OSError:
+                # the cache only saves time of next validation, so failing to write it is not an error.
+                pass
 
         # if errors exists throw it
         if len(errors) > 0:
-            raise ValidationError(errors, "Validation Failure with EdgeDB Inspection.")
+            raise ValidationError(errors, MODEL_ERROR_MESSAGE)
 
         # validation success
         return True
 
+    async def _lazy_types(self) -> t.Dict[str, TypeSnapshot]:
+        # the snapshot is introspected once, even if many queries are waiting for it.
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            if self._types is None:
+                if self._schema is not None:
+                    self._snapshot = self._schema
+                else:
+                    self._snapshot = await introspect(
+                        t.cast(IntrospectionClient, self._client)
+                    )
+                self._types = {x.name: x for x in self._snapshot.types}
+
+        return self._types
+
+    def _report(self, errors: t.List[ValidatedErrorValue], message: str) -> None:
+        error = ValidationError(errors, message)
+        if self._on_error is None:
+            raise error
+
+        self._on_error(error)
+
+    async def validate_types(self, types: t.AbstractSet[str]) -> None:
+        """
+        Validate models of the types which are not validated yet, called by executors in lazy and background modes.
+
+        :raise: ValidationError - if any model of the types is invalid, and `on_error` is not given
+        """
+        pending = [x for x in types if x in self._by_name and x not in self._results]
+        if len(pending) > 0:
+            snapshot_types = await self._lazy_types()
+            found: t.List[ValidatedErrorValue] = []
+            for type_name in pending:
+                # other queries may validate it while the snapshot is introspected.
+                if type_name not in self._results:
+                    self._results[type_name] = self._validate_model(
+                        snapshot_types, self._by_name[type_name]
+                    )
+                    found.extend(self._results[type_name])
+
+            # each error is passed to the callback once.
+            if self._on_error is not None and len(found) > 0:
+                self._report(found, MODEL_ERROR_MESSAGE)
+
+        if self._on_error is None:
+            errors = [error for x in types for error in self._results.get(x, ())]
+            if len(errors) > 0:
+                self._report(errors, MODEL_ERROR_MESSAGE)
+
+    async def _validate_in_background(self) -> None:
+        try:
+            snapshot_types = await self._lazy_types()
+        except Exception as e:
+            # nobody may await the task, so failures of introspection are reported like invalid models.
+            self._report(
+                [ValidatedErrorValue(f"{type(e).__name__}: {e}")],
+                INTROSPECTION_ERROR_MESSAGE,
+            )
+            return
+
+        errors: t.List[ValidatedErrorValue] = []
+
+        try:
+            self._validate_outlines(t.cast(SchemaSnapshot, self._snapshot))
+        except ValidationError as error:
+            errors.extend(error.errors)
+
+        for (type_name, model) in self._by_name.items():
+            if type_name not in self._results:
+                self._results[type_name] = self._validate_model(snapshot_types, model)
+                errors.extend(self._results[type_name])
+
+            # models are checked in memory, so queries can run between each of them.
+            await asyncio.sleep(0)
+
+        if len(errors) > 0:
+            self._report(errors, MODEL_ERROR_MESSAGE)
+
+    async def wait(self) -> None:
+        """
+        Wait until models are validated in background mode.
+
+        :raise: ValidationError - if any model is invalid, and `on_error` is not given
+        """
+        if self._task is not None:
+            await self._task
+
     async def aclose(self):
         """
-        Close the EdgeDB AsyncIOClient
+        Close the EdgeDB AsyncIOClient, and stop validating models lazily
         """
-        await self._client.aclose()
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+        if get_type_validator() is self:
+            set_type_validator(None)
+
+        if self._client is not None:
+            await self._client.aclose()
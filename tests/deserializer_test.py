@@ -0,0 +1,185 @@
+import datetime
+import json
+import typing as t
+import uuid
+
+import pendulum
+import pytest
+from edgedb.datatypes.datatypes import create_object_factory
+from pydantic import ValidationError
+
+import tests.models as m
+from edgegraph.deserializer import _normalize_isoformat
+from edgegraph.query_builder.base import reference
+from edgegraph.reflections import field
+from edgegraph.schema import EdgeModel
+from tests.fakes import RecordingClient
+
+User = create_object_factory(id="property", name="property")
+Memo = create_object_factory(
+    accessable_users="link",
+    created_at="property",
+    created_by="link",
+    id="property",
+    title="property",
+)
+
+
+def memo_select():
+    UserModel = m.UserModel
+    MemoModel = m.MemoModel
+
+    return MemoModel.select(
+        [
+            field(MemoModel.id),
+            field(MemoModel.title),
+            field(MemoModel.created_at),
+            field(MemoModel.accessable_users),
+            reference(
+                field(MemoModel.created_by),
+                subquery=UserModel.select([field(UserModel.id), field(UserModel.name)]),
+            ),
+        ]
+    )
+
+
+def memo_row(title: str = "Some Memo"):
+    created_by = User(uuid.uuid4(), "Some User")
+    return Memo(
+        [User(uuid.uuid4(), None)], pendulum.now(), created_by, uuid.uuid4(), title
+    )
+
+
+def test_trusted_deserializer_converts_nested_rows():
+    row = memo_row()
+    memo = memo_select().deserializer(trusted=True)(row)
+
+    assert isinstance(memo, m.MemoModel)
+    assert memo.id == row.id
+    assert memo.title == "Some Memo"
+    assert isinstance(memo.created_by, m.UserModel)
+    assert memo.created_by.name == "Some User"
+    assert [user.id for user in memo.accessable_users] == [row.accessable_users[0].id]
+    assert memo.__fields_set__ == {
+        "accessable_users",
+        "created_at",
+        "created_by",
+        "id",
+        "title",
+    }
+
+
+def test_deserializer_is_compiled_once_per_shape():
+    assert memo_select().deserializer() is memo_select().deserializer()
+    assert memo_select().deserializer() is not memo_select().deserializer(trusted=True)
+
+
+def test_deserializer_validates_untrusted_rows():
+    UserModel = m.UserModel
+    FullUser = create_object_factory(
+        **{name: "property" for name in sorted(UserModel.__model_metadata__.fields)}
+    )
+
+    def user_row(name: str):
+        values = {
+            "id": uuid.uuid4(),
+            "created_at": pendulum.now(),
+            "updated_at": pendulum.now(),
+            "deleted_at": None,
+            "deleted": False,
+            "email": "user@example.com",
+            "password": "password",
+            "name": name,
+        }
+        return FullUser(*[values[name] for name in sorted(values)])
+
+    builder = UserModel.select(
+        [getattr(UserModel, name) for name in UserModel.__model_metadata__.fields]
+    )
+
+    [user] = builder.deserializer().many([user_row("Some User")])
+    assert user.name == "Some User"
+
+    # name is shorter than `min_length`, only trusted mode accepts it.
+    assert builder.deserializer(trusted=True)(user_row("A")).name == "A"
+    with pytest.raises(ValidationError):
+        builder.deserializer()(user_row("A"))
+
+
+@pytest.mark.asyncio
+async def test_fetch_models_from_json():
+    user_id = uuid.uuid4()
+    memo = {
+        "id": str(uuid.uuid4()),
+        "title": "Some Memo",
+        "created_at": "2022-08-13T12:00:00+00:00",
+        "accessable_users": [{"id": str(user_id)}],
+        "created_by": {"id": str(user_id), "name": "Some User"},
+    }
+    client = RecordingClient(query_json=json.dumps([memo]))
+
+    assert await memo_select().fetch_dicts(client) == [memo]
+
+    # shape is partial, so only trusted mode can convert it.
+    [result] = await memo_select().fetch_models(client, trusted=True, from_json=True)
+
+    assert isinstance(result, m.MemoModel)
+    assert result.id == uuid.UUID(memo["id"])
+    assert result.created_at == datetime.datetime(
+        2022, 8, 13, 12, tzinfo=datetime.timezone.utc
+    )
+    assert result.created_by.id == user_id
+    assert [user.id for user in result.accessable_users] == [user_id]
+
+    assert [method for (method, _, _) in client.calls] == ["query_json"] * 2
+
+
+def test_normalize_isoformat():
+    assert (
+        _normalize_isoformat("2022-01-02T03:04:05.12Z")
+        == "2022-01-02T03:04:05.120000+00:00"
+    )
+    assert _normalize_isoformat("03:04:05.1234567") == "03:04:05.123456"
+    assert _normalize_isoformat("2022-01-02") == "2022-01-02"
+
+
+@pytest.mark.asyncio
+async def test_fetch_models_from_json_with_encoded_values():
+    class EventModel(EdgeModel):
+        id: uuid.UUID
+        happened_at: datetime.datetime
+        duration: datetime.timedelta
+        payload: t.Optional[bytes] = None
+        related_ids: t.List[uuid.UUID] = []
+
+        class SchemaConfig:
+            module: str = "default"
+            name: str = "Event"
+
+    related_id = uuid.uuid4()
+    event = {
+        "id": str(uuid.uuid4()),
+        "happened_at": "2022-08-13T12:00:00.5Z",
+        "duration": "PT1H30M",
+        "payload": "AAEC",
+        "related_ids": [str(related_id)],
+    }
+    client = RecordingClient(query_json=json.dumps([event]))
+    builder = EventModel.select(
+        [
+            field(EventModel.id),
+            field(EventModel.happened_at),
+            field(EventModel.duration),
+            field(EventModel.payload),
+            field(EventModel.related_ids),
+        ]
+    )
+
+    [result] = await builder.fetch_models(client, trusted=True, from_json=True)
+
+    assert result.happened_at == datetime.datetime(
+        2022, 8, 13, 12, 0, 0, 500000, tzinfo=datetime.timezone.utc
+    )
+    assert result.duration == datetime.timedelta(hours=1, minutes=30)
+    assert result.payload == b"\x00\x01\x02"
+    assert result.related_ids == [related_id]
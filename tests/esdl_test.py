@@ -0,0 +1,109 @@
+import uuid
+
+import pytest
+from pydantic import Field
+
+import tests.models as m
+from edgegraph.errors import SchemaParseError
+from edgegraph.esdl import load_schema, parse_schema
+from edgegraph.schema import EdgeModel
+from edgegraph.validator import SchemaValidator, ValidationError
+from tests.fakes import DBSCHEMA
+
+
+def test_load_schema():
+    snapshot = load_schema(DBSCHEMA)
+    types = {x.name: x for x in snapshot.types}
+
+    assert set(types) == {
+        "default::BaseModel",
+        "default::User",
+        "default::Memo",
+        "default::Comment",
+    }
+    assert types["default::BaseModel"].abstract is True
+
+    memo = types["default::Memo"]
+    links = {x.name: x for x in memo.links}
+    properties = {x.name: x for x in memo.properties}
+    assert links["accessable_users"].cardinality == "Many"
+    assert links["accessable_users"].required is False
+    assert links["accessable_users"].target == "default::User"
+    assert links["created_by"].required is True
+    assert properties["tags"].target == "array<std::str>"
+    # inherited from BaseModel, and implicit ones.
+    assert properties["deleted_at"].target == "std::datetime"
+    assert properties["id"].target == "std::uuid"
+    assert "__type__" in links
+
+
+def test_parse_schema_with_shorthand_syntax():
+    snapshot = parse_schema(
+        """
+        module default {
+            scalar type Mood extending enum<Happy, Sad>;
+
+            type Person {
+                required name: str {
+                    constraint exclusive;
+                };
+                mood: Mood;
+                multi friends: Person;
+                friend_count := count(.friends);
+                index on (.name);
+            }
+        }
+        """
+    )
+    [person] = snapshot.types
+    links = {x.name: x for x in person.links}
+    properties = {x.name: x for x in person.properties}
+
+    assert links["friends"].cardinality == "Many"
+    assert links["friends"].target == "default::Person"
+    assert properties["name"].required is True
+    assert properties["mood"].target == "default::Mood"
+    assert "friend_count" in properties
+
+
+def test_parse_schema_with_invalid_syntax():
+    with pytest.raises(SchemaParseError) as e:
+        parse_schema("module default {\n    type User {\n        property ;\n")
+
+    assert e.value.line == 3
+
+
+@pytest.mark.asyncio
+async def test_validator_with_esdl_schema():
+    validator = SchemaValidator(
+        "",
+        models={m.UserModel, m.MemoModel, m.CommentModel},
+        schema=load_schema(DBSCHEMA),
+    )
+
+    assert await validator.validate() is True
+    await validator.aclose()
+
+
+@pytest.mark.asyncio
+async def test_validator_with_esdl_schema_and_missed_properties():
+    class UserModel(EdgeModel):
+        id: uuid.UUID = Field(default_factory=uuid.uuid1)
+        email: str
+        name: str
+
+        class SchemaConfig:
+            module: str = "default"
+            name: str = "User"
+
+    validator = SchemaValidator(
+        "",
+        models={UserModel, m.MemoModel, m.CommentModel},
+        schema=load_schema(DBSCHEMA),
+    )
+
+    with pytest.raises(ValidationError) as e:
+        await validator.validate()
+
+    # counts of fields are different, and 5 fields are not found in the model.
+    assert len(e.value.errors) == 6
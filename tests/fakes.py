@@ -0,0 +1,278 @@
+import asyncio
+import contextlib
+import os
+import types
+import typing as t
+import uuid
+
+import pendulum
+
+import tests.models as m
+from edgegraph.expressions.side import SideExpression
+from edgegraph.introspection import PointerSnapshot, SchemaSnapshot, TypeSnapshot
+from edgegraph.query_builder.base import OrderType, reference
+from edgegraph.query_builder.executor import set_type_validator
+from edgegraph.query_builder.insert import InsertQueryBuilder
+from edgegraph.query_builder.select import SelectQueryBuilder
+from edgegraph.query_builder.update import UpdateQueryBuilder
+from edgegraph.reflections import field
+from edgegraph.schema import EdgeModel
+from edgegraph.types import PrimitiveTypes
+
+# schema of the database which models of `tests.models` are for.
+DBSCHEMA = os.path.join(os.path.dirname(__file__), "..", "edgedb", "dbschema")
+
+
+def model_schema(models: t.Iterable[t.Type[EdgeModel]]) -> SchemaSnapshot:
+    """
+    Snapshot which mirrors metadata of models, for generated models of benchmarks without schema files.
+    Tests check models against `load_schema(DBSCHEMA)` instead, or they pass whatever models are.
+    """
+    snapshots = []
+    for model in models:
+        metadata = model.__model_metadata__
+        links = [PointerSnapshot("__type__", "One", True, "schema::ObjectType")]
+        properties: t.List[PointerSnapshot] = []
+
+        for item in metadata.fields.values():
+            target = item.target.__model_metadata__ if item.target is not None else None
+            pointer = PointerSnapshot(
+                name=item.name,
+                cardinality="Many" if item.is_multi else "One",
+                required=not item.optional,
+                target=target.qualified_name if target is not None else None,
+            )
+            (links if item.is_link else properties).append(pointer)
+
+        snapshots.append(
+            TypeSnapshot(
+                name=metadata.qualified_name,
+                abstract=False,
+                links=tuple(links),
+                properties=tuple(properties),
+            )
+        )
+
+    return SchemaSnapshot(types=tuple(snapshots))
+
+
+def _introspected(snapshot: TypeSnapshot) -> types.SimpleNamespace:
+    # shaped like the result of `schema::ObjectType` introspection.
+    def pointer(item: PointerSnapshot) -> types.SimpleNamespace:
+        return types.SimpleNamespace(
+            name=item.name,
+            cardinality=item.cardinality,
+            required=item.required,
+            target=(
+                types.SimpleNamespace(name=item.target)
+                if item.target is not None
+                else None
+            ),
+        )
+
+    return types.SimpleNamespace(
+        name=snapshot.name,
+        abstract=snapshot.abstract,
+        links=[pointer(x) for x in snapshot.links],
+        properties=[pointer(x) for x in snapshot.properties],
+    )
+
+
+class FakeIntrospectionClient:
+    """
+    In-process stand-in of `edgedb.AsyncIOClient`, which answers schema introspection queries with the snapshot.
+    Each query can take `latency` seconds, on at most `concurrency` connections like a pool of the client.
+    """
+
+    _types: t.List[types.SimpleNamespace]
+    migration: t.Optional[str]
+    _latency: float
+    _concurrency: int
+    _connections: t.Optional[asyncio.Semaphore]
+    queries: int
+
+    def __init__(
+        self,
+        schema: SchemaSnapshot,
+        latency: float = 0.0,
+        concurrency: int = 10,
+        migration: t.Optional[str] = None,
+    ):
+        self._types = [_introspected(x) for x in schema.types]
+        self.migration = migration
+        self._latency = latency
+        self._concurrency = concurrency
+        self._connections = None
+        self.queries = 0
+
+    async def _round_trip(self) -> None:
+        self.queries += 1
+        if self._latency <= 0:
+            return
+
+        if self._connections is None:
+            self._connections = asyncio.Semaphore(self._concurrency)
+
+        async with self._connections:
+            await asyncio.sleep(self._latency)
+
+    async def query(self, query: str, *args, **kwargs) -> t.List[types.SimpleNamespace]:
+        await self._round_trip()
+        return list(self._types)
+
+    async def query_single(self, query: str, *args, **kwargs) -> t.Any:
+        # the only single query of introspection is the latest migration.
+        await self._round_trip()
+        return self.migration
+
+    async def aclose(self) -> None:
+        pass
+
+
+class RecordingClient:
+    """
+    In-process stand-in of `edgedb.AsyncIOClient`, which records every call and returns given results.
+    """
+
+    calls: t.List[t.Tuple[str, str, t.Dict[str, t.Any]]]
+    results: t.Dict[str, t.Any]
+
+    def __init__(self, **results: t.Any):
+        self.calls = []
+        self.results = results
+
+    def _record(self, method: str, query: str, kwargs: t.Dict[str, t.Any]) -> t.Any:
+        self.calls.append((method, query, kwargs))
+        return self.results.get(method)
+
+    async def query(self, query: str, **kwargs) -> t.Any:
+        return self._record("query", query, kwargs)
+
+    async def query_single(self, query: str, **kwargs) -> t.Any:
+        return self._record("query_single", query, kwargs)
+
+    async def query_required_single(self, query: str, **kwargs) -> t.Any:
+        return self._record("query_required_single", query, kwargs)
+
+    async def query_json(self, query: str, **kwargs) -> t.Any:
+        return self._record("query_json", query, kwargs)
+
+    async def query_single_json(self, query: str, **kwargs) -> t.Any:
+        return self._record("query_single_json", query, kwargs)
+
+    async def execute(self, commands: str, **kwargs) -> None:
+        self._record("execute", commands, kwargs)
+
+
+class TransactionClient(RecordingClient):
+    """
+    Stand-in of `edgedb.AsyncIOClient.transaction()`, which runs the block once and counts transactions.
+    Calls in the transaction are recorded on this client.
+    """
+
+    transactions: int
+
+    def __init__(self, **results: t.Any):
+        super().__init__(**results)
+        self.transactions = 0
+
+    async def transaction(self) -> t.AsyncIterator["TransactionClient"]:
+        self.transactions += 1
+        yield self
+
+    async def __aenter__(self) -> "TransactionClient":
+        return self
+
+    async def __aexit__(self, *args: t.Any) -> None:
+        pass
+
+
+class RecordingValidator:
+    """
+    Type validator which records types it is asked to validate, set with `recording_validator()`.
+    """
+
+    validated: t.List[t.AbstractSet[str]]
+
+    def __init__(self):
+        self.validated = []
+
+    async def validate_types(self, types: t.AbstractSet[str]) -> None:
+        self.validated.append(types)
+
+
+@contextlib.contextmanager
+def recording_validator() -> t.Iterator[RecordingValidator]:
+    validator = RecordingValidator()
+    set_type_validator(validator)
+    try:
+        yield validator
+    finally:
+        set_type_validator(None)
+
+
+def memo_select(memo_id: uuid.UUID) -> SelectQueryBuilder:
+    """
+    Memo with its author, shared by tests of caches and executors.
+    """
+    UserModel = m.UserModel
+    MemoModel = m.MemoModel
+
+    return (
+        MemoModel.select(
+            [
+                field(MemoModel.id),
+                field(MemoModel.title),
+                reference(
+                    field(MemoModel.created_by),
+                    subquery=UserModel.select([field(UserModel.name)]),
+                ),
+            ]
+        )
+        .add_filter(
+            SideExpression(
+                equation="=",
+                origin=field(MemoModel.id),
+                target=memo_id,
+                target_type=PrimitiveTypes.UUID,
+            )
+        )
+        .order(MemoModel.title, OrderType.ASC)
+        .limit(1)
+    )
+
+
+def memo_insert(title: str, user_id: uuid.UUID) -> InsertQueryBuilder:
+    UserModel = m.UserModel
+    MemoModel = m.MemoModel
+
+    user_subquery = UserModel.select([field(UserModel.id)]).add_filter(
+        SideExpression(
+            equation="=",
+            origin=field(UserModel.id),
+            target=user_id,
+            target_type=PrimitiveTypes.UUID,
+        )
+    )
+
+    return (
+        MemoModel.insert()
+        .add_field(field(MemoModel.title), title, db_type=PrimitiveTypes.STRING)
+        .add_field(field(MemoModel.created_by), subquery=user_subquery)
+        .unless_conflict(MemoModel.title, else_query=memo_select(user_id))
+    )
+
+
+def memo_update(content: str) -> UpdateQueryBuilder:
+    MemoModel = m.MemoModel
+
+    return (
+        MemoModel.update()
+        .set_target(memo_select(uuid.uuid4()))
+        .add_field(field(MemoModel.content), value=content, db_type=PrimitiveTypes.STR)
+        .add_field(
+            field(MemoModel.updated_at),
+            value=pendulum.now(),
+            db_type=PrimitiveTypes.DATETIME,
+        )
+    )
@@ -0,0 +1,85 @@
+import json
+import uuid
+
+import pytest
+from edgedb.datatypes.datatypes import create_object_factory
+
+import edgegraph
+import tests.models as m
+from edgegraph.errors import ConditionValidationError
+from edgegraph.expressions.side import SideExpression
+from edgegraph.reflections import field
+from edgegraph.types import PrimitiveTypes
+from tests.fakes import RecordingClient
+
+
+def user_by_id(user_id: uuid.UUID):
+    UserModel = m.UserModel
+
+    return UserModel.select([field(UserModel.id), field(UserModel.name)]).add_filter(
+        SideExpression(
+            equation="=",
+            origin=field(UserModel.id),
+            target=user_id,
+            target_type=PrimitiveTypes.UUID,
+        )
+    )
+
+
+def memos_by_title(title: str):
+    MemoModel = m.MemoModel
+
+    return MemoModel.select([field(MemoModel.id), field(MemoModel.title)]).add_filter(
+        SideExpression(
+            equation="=",
+            origin=field(MemoModel.title),
+            target=title,
+            target_type=PrimitiveTypes.STR,
+        )
+    )
+
+
+def test_batch_merges_queries_with_namespaced_arguments():
+    user_id = uuid.uuid4()
+    result = edgegraph.batch(user_by_id(user_id), memos_by_title("Some Memo")).build()
+
+    assert result.query.startswith("select {\nq0 := (\nselect default::User {\n")
+    assert "filter .id = <uuid>$q0__filter_0__equation_target\n" in result.query
+    assert "\n),\nq1 := (\nselect default::Memo {\n" in result.query
+    assert "filter .title = <str>$q1__filter_0__equation_target\n" in result.query
+    assert result.query.endswith("),\n}\n")
+    assert result.kwargs == {
+        "q0__filter_0__equation_target": user_id,
+        "q1__filter_0__equation_target": "Some Memo",
+    }
+
+    # same structure reuses the query text.
+    other = edgegraph.batch(user_by_id(uuid.uuid4()), memos_by_title("Other")).build()
+    assert other.query == result.query
+
+
+def test_batch_takes_only_select_queries():
+    with pytest.raises(ConditionValidationError):
+        edgegraph.batch()
+
+    with pytest.raises(ConditionValidationError):
+        edgegraph.batch(m.UserModel.update_many([]))
+
+
+@pytest.mark.asyncio
+async def test_batch_splits_results_in_one_round_trip():
+    user = object()
+    memos = [object(), object()]
+    Result = create_object_factory(id="property", q0="link", q1="link")
+    client = RecordingClient(
+        query_required_single=Result(uuid.uuid4(), user, memos),
+        query_single_json=json.dumps({"q0": {"name": "User"}, "q1": []}),
+    )
+    query = edgegraph.batch(user_by_id(uuid.uuid4()), memos_by_title("Some Memo"))
+
+    assert await query.fetch(client) == (user, memos)
+    assert await query.fetch_dicts(client) == ({"name": "User"}, [])
+    assert [method for (method, _, _) in client.calls] == [
+        "query_required_single",
+        "query_single_json",
+    ]
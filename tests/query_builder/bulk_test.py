@@ -0,0 +1,207 @@
+import json
+import uuid
+
+import pytest
+
+import tests.models as m
+from edgegraph.errors import ConditionValidationError
+from edgegraph.query_builder.base import AssignType
+from tests.fakes import RecordingClient
+
+
+def user_rows(count: int):
+    return [
+        {
+            "email": f"user{idx}@example.com",
+            "password": "password",
+            "name": f"User {idx}",
+        }
+        for idx in range(count)
+    ]
+
+
+def test_insert_many_unpacks_rows_in_one_statement():
+    UserModel = m.UserModel
+    MemoModel = m.MemoModel
+
+    user = UserModel(email="user@example.com", password="password", name="Some User")
+    result = MemoModel.insert_many(
+        [
+            {
+                "title": "Some Memo",
+                "content": "Some Content",
+                "tags": ["memo"],
+                "created_by": user,
+                "accessable_users": [user.id],
+            }
+        ]
+    ).build()
+
+    assert result.query.startswith(
+        "for row in json_array_unpack(<json>$rows) union (\ninsert default::Memo {\n"
+    )
+    assert "title := <str>json_get(row, 'title'),\n" in result.query
+    assert "tags := <array<str>>json_get(row, 'tags'),\n" in result.query
+    assert (
+        "created_by := (select default::User filter .id = <uuid>json_get(row, 'created_by')),\n"
+        in result.query
+    )
+    assert json.loads(result.kwargs["rows"]) == [
+        {
+            "accessable_users": [str(user.id)],
+            "content": "Some Content",
+            "created_by": str(user.id),
+            "tags": ["memo"],
+            "title": "Some Memo",
+        }
+    ]
+
+
+def test_insert_many_takes_values_of_models_with_defaults():
+    UserModel = m.UserModel
+
+    user = UserModel(email="user@example.com", password="password", name="Some User")
+    result = UserModel.insert_many([user]).build()
+
+    # defaults of the model are inserted too, but ids are made by the database.
+    [row] = json.loads(result.kwargs["rows"])
+    assert row["deleted"] is False
+    assert row["deleted_at"] is None
+    assert row["name"] == "Some User"
+    assert set(row) == set(UserModel.__fields__) - {"id"}
+    assert "id :=" not in result.query
+
+    # ids are inserted only when they are asked for.
+    result = UserModel.insert_many([user], fields=["id", "name"]).build()
+    assert json.loads(result.kwargs["rows"]) == [
+        {"id": str(user.id), "name": "Some User"}
+    ]
+
+
+def test_insert_many_rejects_rows_without_columns():
+    UserModel = m.UserModel
+    rows = user_rows(2)
+    del rows[1]["name"]
+
+    # a missing column would be inserted as an empty set instead of the database default.
+    with pytest.raises(ConditionValidationError):
+        UserModel.insert_many(rows)
+
+    with pytest.raises(ConditionValidationError):
+        UserModel.insert_many(user_rows(1)).add_rows([rows[1]])
+
+
+def test_insert_many_checks_types_of_rows():
+    UserModel = m.UserModel
+
+    with pytest.raises(ConditionValidationError):
+        UserModel.insert_many([{"email": "user@example.com", "name": 1}])
+
+    with pytest.raises(ConditionValidationError):
+        UserModel.insert_many([{"unknown": "value"}])
+
+
+def test_insert_many_unless_conflict_updates_columns():
+    UserModel = m.UserModel
+
+    query = (
+        UserModel.insert_many(user_rows(2))
+        .unless_conflict(UserModel.email, update=[UserModel.name])
+        .build()
+        .query
+    )
+    assert (
+        "unless conflict on (.email)\nelse (\nupdate default::User set {\n"
+        "name := <str>json_get(row, 'name'),\n}\n)\n)\n"
+    ) in query
+
+    with pytest.raises(ConditionValidationError):
+        UserModel.insert_many(user_rows(2)).unless_conflict(
+            UserModel.email, update=[UserModel.deleted]
+        )
+
+
+@pytest.mark.asyncio
+async def test_insert_many_runs_in_chunks():
+    UserModel = m.UserModel
+    rows = user_rows(5)
+
+    by_rows = list(UserModel.insert_many(rows).chunk(max_rows=2).batches())
+    assert [len(json.loads(result.kwargs["rows"])) for result in by_rows] == [2, 2, 1]
+    assert len({result.query for result in by_rows}) == 1
+
+    row_size = len(json.dumps(rows[0], separators=(",", ":")))
+    by_bytes = list(
+        UserModel.insert_many(rows).chunk(max_bytes=row_size * 3 + 4).batches()
+    )
+    assert [len(json.loads(result.kwargs["rows"])) for result in by_bytes] == [3, 2]
+
+    client = RecordingClient(query=[uuid.uuid4()])
+    inserted = await UserModel.insert_many(rows).chunk(max_rows=2).fetch(client)
+    assert len(inserted) == 3
+    assert [method for (method, _, _) in client.calls] == ["query"] * 3
+
+
+def test_update_many_joins_rows_by_id():
+    UserModel = m.UserModel
+    MemoModel = m.MemoModel
+
+    user = UserModel(email="user@example.com", password="password", name="Some User")
+    memo_id = uuid.uuid4()
+    result = MemoModel.update_many(
+        [
+            (memo_id, {"title": "New Title"}),
+            (uuid.uuid4(), {"content": "New Content", "accessable_users": [user]}),
+        ],
+        assign={MemoModel.accessable_users.name: AssignType.APPEND},
+    ).build()
+
+    assert result.query.startswith(
+        "for row in json_array_unpack(<json>$rows) union (\nupdate default::Memo\n"
+        "filter .id = <uuid>json_get(row, 'id')\nset {\n"
+    )
+    # fields which are not in a row keep their values.
+    assert (
+        "title := (<str>json_get(row, 'title') if exists json_get(row, 'title') else .title),\n"
+        in result.query
+    )
+    assert (
+        "accessable_users += (select default::User filter .id in "
+        "array_unpack(<array<uuid>>json_get(row, 'accessable_users'))),\n"
+        in result.query
+    )
+    assert json.loads(result.kwargs["rows"])[0] == {
+        "id": str(memo_id),
+        "title": "New Title",
+    }
+
+
+def test_update_many_checks_rows():
+    UserModel = m.UserModel
+
+    # values of properties are always assigned.
+    builder = UserModel.update_many(
+        [(uuid.uuid4(), {"name": "Name"})], assign={"name": AssignType.APPEND}
+    )
+    assert "name := (" in builder.build().query
+
+    with pytest.raises(ConditionValidationError):
+        UserModel.update_many([(uuid.uuid4(), {"name": 1})])
+
+    with pytest.raises(ConditionValidationError):
+        UserModel.update_many([(uuid.uuid4(), {"id": uuid.uuid4()})])
+
+    with pytest.raises(ConditionValidationError):
+        UserModel.update_many([("not an id", {"name": "Name"})])
+
+
+def test_update_many_chunks_large_batches():
+    UserModel = m.UserModel
+    rows = [(uuid.uuid4(), {"name": f"User {idx}"}) for idx in range(2500)]
+
+    batches = list(UserModel.update_many(rows).batches())
+    assert [len(json.loads(result.kwargs["rows"])) for result in batches] == [
+        1000,
+        1000,
+        500,
+    ]
@@ -0,0 +1,190 @@
+import asyncio
+import uuid
+
+import pytest
+
+import tests.models as m
+from edgegraph.query_builder.cache import (
+    QueryTemplateCache,
+    ResultCache,
+    canonical,
+    template_cache,
+)
+from edgegraph.query_builder.executor import Executor
+from edgegraph.reflections import field
+from tests.fakes import RecordingClient, memo_insert, memo_select, memo_update
+
+
+def test_template_cache_hit_reuses_query_and_collects_arguments():
+    template_cache.clear()
+
+    first_id = uuid.uuid4()
+    second_id = uuid.uuid4()
+    first = memo_select(first_id).build()
+    second = memo_select(second_id).build()
+
+    assert first.query == second.query
+    assert first.kwargs == {"filter_0__equation_target": first_id}
+    assert second.kwargs == {"filter_0__equation_target": second_id}
+
+    info = template_cache.info()
+    assert info.hits == 1
+    assert info.misses == 1
+    assert info.currsize == 1
+
+
+def test_template_cache_hit_is_same_with_rendered_query():
+    builders = [
+        (memo_select(uuid.uuid4()), memo_select(uuid.uuid4())),
+        (
+            memo_insert("first", uuid.uuid4()),
+            memo_insert("second", uuid.uuid4()),
+        ),
+        (memo_update("first"), memo_update("second")),
+    ]
+
+    for (first, second) in builders:
+        template_cache.clear()
+        first.build()
+        misses = template_cache.info().misses
+
+        # nested builders are also cached, so the whole tree must be a hit.
+        cached = second.build()
+        assert template_cache.info().misses == misses
+
+        rendered = second._render()
+        assert cached.query == rendered.query
+        assert cached.kwargs == rendered.kwargs
+
+
+def test_builder_reuses_its_built_query_until_changed():
+    UserModel = m.UserModel
+    builder = memo_select(uuid.uuid4())
+    template_cache.clear()
+
+    first = builder.build()
+    second = builder.build()
+    assert second == first
+    # the second build is memoised on the builder, without looking up the template cache.
+    assert template_cache.info().misses + template_cache.info().hits == 1
+
+    # built arguments are copied for each call.
+    second.kwargs.clear()
+    assert builder.build() == first
+
+    builder.add_field(field(m.MemoModel.content))
+    assert "content" in builder.build().query
+
+    # changing a nested builder also builds the query again.
+    [subquery] = [x.expression for x in builder._fields if x.expression is not None]
+    subquery.add_field(field(UserModel.email))
+    assert "email" in builder.build().query
+
+
+def test_template_cache_evicts_least_recently_used():
+    cache = QueryTemplateCache(maxsize=2)
+    cache.put("a", "select A")
+    cache.put("b", "select B")
+
+    # touch "a", so "b" is the least recently used one.
+    assert cache.get("a") == "select A"
+    cache.put("c", "select C")
+
+    assert cache.get("b") is None
+    assert cache.get("c") == "select C"
+    assert cache.info() == (2, 1, 2, 2)
+
+
+def test_builders_know_types_they_read_and_write():
+    assert memo_select(uuid.uuid4()).dependencies() == {
+        "default::Memo",
+        "default::User",
+    }
+    assert memo_select(uuid.uuid4()).writes() == frozenset()
+
+    # insert reads the creator and the else query, but writes only memos.
+    insert = memo_insert("title", uuid.uuid4())
+    assert insert.dependencies() == {"default::Memo", "default::User"}
+    assert insert.writes() == {"default::Memo"}
+    assert memo_update("content").writes() == {"default::Memo"}
+
+
+@pytest.mark.asyncio
+async def test_result_cache_is_invalidated_by_writes():
+    UserModel = m.UserModel
+    cache = ResultCache()
+    client = RecordingClient(query=["memo"], query_single="user")
+    executor = Executor(client, cache=cache)
+    memo_id = uuid.uuid4()
+    users = UserModel.select([field(UserModel.name)])
+
+    assert await memo_select(memo_id).fetch(executor) == "user"
+    assert await memo_select(memo_id).fetch(executor) == "user"
+    assert await users.fetch(executor) == ["memo"]
+    assert await memo_select(uuid.uuid4()).fetch(executor) == "user"
+    assert len(client.calls) == 3
+
+    # memos depend on users through the nested subquery.
+    await UserModel.update_many([(uuid.uuid4(), {"name": "Name"})]).execute(executor)
+    await memo_select(memo_id).fetch(executor)
+    await users.fetch(executor)
+    assert len(client.calls) == 6
+
+    info = cache.info()
+    assert (info.hits, info.misses, info.invalidations) == (1, 5, 3)
+    assert info.hit_ratio == 1 / 6
+
+
+@pytest.mark.asyncio
+async def test_result_cache_skips_reads_overlapping_writes():
+    UserModel = m.UserModel
+    released = asyncio.Event()
+
+    class SlowClient(RecordingClient):
+        async def query(self, query: str, **kwargs):
+            self._record("query", query, kwargs)
+            await released.wait()
+            return ["old user"]
+
+    cache = ResultCache()
+    executor = Executor(SlowClient(), cache=cache)
+    users = UserModel.select([field(UserModel.name)])
+
+    # the read started before the write, so its result may miss the write.
+    read = asyncio.ensure_future(users.fetch(executor))
+    await asyncio.sleep(0)
+    await UserModel.update_many([(uuid.uuid4(), {"name": "Name"})]).execute(executor)
+    released.set()
+
+    assert await read == ["old user"]
+    assert cache.info().currsize == 0
+
+    generations = cache.generations({"default::User"})
+    cache.invalidate({"default::User"})
+    cache.put("users", [], frozenset({"default::User"}), generations)
+    assert cache.get("users") == (False, None)
+
+
+def test_result_cache_expires_and_evicts():
+    now = [0.0]
+    cache = ResultCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    cache.put("a", None, frozenset({"default::Memo"}))
+    cache.put("b", "B", frozenset())
+
+    assert cache.get("a") == (True, None)
+    cache.put("c", "C", frozenset())
+    assert cache.get("b") == (False, None)
+
+    now[0] = 10
+    assert cache.get("a") == (False, None)
+
+    info = cache.info()
+    assert (info.evictions, info.expirations, info.currsize) == (1, 1, 1)
+
+
+def test_result_cache_keys_canonical_arguments():
+    assert canonical({"b": [1, 2], "a": {1}}) == canonical({"a": {1}, "b": [1, 2]})
+    assert canonical([1]) != canonical([True])
+
+    with pytest.raises(TypeError):
+        canonical(bytearray())
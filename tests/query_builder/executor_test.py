@@ -0,0 +1,154 @@
+import asyncio
+import uuid
+
+import pytest
+
+import tests.models as m
+from edgegraph.expressions.side import SideExpression
+from edgegraph.query_builder.executor import Executor
+from edgegraph.reflections import field
+from edgegraph.types import Cardinality
+from tests.fakes import RecordingClient, memo_insert, memo_update
+
+
+def test_cardinality_of_builders():
+    MemoModel = m.MemoModel
+
+    def by_id():
+        return SideExpression(
+            equation="=", origin=field(MemoModel.id), target=uuid.uuid4()
+        )
+
+    def by_title():
+        return SideExpression(
+            equation="=", origin=field(MemoModel.title), target="Some Memo"
+        )
+
+    assert MemoModel.select().cardinality == Cardinality.MANY
+    assert MemoModel.select().limit(1).cardinality == Cardinality.ONE
+    assert MemoModel.select().add_filter(by_id()).cardinality == Cardinality.ONE
+    assert MemoModel.select().add_filter(by_title()).cardinality == Cardinality.MANY
+    assert (
+        MemoModel.select()
+        .add_filter(SideExpression(equation="and", origin=by_title(), target=by_id()))
+        .cardinality
+        == Cardinality.ONE
+    )
+    assert (
+        MemoModel.select()
+        .add_filter(SideExpression(equation="or", origin=by_title(), target=by_id()))
+        .cardinality
+        == Cardinality.MANY
+    )
+
+    assert memo_insert("title", uuid.uuid4()).cardinality == Cardinality.ONE
+    assert memo_update("content").cardinality == Cardinality.ONE
+    assert MemoModel.update().add_filter(by_title()).cardinality == Cardinality.MANY
+
+
+@pytest.mark.asyncio
+async def test_fetch_picks_client_method_from_cardinality():
+    MemoModel = m.MemoModel
+    client = RecordingClient(query=["memo"], query_single="memo")
+
+    many = MemoModel.select([field(MemoModel.title)])
+    single = MemoModel.select([field(MemoModel.title)]).limit(1)
+
+    assert await many.fetch(client) == ["memo"]
+    assert await single.fetch(client) == "memo"
+    assert await many.fetch_single(client) == "memo"
+    await memo_update("content").execute(Executor(client))
+
+    assert [method for (method, _, _) in client.calls] == [
+        "query",
+        "query_single",
+        "query_single",
+        "execute",
+    ]
+
+    result = single.build()
+    assert client.calls[1] == ("query_single", result.query, result.kwargs)
+
+
+class SlowClient(RecordingClient):
+    """
+    Holds every query until it is released, so queries run at the same time.
+    """
+
+    def __init__(self, **results):
+        super().__init__(**results)
+        self.released = asyncio.Event()
+
+    async def query(self, query: str, **kwargs):
+        self._record("query", query, kwargs)
+        await self.released.wait()
+        if isinstance(self.results["query"], Exception):
+            raise self.results["query"]
+
+        return self.results["query"]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_identical_reads_in_flight():
+    MemoModel = m.MemoModel
+    client = SlowClient(query=["memo"])
+    executor = Executor(client, coalesce=True)
+
+    def select(title: str):
+        return MemoModel.select([field(MemoModel.title)]).add_filter(
+            SideExpression(equation="=", origin=field(MemoModel.title), target=title)
+        )
+
+    reads = [
+        asyncio.ensure_future(select(title).fetch(executor))
+        for title in ["a"] * 10 + ["b"]
+    ]
+    await asyncio.sleep(0)
+    client.released.set()
+
+    assert await asyncio.gather(*reads) == [["memo"]] * 11
+    assert (executor.flights, executor.merged) == (2, 9)
+    assert len(client.calls) == 2
+
+    # writes are never coalesced.
+    await asyncio.gather(*[memo_update("content").execute(executor) for _ in range(3)])
+    assert (executor.flights, executor.merged) == (2, 9)
+    assert len(client.calls) == 5
+
+
+@pytest.mark.asyncio
+async def test_coalesced_reads_share_errors():
+    MemoModel = m.MemoModel
+    client = SlowClient(query=ValueError("failed"))
+    executor = Executor(client, coalesce=True)
+
+    reads = [
+        asyncio.ensure_future(MemoModel.select().fetch(executor)) for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    client.released.set()
+
+    results = await asyncio.gather(*reads, return_exceptions=True)
+    assert [type(x) for x in results] == [ValueError] * 3
+    assert len(client.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_coalesced_read_survives_cancelled_leader():
+    MemoModel = m.MemoModel
+    client = SlowClient(query=["memo"])
+    executor = Executor(client, coalesce=True)
+
+    leader = asyncio.ensure_future(MemoModel.select().fetch(executor))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(MemoModel.select().fetch(executor))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    await asyncio.sleep(0)
+    client.released.set()
+
+    assert await follower == ["memo"]
+    assert leader.cancelled()
+    assert (executor.flights, executor.merged) == (1, 1)
+    assert len(client.calls) == 1
@@ -126,7 +126,42 @@ def test_invalid_insert_query_parameter():
                 db_type=PrimitiveTypes.STRING,
             )
             .add_field(field(MemoModel.created_by), subquery=user_subquery)
-            .add_field(field(MemoModel.created_at), pendulum.now())
+            .add_field(field(MemoModel.created_at), "2022-08-13")
             .add_field(field(MemoModel.updated_at), pendulum.now())
             .build()
         )
+
+
+def test_insert_query_infers_db_type_from_annotations():
+    MemoModel = m.MemoModel
+
+    date = pendulum.now()
+    memo_id = uuid.uuid4()
+    memo_insert = (
+        MemoModel.insert()
+        .add_field(field(MemoModel.id), memo_id)
+        .add_field(field(MemoModel.created_at), date)
+        .add_field(field(MemoModel.deleted_at), date)
+        .add_field(field(MemoModel.deleted), False)
+        .add_field(field(MemoModel.tags), ["a", "b"])
+        .build()
+    )
+
+    assert (
+        dedent(
+            """
+                insert default::Memo {
+                created_at := <datetime>$created_at,
+                deleted := <bool>$deleted,
+                deleted_at := <datetime>$deleted_at,
+                id := <uuid>$id,
+                tags := <array<str>>$tags,
+                }
+            """
+        )[1:]
+        == memo_insert.query
+    )
+
+    # links can't be inferred.
+    with pytest.raises(ConditionValidationError):
+        MemoModel.insert().add_field(field(MemoModel.created_by), memo_id)
@@ -0,0 +1,181 @@
+import asyncio
+import typing as t
+import uuid
+
+import pytest
+from edgedb.datatypes.datatypes import create_object_factory
+
+import tests.models as m
+from edgegraph.query_builder.loader import LinkLoader, Loader
+from edgegraph.reflections import field
+from tests.fakes import RecordingClient
+
+IdRow = create_object_factory(id="property")
+
+
+class ObjectsClient(RecordingClient):
+    """
+    Returns objects of ids which exist, among ids given by the array parameter.
+    """
+
+    def __init__(self, ids: t.Iterable[uuid.UUID]):
+        super().__init__()
+        self.ids = set(ids)
+
+    async def query(self, query: str, **kwargs) -> t.Any:
+        self._record("query", query, kwargs)
+        [ids] = kwargs.values()
+        return [IdRow(x) for x in ids if x in self.ids]
+
+
+@pytest.mark.asyncio
+async def test_loader_batches_ids_requested_in_one_tick():
+    UserModel = m.UserModel
+    ids = [uuid.uuid4() for _ in range(3)]
+    missing = uuid.uuid4()
+    client = ObjectsClient(ids)
+    loader = Loader(client, UserModel.select([UserModel.id, UserModel.name]))
+
+    users = await asyncio.gather(*[loader.load(x) for x in [*ids, ids[0], missing]])
+
+    assert [user.id for user in users[:4]] == [*ids, ids[0]]
+    assert users[4] is None
+    [(method, query, kwargs)] = client.calls
+    assert method == "query"
+    assert (
+        "filter .id in (array_unpack(<array<uuid>>$filter_0__target__unpack_values))\n"
+        in query
+    )
+    assert kwargs == {"filter_0__target__unpack_values": [*ids, missing]}
+
+    # results are cached in the loader.
+    assert (await loader.load(ids[1])).id == ids[1]
+    assert len(client.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_loader_splits_large_batches():
+    UserModel = m.UserModel
+    ids = [uuid.uuid4() for _ in range(5)]
+    client = ObjectsClient(ids)
+    loader = Loader(client, UserModel.select([UserModel.id]), max_batch_size=2)
+
+    users = await loader.load_many(ids)
+
+    assert [user.id for user in users] == ids
+    assert [
+        len(kwargs["filter_0__target__unpack_values"])
+        for (_, _, kwargs) in client.calls
+    ] == [2, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_link_loader_resolves_links_of_parents():
+    MemoModel = m.MemoModel
+    users = [uuid.uuid4() for _ in range(2)]
+    client = ObjectsClient(users)
+    loaders = LinkLoader(client)
+    Memo = create_object_factory(
+        id="property", created_by="link", accessable_users="link"
+    )
+    memos = [
+        Memo(uuid.uuid4(), IdRow(users[idx % 2]), [IdRow(x) for x in users])
+        for idx in range(10)
+    ]
+
+    async def resolve(memo: t.Any):
+        return (
+            await loaders.load(MemoModel.created_by, memo),
+            await loaders.load(MemoModel.accessable_users, memo),
+        )
+
+    resolved = await asyncio.gather(*[resolve(memo) for memo in memos])
+
+    assert [created_by.id for (created_by, _) in resolved] == [
+        users[idx % 2] for idx in range(10)
+    ]
+    assert [
+        [user.id for user in accessable_users] for (_, accessable_users) in resolved
+    ] == [users] * 10
+    # each link field is loaded with one query, which selects every field of the user.
+    assert len(client.calls) == 2
+    assert loaders.of(MemoModel.created_by) is not loaders.of(
+        MemoModel.accessable_users
+    )
+    assert client.calls[0][1].startswith("select default::User {\n")
+
+
+@pytest.mark.asyncio
+async def test_loader_keeps_shared_load_when_a_caller_is_cancelled():
+    UserModel = m.UserModel
+    user_id = uuid.uuid4()
+    released = asyncio.Event()
+
+    class SlowClient(ObjectsClient):
+        async def query(self, query: str, **kwargs) -> t.Any:
+            await released.wait()
+            return await super().query(query, **kwargs)
+
+    client = SlowClient([user_id])
+    loader = Loader(client, UserModel.select([field(UserModel.id)]))
+
+    cancelled = asyncio.ensure_future(loader.load(user_id))
+    waiting = asyncio.ensure_future(loader.load(user_id))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    released.set()
+
+    assert (await waiting).id == user_id
+    assert cancelled.cancelled()
+    assert (await loader.load(user_id)).id == user_id
+    assert len(client.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_loader_evicts_failed_and_cancelled_loads():
+    UserModel = m.UserModel
+    user_id = uuid.uuid4()
+
+    class FailingClient(ObjectsClient):
+        async def query(self, query: str, **kwargs) -> t.Any:
+            self._record("query", query, kwargs)
+            raise RuntimeError("connection lost")
+
+    loader = Loader(FailingClient([user_id]), UserModel.select([field(UserModel.id)]))
+    with pytest.raises(RuntimeError):
+        await loader.load(user_id)
+    assert user_id not in loader._cache
+
+    blocked = asyncio.Event()
+
+    class BlockedClient(ObjectsClient):
+        async def query(self, query: str, **kwargs) -> t.Any:
+            await blocked.wait()
+
+    loader = Loader(BlockedClient([user_id]), UserModel.select([field(UserModel.id)]))
+    loading = asyncio.ensure_future(loader.load(user_id))
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    # cancelling the fetch cancels its futures, which are not cached anymore.
+    for task in list(loader._tasks):
+        task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await loading
+    assert user_id not in loader._cache
+
+
+@pytest.mark.asyncio
+async def test_loader_resolves_loads_cleared_before_dispatch():
+    UserModel = m.UserModel
+    user_id = uuid.uuid4()
+    client = ObjectsClient([user_id])
+    loader = Loader(client, UserModel.select([field(UserModel.id)]))
+
+    loading = asyncio.ensure_future(loader.load(user_id))
+    await asyncio.sleep(0)
+    # cleared after the id is queued, but before the batch is dispatched.
+    loader.clear()
+
+    assert (await asyncio.wait_for(loading, timeout=1)).id == user_id
+    assert len(client.calls) == 1
@@ -0,0 +1,91 @@
+import uuid
+
+import pytest
+
+import tests.models as m
+from edgegraph.errors import ConditionValidationError
+from edgegraph.expressions.side import SideExpression
+from edgegraph.query_builder.cache import canonical
+from edgegraph.reflections import field
+from edgegraph.types import PrimitiveTypes, placeholder
+
+
+def test_prepared_select_binds_placeholders():
+    MemoModel = m.MemoModel
+
+    statement = (
+        MemoModel.select([field(MemoModel.id), field(MemoModel.title)])
+        .add_filter(
+            SideExpression(
+                equation="=",
+                origin=field(MemoModel.id),
+                target=placeholder("memo_id"),
+                target_type=PrimitiveTypes.UUID,
+            )
+        )
+        .add_filter(
+            SideExpression(
+                equation="=",
+                origin=field(MemoModel.deleted),
+                target=False,
+                target_type=PrimitiveTypes.BOOL,
+            )
+        )
+        .prepare()
+    )
+
+    memo_id = uuid.uuid4()
+    result = statement.bind(memo_id=memo_id)
+
+    assert statement.names == ("memo_id",)
+    assert "filter (.id = <uuid>$filter_0__equation_target)" in result.query
+    assert result.kwargs == {
+        "filter_0__equation_target": memo_id,
+        "filter_1__equation_target": False,
+    }
+
+    # statements are hashable, so they can be used as keys.
+    assert statement in {statement}
+
+
+def test_prepared_insert_binds_same_placeholder_in_many_fields():
+    MemoModel = m.MemoModel
+
+    statement = (
+        MemoModel.insert()
+        .add_field(
+            field(MemoModel.title), placeholder("text"), db_type=PrimitiveTypes.STR
+        )
+        .add_field(
+            field(MemoModel.content), placeholder("text"), db_type=PrimitiveTypes.STR
+        )
+        .prepare()
+    )
+
+    result = statement.bind(text="Some Memo")
+    assert result.kwargs == {"content": "Some Memo", "title": "Some Memo"}
+    assert canonical(result.kwargs) == canonical(dict(result.kwargs))
+
+
+def test_prepared_statement_rejects_missing_or_unknown_values():
+    MemoModel = m.MemoModel
+
+    statement = (
+        MemoModel.update()
+        .add_filter(
+            SideExpression(
+                equation="=",
+                origin=field(MemoModel.id),
+                target=placeholder("memo_id"),
+                target_type=PrimitiveTypes.UUID,
+            )
+        )
+        .add_field(field(MemoModel.deleted), value=True, db_type=PrimitiveTypes.BOOL)
+        .prepare()
+    )
+
+    with pytest.raises(ConditionValidationError):
+        statement.bind()
+
+    with pytest.raises(ConditionValidationError):
+        statement.bind(memo_id=uuid.uuid4(), deleted=False)
@@ -1,13 +1,16 @@
 import asyncio
 import os
+import uuid
 from textwrap import dedent
 
 import pytest
 
 import tests.models as m
-from edgegraph.errors import QueryContextMissmatchError
+from edgegraph.errors import ConditionValidationError, QueryContextMissmatchError
+from edgegraph.expressions.side import SideExpression
 from edgegraph.query_builder.base import EmptyStrategyType, OrderType, reference
 from edgegraph.reflections import field
+from edgegraph.types import PrimitiveTypes
 
 
 @pytest.fixture(scope="module")
@@ -97,3 +100,82 @@ def test_invalid_fields_in_select_query():
             .order(MemoModel.created_at, OrderType.DESC, EmptyStrategyType.LAST)
             .build()
         )
+
+
+def test_same_select_structure_builds_same_query():
+    UserModel = m.UserModel
+    MemoModel = m.MemoModel
+
+    def build(memo_id: uuid.UUID):
+        user_subquery = UserModel.select([field(UserModel.id)])
+
+        return (
+            MemoModel.select(
+                [
+                    field(MemoModel.id),
+                    reference(field(MemoModel.created_by), subquery=user_subquery),
+                ]
+            )
+            .add_filter(
+                SideExpression(
+                    equation="=",
+                    origin=field(MemoModel.id),
+                    target=memo_id,
+                    target_type=PrimitiveTypes.UUID,
+                )
+            )
+            .add_filter(
+                SideExpression(
+                    equation="=",
+                    origin=field(MemoModel.deleted),
+                    target=False,
+                    target_type=PrimitiveTypes.BOOL,
+                )
+            )
+            .build()
+        )
+
+    first = build(uuid.uuid4())
+    second_memo_id = uuid.uuid4()
+    second = build(second_memo_id)
+
+    assert first.query == second.query
+    assert (
+        "filter (.id = <uuid>$filter_0__equation_target)"
+        " AND (.deleted = <bool>$filter_1__equation_target)\n" in first.query
+    )
+    assert second.kwargs == {
+        "filter_0__equation_target": second_memo_id,
+        "filter_1__equation_target": False,
+    }
+
+
+def test_select_filter_infers_array_of_in_values():
+    MemoModel = m.MemoModel
+    titles = ["a", "b"]
+
+    result = (
+        MemoModel.select([field(MemoModel.title)])
+        .add_filter(
+            SideExpression(equation="in", origin=field(MemoModel.title), target=titles)
+        )
+        .build()
+    )
+
+    assert (
+        "filter .title in (array_unpack(<array<str>>$filter_0__target__unpack_values))\n"
+        in result.query
+    )
+    assert result.kwargs == {"filter_0__target__unpack_values": titles}
+
+
+def test_duplicated_fields_in_select_query():
+    MemoModel = m.MemoModel
+
+    builder = MemoModel.select([field(MemoModel.id), field(MemoModel.title)])
+
+    with pytest.raises(ConditionValidationError):
+        builder.add_field(field(MemoModel.title))
+
+    with pytest.raises(ConditionValidationError):
+        builder.add_field(field(m.MemoModel.id))
@@ -0,0 +1,199 @@
+import os
+import types
+import uuid
+
+import edgedb
+import pendulum
+import pytest
+
+import tests.models as m
+from edgegraph.errors import ConditionValidationError
+from edgegraph.expressions.side import SideExpression
+from edgegraph.query_builder.cache import ResultCache
+from edgegraph.query_builder.session import Session
+from edgegraph.reflections import field
+from tests.fakes import TransactionClient, recording_validator
+
+
+@pytest.fixture()
+def edgedb_dsn():
+    dsn = os.getenv("EDGEDB_DSN")
+    if not dsn:
+        pytest.skip("Cannot test this test without EDGEDB_DSN environment variable.")
+
+    return dsn
+
+
+class MergedClient(TransactionClient):
+    """
+    Returns an object with an id for every name selected by the statement.
+    """
+
+    async def query_required_single(self, query: str, **kwargs):
+        self._record("query_required_single", query, kwargs)
+        select = query[query.index("select {\n") :]
+        names = [line.split(" := ")[0] for line in select.splitlines()[1:-1]]
+        return types.SimpleNamespace(
+            **{name: types.SimpleNamespace(id=uuid.uuid4()) for name in names}
+        )
+
+
+def user_insert(name: str):
+    UserModel = m.UserModel
+
+    return (
+        UserModel.insert()
+        .add_field(UserModel.email, f"{name}@example.com")
+        .add_field(UserModel.password, "password")
+        .add_field(UserModel.name, name)
+    )
+
+
+def memo_insert(title: str, created_by):
+    MemoModel = m.MemoModel
+
+    return (
+        MemoModel.insert()
+        .add_field(MemoModel.title, title)
+        .add_field(MemoModel.content, "Some Content")
+        .add_field(MemoModel.created_by, subquery=created_by)
+    )
+
+
+@pytest.mark.asyncio
+async def test_session_merges_writes_into_one_statement():
+    client = MergedClient()
+    session = Session(client)
+
+    user = user_insert("user")
+    # queued before the user, but runs after it.
+    memo = session.add(memo_insert("Some Memo", user))
+    session.add(user)
+
+    assert session.statements() == [[user, memo]]
+    results = await session.flush()
+
+    assert client.transactions == 1
+    [(method, query, kwargs)] = client.calls
+    assert method == "query_required_single"
+    assert query.startswith("with\nw1 := (\ninsert default::User {\n")
+    # the queued user is referred by its name, so it is inserted only once.
+    assert "created_by := (\nw1),\n" in query
+    assert query.count("insert default::User") == 1
+    assert query.endswith("select {\nw1 := w1,\nw0 := w0,\n}\n")
+    assert kwargs["w0__title"] == "Some Memo"
+    assert kwargs["w1__name"] == "user"
+    assert len(results) == 2
+    assert session.statements() == []
+
+
+@pytest.mark.asyncio
+async def test_session_splits_statements_which_read_writes():
+    UserModel = m.UserModel
+    MemoModel = m.MemoModel
+    client = MergedClient()
+    cache = ResultCache()
+    cache.put("memos", [], frozenset({"default::Memo"}))
+    session = Session(client, cache=cache)
+
+    memo = session.add(memo_insert("Some Memo", UserModel.select()))
+    # updates of memos don't see memos inserted by the same statement.
+    update = session.add(
+        MemoModel.update()
+        .add_filter(
+            SideExpression(equation="=", origin=field(MemoModel.title), target="x")
+        )
+        .add_field(MemoModel.accessable_users, subquery=UserModel.select())
+    )
+    comment = session.add(
+        m.CommentModel.insert()
+        .add_field(m.CommentModel.content, "Some Comment")
+        .add_field(m.CommentModel.memo, subquery=memo)
+        .add_field(m.CommentModel.created_by, subquery=UserModel.select())
+    )
+
+    assert session.statements() == [[memo], [update, comment]]
+    [memo_id, _, _] = [x.id for x in await session.flush()]
+
+    assert client.transactions == 1
+    assert len(client.calls) == 2
+    (_, query, kwargs) = client.calls[1]
+    # the memo inserted by the first statement is selected by its id.
+    assert query.startswith(
+        "with\nw1 := (\nupdate default::Memo\n"
+        "filter .title = <str>$w1__filter_0__equation_target\n"
+    )
+    assert (
+        "w0 := (select default::Memo filter .id = <optional uuid>$w0__id),\n" in query
+    )
+    assert "memo := (\nw0),\n" in query
+    assert kwargs["w0__id"] == memo_id
+    assert cache.get("memos") == (False, None)
+
+
+def test_session_splits_inserts_which_check_conflicts_of_writes():
+    UserModel = m.UserModel
+    session = Session(MergedClient())
+
+    user = session.add(user_insert("user"))
+    # conflicts are checked with users before the statement, which miss the user inserted by it.
+    other = session.add(user_insert("user").unless_conflict(UserModel.email))
+    memo = session.add(memo_insert("Some Memo", user))
+
+    assert session.statements() == [[user], [other, memo]]
+
+
+@pytest.mark.asyncio
+async def test_session_flushes_merged_statement_with_edgedb(edgedb_dsn):
+    UserModel = m.UserModel
+    MemoModel = m.MemoModel
+    client = edgedb.create_async_client(edgedb_dsn, tls_security="insecure")
+    session = Session(client)
+    now = pendulum.now()
+
+    name = f"user-{uuid.uuid4()}"
+    user = session.add(
+        user_insert(name)
+        .add_field(UserModel.created_at, now)
+        .add_field(UserModel.updated_at, now)
+    )
+    memo = session.add(
+        memo_insert("Some Memo", user)
+        .add_field(MemoModel.created_at, now)
+        .add_field(MemoModel.updated_at, now)
+    )
+
+    assert session.statements() == [[user, memo]]
+    [user_result, memo_result] = await session.flush()
+
+    created_by = await client.query_required_single(
+        "select default::Memo { created_by: { id } } filter .id = <uuid>$id",
+        id=memo_result.id,
+    )
+    assert created_by.created_by.id == user_result.id
+
+    await client.execute(
+        "delete default::Memo filter .id = <uuid>$memo_id;"
+        "delete default::User filter .id = <uuid>$user_id;",
+        memo_id=memo_result.id,
+        user_id=user_result.id,
+    )
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_session_validates_types_before_flush():
+    client = MergedClient()
+    session = Session(client)
+    session.add(memo_insert("Some Memo", session.add(user_insert("user"))))
+
+    with recording_validator() as validator:
+        await session.flush()
+
+    assert validator.validated == [{"default::Memo", "default::User"}]
+    assert len(client.calls) == 1
+
+
+def test_session_takes_only_writes():
+    with pytest.raises(ConditionValidationError):
+        Session(TransactionClient()).add(m.UserModel.select())
@@ -0,0 +1,129 @@
+import typing as t
+import uuid
+
+import pytest
+from edgedb.datatypes.datatypes import create_object_factory
+
+import tests.models as m
+from edgegraph.errors import ConditionValidationError
+from edgegraph.expressions.side import SideExpression
+from edgegraph.query_builder.base import OrderType
+from edgegraph.reflections import field
+from edgegraph.types import PrimitiveTypes
+from tests.fakes import recording_validator
+
+Memo = create_object_factory(id="property", title="property")
+
+
+class PagedClient:
+    pages: t.List[t.List[t.Any]]
+    calls: t.List[t.Tuple[str, t.Dict[str, t.Any]]]
+
+    def __init__(self, pages: t.List[t.List[t.Any]]):
+        self.pages = pages
+        self.calls = []
+
+    async def query(self, query: str, **kwargs) -> t.List[t.Any]:
+        self.calls.append((query, kwargs))
+        return self.pages.pop(0)
+
+
+@pytest.mark.asyncio
+async def test_stream_pages_by_keyset():
+    MemoModel = m.MemoModel
+    rows = [Memo(uuid.uuid4(), f"Memo {idx}") for idx in range(5)]
+    client = PagedClient([rows[0:2], rows[2:4], rows[4:5]])
+
+    builder = MemoModel.select([field(MemoModel.title)]).order(
+        MemoModel.title, OrderType.ASC
+    )
+    streamed = [row async for row in builder.stream(client, batch_size=2)]
+
+    assert streamed == rows
+    assert len(client.calls) == 3
+
+    (first_query, first_kwargs) = client.calls[0]
+    assert "order by title asc then id asc" in first_query
+    assert "limit 2" in first_query
+    assert "filter" not in first_query
+    assert first_kwargs == {}
+
+    (second_query, second_kwargs) = client.calls[1]
+    assert "filter (.title > <str>$filter_0__origin__equation_target)" in second_query
+    assert sorted(second_kwargs.values(), key=str) == sorted(
+        [rows[1].title, rows[1].title, rows[1].id], key=str
+    )
+
+    # every page after the first one has same query text.
+    assert client.calls[2][0] == second_query
+
+    # builder itself is not changed by streaming.
+    assert "limit" not in builder.build().query
+
+
+@pytest.mark.asyncio
+async def test_stream_without_order_pages_by_id():
+    MemoModel = m.MemoModel
+    rows = [Memo(uuid.uuid4(), "Memo")]
+    client = PagedClient([rows])
+
+    builder = MemoModel.select([field(MemoModel.title)])
+    assert [row async for row in builder.stream(client, batch_size=2)] == rows
+
+    (query, _) = client.calls[0]
+    assert "order by id asc" in query
+
+
+@pytest.mark.asyncio
+async def test_stream_rejects_optional_order_field():
+    MemoModel = m.MemoModel
+    builder = MemoModel.select([field(MemoModel.title)]).order(
+        MemoModel.deleted_at, OrderType.ASC
+    )
+
+    with pytest.raises(ConditionValidationError):
+        [row async for row in builder.stream(PagedClient([]))]
+
+
+@pytest.mark.asyncio
+async def test_stream_keeps_user_filters_on_every_page():
+    MemoModel = m.MemoModel
+    rows = [Memo(uuid.uuid4(), f"Memo {idx}") for idx in range(3)]
+    client = PagedClient([rows[0:2], rows[2:3]])
+
+    builder = (
+        MemoModel.select([field(MemoModel.title)])
+        .add_filter(
+            SideExpression(
+                equation="=",
+                origin=field(MemoModel.deleted),
+                target=False,
+                target_type=PrimitiveTypes.BOOL,
+            )
+        )
+        .order(MemoModel.title, OrderType.DESC)
+    )
+    assert [row async for row in builder.stream(client, batch_size=2)] == rows
+
+    (first_query, _) = client.calls[0]
+    assert "filter .deleted = <bool>$filter_0__equation_target\n" in first_query
+
+    # keyset `or` is grouped, so the user filter is applied to both of its sides.
+    (second_query, _) = client.calls[1]
+    assert (
+        "filter (.deleted = <bool>$filter_0__equation_target)"
+        " AND ((.title < <str>$filter_1__origin__equation_target) or " in second_query
+    )
+    assert "order by title desc then id asc" in second_query
+
+
+@pytest.mark.asyncio
+async def test_stream_validates_types_of_pages():
+    MemoModel = m.MemoModel
+    client = PagedClient([[Memo(uuid.uuid4(), "Memo")]])
+
+    with recording_validator() as validator:
+        builder = MemoModel.select([field(MemoModel.title)])
+        assert len([row async for row in builder.stream(client, batch_size=2)]) == 1
+
+    assert validator.validated == [{"default::Memo"}]
@@ -1,5 +1,6 @@
 import asyncio
 import os
+import uuid
 from textwrap import dedent
 
 import pendulum
@@ -125,3 +126,47 @@ def test_valid_update_subquery_query_with_edgeql():
             """
         )[1:]
     )
+
+
+def test_update_filter_infers_db_type_from_field():
+    MemoModel = m.MemoModel
+
+    memo_update = (
+        MemoModel.update()
+        .add_filter(
+            SideExpression(
+                equation="=", origin=field(MemoModel.id), target=uuid.uuid4()
+            )
+        )
+        .add_field(field(MemoModel.deleted), value=True)
+        .build()
+    )
+
+    assert "filter .id = <uuid>$filter_0__equation_target\n" in memo_update.query
+    assert "deleted := <bool>$deleted,\n" in memo_update.query
+
+
+def test_update_groups_filters():
+    MemoModel = m.MemoModel
+
+    def by_title(title: str):
+        return SideExpression(equation="=", origin=field(MemoModel.title), target=title)
+
+    memo_update = (
+        MemoModel.update()
+        .add_filter(
+            SideExpression(equation="=", origin=field(MemoModel.deleted), target=False)
+        )
+        .add_filter(
+            SideExpression(equation="or", origin=by_title("a"), target=by_title("b"))
+        )
+        .add_field(field(MemoModel.content), value="Some Content")
+        .build()
+    )
+
+    # `or` of the second filter doesn't take the first one as its operand.
+    assert (
+        "filter (.deleted = <bool>$filter_0__equation_target) AND \n"
+        "((.title = <str>$filter_1__origin__equation_target) or "
+        "(.title = <str>$filter_1__target__equation_target))\n"
+    ) in memo_update.query
@@ -4,7 +4,8 @@ import uuid
 import pendulum
 from pydantic import Field
 
-from edgegraph.reflections import EdgeGraphField, field
+import tests.models as m
+from edgegraph.reflections import EdgeGraphField, field, is_reflected
 from edgegraph.schema import EdgeModel
 
 
@@ -45,3 +46,68 @@ def test_reflect_fields_are_valid():
         "password": str,
         "name": str,
     }
+
+
+def test_model_metadata_is_built_once():
+    metadata = m.MemoModel.__model_metadata__
+
+    assert metadata.qualified_name == "default::Memo"
+    assert m.MemoModel.get_schema_config() == ("default", "Memo")
+    assert list(metadata.fields.keys()) == list(m.MemoModel.__hints__.keys())
+
+    deleted_at = metadata.fields["deleted_at"]
+    assert deleted_at.optional is True
+    assert deleted_at.check_type is pendulum.DateTime
+    assert deleted_at.is_link is False
+
+    tags = metadata.fields["tags"]
+    assert tags.check_type is list
+    assert tags.is_link is False
+
+    created_by = metadata.fields["created_by"]
+    assert created_by.is_link is True
+    assert created_by.is_multi is False
+    assert created_by.target is m.UserModel
+
+    accessable_users = metadata.fields["accessable_users"]
+    assert accessable_users.is_link is True
+    assert accessable_users.is_multi is True
+    assert accessable_users.target is m.UserModel
+
+
+def test_lazy_model_is_reflected_on_first_use():
+    class LazyUserModel(EdgeModel):
+        id: uuid.UUID
+        email: str
+        deleted_at: t.Optional[pendulum.DateTime] = Field(default=None)
+
+        class SchemaConfig:
+            module: str = "default"
+            name: str = "User"
+            lazy: bool = True
+
+    class CreatorModel(EdgeModel):
+        id: uuid.UUID
+        created_by: LazyUserModel
+
+    # referencing from other models doesn't reflect the model
+    assert is_reflected(LazyUserModel) is False
+    assert "email" not in LazyUserModel.__dict__
+
+    # attribute access reflects the model
+    assert LazyUserModel.email == EdgeGraphField(LazyUserModel, "email", str)
+    assert is_reflected(LazyUserModel) is True
+
+    class LazyMemoModel(EdgeModel):
+        id: uuid.UUID
+        title: str
+
+        class SchemaConfig:
+            module: str = "default"
+            name: str = "Memo"
+            lazy: bool = True
+
+    # builder use reflects the model too
+    query = LazyMemoModel.insert().add_field("title", "Some Memo").build().query
+    assert query == "insert default::Memo {\ntitle := <str>$title,\n}\n"
+    assert is_reflected(LazyMemoModel) is True
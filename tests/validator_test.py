@@ -8,8 +8,17 @@ import pytest
 from pydantic import Field
 
 import tests.models as m
+from edgegraph.esdl import load_schema
+from edgegraph.introspection import SnapshotCache, model_fingerprint
+from edgegraph.query_builder.executor import get_type_validator
 from edgegraph.schema import EdgeModel
-from edgegraph.validator import SchemaValidator, ValidationError
+from edgegraph.validator import SchemaValidator, ValidationError, ValidationMode
+from tests.fakes import (
+    DBSCHEMA,
+    FakeIntrospectionClient,
+    RecordingClient,
+    model_schema,
+)
 
 
 @pytest.fixture(scope="module")
@@ -42,6 +51,237 @@ async def test_validator_with_valid_edgemodels(edgedb_dsn):
     await validator.aclose()
 
 
+@pytest.mark.asyncio
+async def test_validator_with_fake_client():
+    models = {m.UserModel, m.MemoModel, m.CommentModel}
+    client = FakeIntrospectionClient(load_schema(DBSCHEMA))
+    validator = SchemaValidator("", models=models, client=client)
+
+    assert await validator.validate() is True
+    # every type is inspected with one query.
+    assert client.queries == 1
+
+
+@pytest.mark.asyncio
+async def test_validator_with_snapshot_cache(tmp_path):
+    class MemoModel(EdgeModel):
+        id: uuid.UUID = Field(default_factory=uuid.uuid1)
+        updated_at: pendulum.DateTime = Field(default_factory=pendulum.now)
+        created_at: pendulum.DateTime = Field(default_factory=pendulum.now)
+        deleted_at: t.Optional[pendulum.DateTime] = Field(default=None)
+        deleted: bool = Field(default=False)
+
+        title: str
+        # changed to be optional
+        content: t.Optional[str] = None
+        tags: t.List[str] = Field(default=[])
+
+        created_by: m.UserModel
+        accessable_users: t.List[m.UserModel] = Field(default=[])
+
+        class SchemaConfig:
+            module: str = "default"
+            name: str = "Memo"
+
+    cache = str(tmp_path / "snapshot.json")
+    models = {m.UserModel, m.MemoModel, m.CommentModel}
+    client = FakeIntrospectionClient(load_schema(DBSCHEMA), migration="m1")
+
+    def validator(models):
+        return SchemaValidator("", models=models, client=client, snapshot_cache=cache)
+
+    assert await validator(models).validate() is True
+    # latest migration, and introspection.
+    assert client.queries == 2
+
+    # same migration and models, validation is skipped.
+    assert await validator(models).validate() is True
+    assert client.queries == 3
+
+    # a changed model is validated with the cached snapshot, without introspection.
+    changed = {m.UserModel, MemoModel, m.CommentModel}
+    assert await validator(changed).validate() is True
+    assert client.queries == 4
+    assert model_fingerprint(MemoModel) != model_fingerprint(m.MemoModel)
+    cached = SnapshotCache.load(cache)
+    assert cached is not None
+    assert cached.models["default::Memo"] == model_fingerprint(MemoModel)
+
+    # new migration introspects again.
+    client.migration = "m2"
+    assert await validator(changed).validate() is True
+    assert client.queries == 6
+
+
+def test_snapshot_cache_removes_temporary_file_on_failure(tmp_path):
+    cache = SnapshotCache(
+        migration="m1", snapshot=load_schema(DBSCHEMA), models={"default::User": ""}
+    )
+
+    # a directory can't be replaced with the written file.
+    path = tmp_path / "snapshot.json"
+    path.mkdir()
+    with pytest.raises(OSError):
+        cache.save(str(path))
+
+    assert os.listdir(tmp_path) == ["snapshot.json"]
+
+
+@pytest.mark.asyncio
+async def test_validator_with_fake_client_and_missed_properties():
+    class UserModel(EdgeModel):
+        id: uuid.UUID = Field(default_factory=uuid.uuid1)
+        email: str
+        name: str
+
+        class SchemaConfig:
+            module: str = "default"
+            name: str = "User"
+
+    client = FakeIntrospectionClient(model_schema({m.UserModel, m.MemoModel}))
+    validator = SchemaValidator("", models={UserModel, m.MemoModel}, client=client)
+
+    with pytest.raises(ValidationError) as e:
+        await validator.validate()
+
+    # counts of fields are different, and 5 fields are not found in the model.
+    assert len(e.value.errors) == 6
+
+
+@pytest.mark.asyncio
+async def test_validator_with_fake_client_and_invalid_cardinality():
+    class MemoModel(EdgeModel):
+        id: uuid.UUID = Field(default_factory=uuid.uuid1)
+        updated_at: pendulum.DateTime = Field(default_factory=pendulum.now)
+        created_at: pendulum.DateTime = Field(default_factory=pendulum.now)
+        deleted_at: t.Optional[pendulum.DateTime] = Field(default=None)
+        deleted: bool = Field(default=False)
+
+        title: str
+        content: str
+        tags: t.List[str] = Field(default=[])
+
+        created_by: m.UserModel
+        # multi link in EdgeDB, but defined as single one.
+        accessable_users: t.Optional[m.UserModel] = None
+
+        class SchemaConfig:
+            module: str = "default"
+            name: str = "Memo"
+
+    client = FakeIntrospectionClient(model_schema({m.UserModel, m.MemoModel}))
+    validator = SchemaValidator("", models={m.UserModel, MemoModel}, client=client)
+
+    with pytest.raises(ValidationError) as e:
+        await validator.validate()
+
+    [error] = e.value.errors
+    assert error.property == "accessable_users"
+    assert "is not One" in error.error_message
+
+
+@pytest.mark.asyncio
+async def test_validator_in_lazy_mode():
+    class UserModel(EdgeModel):
+        id: uuid.UUID = Field(default_factory=uuid.uuid1)
+        email: str
+        name: str
+
+        class SchemaConfig:
+            module: str = "default"
+            name: str = "User"
+
+    client = FakeIntrospectionClient(load_schema(DBSCHEMA))
+    validator = SchemaValidator(
+        "", models={UserModel, m.MemoModel}, client=client, mode=ValidationMode.LAZY
+    )
+
+    assert await validator.validate() is True
+    assert client.queries == 0
+    assert get_type_validator() is validator
+
+    try:
+        # memo links to the user of tests.models, which is not validated here.
+        await m.MemoModel.select([m.MemoModel.title]).fetch(RecordingClient())
+        assert client.queries == 1
+
+        # invalid models raise on every use, without introspecting again.
+        for _ in range(2):
+            with pytest.raises(ValidationError) as e:
+                await UserModel.select([UserModel.name]).fetch(RecordingClient())
+            assert len(e.value.errors) == 6
+        assert client.queries == 1
+    finally:
+        await validator.aclose()
+
+    assert get_type_validator() is None
+
+
+@pytest.mark.asyncio
+async def test_validator_in_background_mode():
+    class UserModel(EdgeModel):
+        id: uuid.UUID = Field(default_factory=uuid.uuid1)
+        email: str
+        name: str
+
+        class SchemaConfig:
+            module: str = "default"
+            name: str = "User"
+
+    reported: t.List[ValidationError] = []
+    client = FakeIntrospectionClient(model_schema({m.UserModel, m.MemoModel}))
+    validator = SchemaValidator(
+        "",
+        models={UserModel, m.MemoModel},
+        client=client,
+        mode=ValidationMode.BACKGROUND,
+        on_error=reported.append,
+    )
+
+    try:
+        assert await validator.validate() is True
+        await validator.wait()
+
+        [error] = reported
+        assert len(error.errors) == 6
+        assert client.queries == 1
+
+        # errors are reported once, and never raised.
+        await UserModel.select([UserModel.name]).fetch(RecordingClient())
+        assert len(reported) == 1
+    finally:
+        await validator.aclose()
+
+
+@pytest.mark.asyncio
+async def test_validator_in_background_mode_reports_introspection_failure():
+    class FailingClient(FakeIntrospectionClient):
+        async def query(self, query: str, *args, **kwargs):
+            await super().query(query, *args, **kwargs)
+            raise ConnectionError("connection refused")
+
+    reported: t.List[ValidationError] = []
+    client = FailingClient(load_schema(DBSCHEMA))
+    validator = SchemaValidator(
+        "",
+        models={m.UserModel, m.MemoModel, m.CommentModel},
+        client=client,
+        mode=ValidationMode.BACKGROUND,
+        on_error=reported.append,
+    )
+
+    try:
+        assert await validator.validate() is True
+        # the failure is reported, not raised from the task.
+        await validator.wait()
+
+        [error] = reported
+        assert "connection refused" in error.errors[0].error_message
+        assert client.queries == 1
+    finally:
+        await validator.aclose()
+
+
 @pytest.mark.asyncio
 async def test_validator_with_invalid_classes(edgedb_dsn):
     class UserModel(EdgeModel):